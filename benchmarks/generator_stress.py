@@ -0,0 +1,192 @@
+# benchmarks/generator_stress.py
+# Concurrency stress test for the generator's stock dispensing.
+#
+#   python benchmarks/generator_stress.py [--requests 1000] [--stock 1000]
+#                                         [--dm-failure-rate 0.1] [--dm-rate 1000] [--same-user 10]
+#                                         [--seed 1]
+#
+# Fires `--requests` /fgen calls for one service at the same time, each from a
+# different fake user, through Generator._handle_generation. DMs take a random
+# few milliseconds and a share of them fail with Forbidden, so reservations
+# interleave and some accounts are handed back to the queue. DMs go through the
+# cog's DM queue, paced at --dm-rate; the closed-DM fallback is turned off so
+# failed DMs are released rather than delivered in the channel.
+#
+# Alongside them, one more user fires `--same-user` requests at once, and one
+# user whose DMs are always closed fires a single request.
+#
+# Exits non-zero unless:
+#   - no account was delivered twice,
+#   - the repeated user got one account (or was out of stock), the rest hitting the cooldown,
+#   - the user with closed DMs was left without a cooldown,
+#   - delivered + still in stock == the original stock (nothing lost),
+#   - a fresh StockQueue loaded from disk sees the same remaining stock,
+#   - the live stock counter and the one saved in the head file match it.
+#
+# Data is written to a throwaway directory.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import sys
+import tempfile
+import time
+
+import discord
+from discord.ext import commands
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+SERVICE = "stress"
+GUILD_ID = 1
+
+
+# --- Fake discord objects (only what _handle_generation touches) ---
+class FakeForbiddenResponse:
+    status = 403
+    reason = "Forbidden"
+
+
+class FakeGuild:
+    id = GUILD_ID
+    name = "Stress Guild"
+
+
+class FakeChannel:
+    id = 10
+
+
+class FakeUser:
+    def __init__(self, user_id: int, rng: random.Random, failure_rate: float, delivered: list):
+        self.id = user_id
+        self.roles = []
+        self._rng = rng
+        self._failure_rate = failure_rate
+        self._delivered = delivered
+
+    async def send(self, embed: discord.Embed = None, **kwargs):
+        await asyncio.sleep(self._rng.uniform(0, 0.02))
+        if self._rng.random() < self._failure_rate:
+            raise discord.Forbidden(FakeForbiddenResponse(), "Cannot send messages to this user")
+        # The account is the code block in the DM description
+        self._delivered.append(embed.description.split("```")[1])
+
+
+class FakeResponse:
+    async def defer(self, **kwargs):
+        pass
+
+
+class FakeFollowup:
+    def __init__(self, replies: list):
+        self._replies = replies
+
+    async def send(self, *args, embed: discord.Embed = None, **kwargs):
+        self._replies.append(embed.title if embed else args[0])
+
+
+class FakeInteraction:
+    def __init__(self, user: FakeUser, replies: list):
+        self.user = user
+        self.guild = FakeGuild()
+        self.channel = FakeChannel()
+        self.response = FakeResponse()
+        self.followup = FakeFollowup(replies)
+
+
+async def run(args) -> bool:
+    import generator
+
+    accounts = [f"account{i}:password{i}" for i in range(args.stock)]
+    with open(os.path.join(generator.STOCK_BASE_FOLDER, f"{SERVICE}.txt"), "w") as f:
+        f.write("\n".join(accounts) + "\n")
+    # Pre-create the guild entry so 1,000 first-time lookups don't all write the config file
+    with open(generator.GLOBAL_CONFIG_FILE, "w") as f:
+        json.dump({str(GUILD_ID): generator.DEFAULT_GUILD_CONFIG.copy()}, f)
+
+    generator.DM_RATE = generator.DM_BURST = args.dm_rate
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    cog = generator.Generator(bot)
+    cog.dm_fallback = False
+    cog.load_data_task.cancel()
+    cog.services = {SERVICE: {"usage": 0}}
+    cog.blacklist = []
+    cog.global_config = generator.DEFAULT_GLOBAL_CONFIG.copy()
+
+    # Count once up front so the run exercises the live counter
+    await cog.stock.count(SERVICE)
+
+    rng = random.Random(args.seed)
+    delivered, replies = [], []
+    interactions = [
+        FakeInteraction(FakeUser(user_id, rng, args.dm_failure_rate, delivered), replies)
+        for user_id in range(1, args.requests + 1)
+    ]
+    same_delivered, same_replies = [], []
+    same_user = FakeUser(args.requests + 1, rng, 0.0, same_delivered)
+    interactions += [FakeInteraction(same_user, same_replies) for _ in range(args.same_user)]
+    closed_user = FakeUser(args.requests + 2, rng, 1.0, delivered)
+    interactions.append(FakeInteraction(closed_user, replies))
+
+    started = time.perf_counter()
+    await asyncio.gather(*(cog._handle_generation(interaction, SERVICE, "free") for interaction in interactions))
+    elapsed = time.perf_counter() - started
+    dm_stats = dict(cog.dm_queue.stats)
+    drained = not cog.dm_queue.depth
+    rolled_back = cog.cooldowns.expiry(closed_user.id, SERVICE) == 0
+    cog.cog_unload()
+    delivered += same_delivered
+    one_per_user = (
+        len(same_delivered) + same_replies.count("⚠️ Out of Stock") == 1
+        and same_replies.count("⏳ Cooldown Active") == args.same_user - 1
+    )
+
+    remaining = await cog.stock.live_lines(SERVICE)
+    fresh = generator.StockQueue(cog.stock.queue(SERVICE).path)
+    reloaded = fresh.live_lines()
+
+    duplicates = len(delivered) - len(set(delivered))
+    conserved = sorted(delivered + remaining) == sorted(accounts)
+    persisted = sorted(reloaded) == sorted(remaining)
+    live_count = await cog.stock.count(SERVICE)
+    counted = live_count == len(remaining) and fresh.available == len(remaining)
+
+    outcomes = {}
+    for title in replies:
+        outcomes[title] = outcomes.get(title, 0) + 1
+
+    print(f"{args.requests:,} parallel requests against {args.stock:,} accounts in {elapsed:.2f}s")
+    for title, count in sorted(outcomes.items(), key=lambda item: -item[1]):
+        print(f"  {count:>6,}  {title}")
+    print(f"  delivered {len(delivered):,} | still in stock {len(remaining):,} | reloaded from disk {len(reloaded):,}")
+    print(f"  counter {live_count:,} | saved counter {fresh.available}")
+    print(f"  DM queue: {dm_stats} | drained: {drained}")
+    print(f"  same user x{args.same_user}: {len(same_delivered)} delivered, {same_replies.count('⏳ Cooldown Active')} on cooldown"
+          f" | closed-DM cooldown rolled back: {rolled_back}")
+    print(f"  duplicates: {duplicates} | stock conserved: {conserved} | head persisted: {persisted} | counts match: {counted}")
+    return duplicates == 0 and conserved and persisted and counted and drained and one_per_user and rolled_back
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Concurrency stress test for generator stock dispensing")
+    parser.add_argument("--requests", type=int, default=1_000, help="Parallel generation requests")
+    parser.add_argument("--stock", type=int, default=1_000, help="Accounts in stock")
+    parser.add_argument("--dm-failure-rate", type=float, default=0.1, help="Share of DMs that fail with Forbidden")
+    parser.add_argument("--dm-rate", type=float, default=1_000, help="DMs per second allowed by the DM queue")
+    parser.add_argument("--same-user", type=int, default=10, help="Parallel requests from one extra user")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    # generator creates data/ in the working directory on import
+    os.chdir(tempfile.mkdtemp(prefix="sentinel-genstress-"))
+
+    ok = asyncio.run(run(args))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+# benchmarks/level_math.py
+# Self-check and microbenchmark for the leveling XP math.
+#
+#   python benchmarks/level_math.py [--levels 10000] [--number 2000]
+#
+# The check compares get_total_xp_required / get_level_info against the
+# original level-by-level loops for every level in range (plus the XP values
+# just around each threshold), then times both implementations.
+
+import argparse
+import os
+import sys
+import tempfile
+import timeit
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+# leveling creates data/ and fonts/ in the working directory on import
+os.chdir(tempfile.mkdtemp(prefix="sentinel-bench-"))
+
+from leveling import get_xp_needed, get_total_xp_required, get_level_info  # noqa: E402
+
+
+# --- Reference implementations (the original loops) ---
+def legacy_total_xp_required(level: int) -> int:
+    total_xp = 0
+    for l in range(1, level + 1):
+        total_xp += get_xp_needed(l - 1)
+    return total_xp
+
+def legacy_level_info(total_xp: int):
+    level = 0
+    temp_xp = total_xp
+    while True:
+        xp_to_next_level = get_xp_needed(level)
+        if temp_xp >= xp_to_next_level:
+            temp_xp -= xp_to_next_level
+            level += 1
+        else:
+            return {"level": level, "xp": temp_xp, "xp_needed": xp_to_next_level}
+
+
+def self_check(max_level: int) -> int:
+    checked = 0
+    running_total = 0
+    for level in range(max_level + 1):
+        # Cumulative sum maintained here so the check itself stays linear
+        if level:
+            running_total += get_xp_needed(level - 1)
+        assert get_total_xp_required(level) == running_total, f"total_xp_required({level})"
+
+        for total_xp in (running_total - 1, running_total, running_total + 1):
+            if total_xp < 0:
+                continue
+            # The full legacy loop is O(level); only run it on a sample to keep this fast
+            if level <= 2000 or level % 97 == 0:
+                expected = legacy_level_info(total_xp)
+            else:
+                below = level - 1 if total_xp < running_total else level
+                expected = {
+                    "level": below,
+                    "xp": total_xp - get_total_xp_required(below),
+                    "xp_needed": get_xp_needed(below),
+                }
+            assert get_level_info(total_xp) == expected, f"level_info({total_xp})"
+            checked += 1
+
+    # Spot-check the legacy total loop directly as well
+    for level in range(0, max_level + 1, 250):
+        assert get_total_xp_required(level) == legacy_total_xp_required(level)
+    return checked
+
+
+def bench(max_level: int, number: int):
+    samples = [get_total_xp_required(level) + 7 for level in (5, 25, 50, 100, 250)]
+    print(f"{'total_xp':>12} {'level':>6} {'legacy (us)':>12} {'new (us)':>10} {'speedup':>8}")
+    for total_xp in samples:
+        legacy = timeit.timeit(lambda: legacy_level_info(total_xp), number=number) / number * 1e6
+        new = timeit.timeit(lambda: get_level_info(total_xp), number=number) / number * 1e6
+        level = get_level_info(total_xp)["level"]
+        print(f"{total_xp:>12,} {level:>6} {legacy:>12.2f} {new:>10.2f} {legacy / new:>7.1f}x")
+
+    level = min(max_level, 500)
+    legacy = timeit.timeit(lambda: legacy_total_xp_required(level), number=number) / number * 1e6
+    new = timeit.timeit(lambda: get_total_xp_required(level), number=number) / number * 1e6
+    print(f"get_total_xp_required({level}): legacy {legacy:.2f}us, new {new:.2f}us ({legacy / new:.1f}x)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--levels", type=int, default=10_000, help="Highest level to self-check")
+    parser.add_argument("--number", type=int, default=2_000, help="Iterations per timing sample")
+    args = parser.parse_args()
+
+    checked = self_check(args.levels)
+    print(f"Self-check passed: levels 0-{args.levels:,} ({checked:,} XP values)")
+    bench(args.levels, args.number)
+
+
+if __name__ == "__main__":
+    main()
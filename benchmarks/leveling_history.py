@@ -0,0 +1,144 @@
+# benchmarks/leveling_history.py
+# Consistency check for the leveling cog's week/month boards after admin actions.
+#
+#   python benchmarks/leveling_history.py [--users 50] [--seed 1]
+#
+# Gives `--users` members XP over the last few days, then, through the cog's
+# admin command handler:
+#   - resets one member (resetuser),
+#   - removes part of another member's XP (removexp),
+#   - lowers a third member's total with setxp.
+#
+# Exits non-zero unless, both live and after reloading the guild from disk:
+#   - the reset member is on neither the week nor the month board,
+#   - the other two lost exactly the removed XP from their window totals, newest days first,
+#   - nobody else's window totals changed.
+#
+# Data is written to a throwaway directory.
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+
+import discord
+from discord.ext import commands
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+GUILD_ID = 1
+
+
+# --- Fake discord objects (only what the admin handler touches) ---
+class FakeGuild:
+    id = GUILD_ID
+    me = None
+
+    def get_role(self, role_id: int):
+        return None
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, user_id: int, guild: FakeGuild):
+        self.id = user_id
+        self.guild = guild
+        self.mention = f"<@{user_id}>"
+        self.roles = []
+
+
+class FakeContext(commands.Context):
+    """Passes the handler's isinstance(source, commands.Context) checks."""
+
+    def __init__(self, guild: FakeGuild):
+        self.guild = guild
+
+    async def reply(self, *args, **kwargs):
+        pass
+
+
+def window_totals(cog, leveling) -> dict:
+    return {
+        period: dict((user_id, xp) for user_id, xp in cog.store.window_leaderboard(GUILD_ID, period).top(10_000))
+        for period in leveling.LEADERBOARD_WINDOWS
+    }
+
+
+def check(label: str, totals: dict, expected: dict) -> bool:
+    ok = totals == expected
+    for period in expected:
+        missing = expected[period].keys() ^ totals[period].keys()
+        wrong = [user_id for user_id in expected[period].keys() & totals[period].keys() if expected[period][user_id] != totals[period][user_id]]
+        print(f"{label:<8} {period:<6} {len(totals[period]):,} ranked, {len(missing)} missing/extra, {len(wrong)} wrong totals")
+    return ok
+
+
+async def run(args) -> bool:
+    import leveling
+
+    rng = random.Random(args.seed)
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    cog = leveling.Leveling(bot)
+    guild = FakeGuild()
+    today = leveling._today()
+
+    # XP earned over the last 10 days (older days only reach the month board)
+    store = cog.store
+    for days_ago in range(9, -1, -1):
+        leveling._today = lambda day=today - days_ago: day
+        for user_id in range(1, args.users + 1):
+            xp = rng.randint(1, 50)
+            total_xp = store.get_user(GUILD_ID, user_id)["total_xp"] + xp
+            info = leveling.get_level_info(total_xp)
+            store.update_user(GUILD_ID, user_id, {"xp": info["xp"], "level": info["level"], "total_xp": total_xp}, xp)
+    leveling._today = lambda: today
+
+    expected = window_totals(cog, leveling)
+    reset_id, removed_id, lowered_id = 1, 2, 3
+    removed_xp = expected["week"][removed_id] // 2
+    lowered_by = expected["week"][lowered_id] + 1 # More than this week: the rest comes out of older days
+
+    ctx = FakeContext(guild)
+    await cog._handle_level_admin_action(ctx, "resetuser", FakeMember(reset_id, guild))
+    await cog._handle_level_admin_action(ctx, "removexp", FakeMember(removed_id, guild), removed_xp)
+    lowered_total = store.get_user(GUILD_ID, lowered_id)["total_xp"] - lowered_by
+    await cog._handle_level_admin_action(ctx, "setxp", FakeMember(lowered_id, guild), lowered_total)
+
+    for period in expected:
+        expected[period].pop(reset_id, None)
+        expected[period][removed_id] -= removed_xp
+        expected[period][lowered_id] -= lowered_by
+        if expected[period][lowered_id] <= 0:
+            del expected[period][lowered_id]
+
+    ok = check("live", window_totals(cog, leveling), expected)
+
+    await store.flush()
+    store._shards.pop(str(GUILD_ID)).journal.close()
+    ok = check("reloaded", window_totals(cog, leveling), expected) and ok
+
+    cog.flush_task.cancel()
+    cog.compact_task.cancel()
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Week/month board consistency after admin actions")
+    parser.add_argument("--users", type=int, default=50, help="Members with XP")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    # leveling creates data/ and fonts/ in the working directory on import
+    os.chdir(tempfile.mkdtemp(prefix="sentinel-bench-"))
+
+    ok = asyncio.run(run(args))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
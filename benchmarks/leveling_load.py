@@ -0,0 +1,304 @@
+# benchmarks/leveling_load.py
+# Offline load test for the leveling cog.
+#
+#   python benchmarks/leveling_load.py [--rate 500] [--guilds 20] [--users 5000] [--duration 30]
+#                                      [--rank-rate 2] [--leaderboard-rate 2] [--xp-cooldown 60]
+#                                      [--render-pool] [--output results.json]
+#
+# Drives Leveling.on_message with fake messages at a fixed rate (open loop, so
+# slow handlers queue up instead of slowing the driver), plus /rank and
+# /leaderboard at their own rates. Reports p50/p99 latency per handler,
+# event-loop lag, bytes written and peak RSS, and writes everything as JSON so
+# runs can be compared between commits.
+#
+# Data is written to a throwaway directory; avatar URLs point at a closed local
+# port, so rank cards are rendered without avatars and without network access.
+
+import argparse
+import asyncio
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import discord
+import psutil
+from discord.ext import commands
+
+try:
+    import resource
+except ImportError: # Windows
+    resource = None
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+# --- Fake discord objects (only what the leveling handlers touch) ---
+class FakeAsset:
+    def __init__(self, user_id: int):
+        self.key = f"avatar{user_id}"
+        self.url = f"http://127.0.0.1:9/avatars/{user_id}.png"
+
+    def with_size(self, size: int):
+        return self
+
+
+class FakeChannel:
+    def __init__(self, channel_id: int):
+        self.id = channel_id
+        self.sent = 0
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+
+class FakeGuild:
+    def __init__(self, guild_id: int):
+        self.id = guild_id
+        self.me = None
+        self.members = {}
+        self.channel = FakeChannel(guild_id * 10)
+
+    def get_member(self, user_id: int):
+        return self.members.get(user_id)
+
+    def get_role(self, role_id: int):
+        return None
+
+    def member(self, user_id: int) -> "FakeMember":
+        member = self.members.get(user_id)
+        if member is None:
+            member = self.members[user_id] = FakeMember(user_id, self)
+        return member
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, user_id: int, guild: FakeGuild):
+        self.id = user_id
+        self.guild = guild
+        self.display_name = f"User {user_id}"
+        self.mention = f"<@{user_id}>"
+        self.display_avatar = FakeAsset(user_id)
+
+    async def add_roles(self, *roles):
+        pass
+
+
+class FakeMessage:
+    def __init__(self, member: FakeMember, content: str = "hello there"):
+        self.author = member
+        self.guild = member.guild
+        self.channel = member.guild.channel
+        self.content = content
+
+
+class FakeContext(commands.Context):
+    """Passes the handlers' isinstance(source, commands.Context) checks."""
+
+    def __init__(self, message: FakeMessage):
+        self.message = message
+
+    async def reply(self, *args, **kwargs):
+        pass
+
+
+# --- Measurement helpers ---
+def percentile(samples, pct: float) -> float:
+    if not samples:
+        return 0.0
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def summarize(samples):
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(max(samples, default=0.0) * 1000, 3),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+    }
+
+
+def peak_rss_bytes() -> int:
+    if resource is not None:
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # KiB on Linux, bytes on macOS
+        return peak if sys.platform == "darwin" else peak * 1024
+    return psutil.Process().memory_info().peak_wset
+
+
+def io_written(process: psutil.Process):
+    try:
+        counters = process.io_counters()
+    except (AttributeError, psutil.Error): # Not available on macOS
+        return None, None
+    return counters.write_bytes, getattr(counters, "write_chars", None)
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.check_output(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=REPO_ROOT, stderr=subprocess.DEVNULL, text=True
+        ).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def directory_size(path: str) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+async def drive(rate: float, duration: float, make_call, latencies, tasks):
+    """Starts make_call() `rate` times per second for `duration` seconds without waiting on them."""
+    if rate <= 0:
+        return
+    loop = asyncio.get_running_loop()
+    interval = 1 / rate
+    start = loop.time()
+    started = 0
+    while True:
+        now = loop.time()
+        if now - start >= duration:
+            break
+        due = int((now - start) / interval) + 1
+        while started < due:
+            tasks.add(asyncio.create_task(timed(make_call(), latencies)))
+            started += 1
+        await asyncio.sleep(min(interval, 0.005))
+
+
+async def timed(coro, latencies):
+    started = time.perf_counter()
+    try:
+        await coro
+    finally:
+        latencies.append(time.perf_counter() - started)
+
+
+async def sample_loop_lag(lags, stop: asyncio.Event, period: float = 0.01):
+    while not stop.is_set():
+        started = time.perf_counter()
+        await asyncio.sleep(period)
+        lags.append(max(0.0, time.perf_counter() - started - period))
+
+
+async def run(args) -> dict:
+    import leveling
+
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    if args.render_pool:
+        import render
+        await render.setup(bot)
+    cog = leveling.Leveling(bot)
+    await bot.add_cog(cog)
+
+    guilds = [FakeGuild(guild_id) for guild_id in range(1, args.guilds + 1)]
+    for guild in guilds:
+        cog.store.update_config(guild.id, {"xp_cooldown": args.xp_cooldown})
+
+    rng = random.Random(args.seed)
+
+    def random_member() -> FakeMember:
+        guild = rng.choice(guilds)
+        return guild.member(rng.randrange(1, args.users + 1))
+
+    latencies = {"on_message": [], "rank": [], "leaderboard": []}
+    lags = []
+    tasks = set()
+    process = psutil.Process()
+    write_bytes_before, write_chars_before = io_written(process)
+
+    stop = asyncio.Event()
+    lag_task = asyncio.create_task(sample_loop_lag(lags, stop))
+    started = time.perf_counter()
+    await asyncio.gather(
+        drive(args.rate, args.duration, lambda: cog.on_message(FakeMessage(random_member())), latencies["on_message"], tasks),
+        drive(args.rank_rate, args.duration, lambda: cog._handle_rank(FakeContext(FakeMessage(random_member())), random_member()), latencies["rank"], tasks),
+        drive(args.leaderboard_rate, args.duration, lambda: cog._handle_leaderboard(FakeContext(FakeMessage(random_member()))), latencies["leaderboard"], tasks),
+    )
+    await asyncio.gather(*tasks, return_exceptions=True)
+    elapsed = time.perf_counter() - started
+    stop.set()
+    await lag_task
+
+    # Unloading flushes whatever is still buffered, so it counts towards bytes written
+    await bot.remove_cog("Leveling")
+    if args.render_pool:
+        await bot.remove_cog("RenderService")
+    write_bytes_after, write_chars_after = io_written(process)
+
+    return {
+        "revision": git_revision(),
+        "timestamp": int(time.time()),
+        "params": {
+            "rate": args.rate,
+            "guilds": args.guilds,
+            "users": args.users,
+            "duration": args.duration,
+            "rank_rate": args.rank_rate,
+            "leaderboard_rate": args.leaderboard_rate,
+            "xp_cooldown": args.xp_cooldown,
+            "render_pool": args.render_pool,
+            "seed": args.seed,
+        },
+        "elapsed_s": round(elapsed, 3),
+        "messages_per_s": round(len(latencies["on_message"]) / elapsed, 1),
+        "latency": {name: summarize(samples) for name, samples in latencies.items()},
+        "loop_lag": summarize(lags),
+        "bytes_written": None if write_bytes_before is None else write_bytes_after - write_bytes_before,
+        "chars_written": None if write_chars_before is None else write_chars_after - write_chars_before,
+        "data_dir_bytes": directory_size("data"),
+        "level_up_messages": sum(guild.channel.sent for guild in guilds),
+        "peak_rss_mb": round(peak_rss_bytes() / 1024 / 1024, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline load test for the leveling cog")
+    parser.add_argument("--rate", type=float, default=500, help="Messages per second")
+    parser.add_argument("--guilds", type=int, default=20, help="Number of guilds")
+    parser.add_argument("--users", type=int, default=5_000, help="Users per guild")
+    parser.add_argument("--duration", type=float, default=30, help="Seconds to run")
+    parser.add_argument("--rank-rate", type=float, default=2, help="/rank calls per second")
+    parser.add_argument("--leaderboard-rate", type=float, default=2, help="/leaderboard calls per second")
+    parser.add_argument("--xp-cooldown", type=int, default=60, help="xp_cooldown set on every guild")
+    parser.add_argument("--render-pool", action="store_true", help="Load the RenderService process pool")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    parser.add_argument("--output", default=None, help="JSON results file (default: leveling_load-<rev>.json)")
+    args = parser.parse_args()
+
+    output = os.path.abspath(args.output or f"leveling_load-{git_revision()}.json")
+    # leveling creates data/ and fonts/ in the working directory on import
+    os.chdir(tempfile.mkdtemp(prefix="sentinel-bench-"))
+
+    results = asyncio.run(run(args))
+    with open(output, "w") as f:
+        json.dump(results, f, indent=4)
+
+    print(f"{results['messages_per_s']:,} msg/s over {results['elapsed_s']}s (rev {results['revision']})")
+    for name, stats in results["latency"].items():
+        print(f"  {name:<12} n={stats['count']:<7,} p50 {stats['p50_ms']:>8.3f} ms  p99 {stats['p99_ms']:>8.3f} ms")
+    lag = results["loop_lag"]
+    print(f"  loop lag     p50 {lag['p50_ms']:.3f} ms  p99 {lag['p99_ms']:.3f} ms  max {lag['max_ms']:.3f} ms")
+    print(f"  written      {results['bytes_written']} bytes to disk, {results['data_dir_bytes']:,} bytes in data/")
+    print(f"  peak RSS     {results['peak_rss_mb']} MiB")
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
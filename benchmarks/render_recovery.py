@@ -0,0 +1,89 @@
+# benchmarks/render_recovery.py
+# Crash-recovery check for the RenderService process pool.
+#
+#   python benchmarks/render_recovery.py [--workers 2] [--in-flight 8] [--after 16] [--rounds 5]
+#
+# Each round submits a job that kills its worker, then `--in-flight` slow jobs
+# queued behind it, so they all fail with BrokenProcessPool at once. As soon as the
+# pool breaks, `--after` new jobs are submitted while the failed jobs are still
+# unwinding, so they land on the replacement pool.
+#
+# Exits non-zero unless:
+#   - every job submitted after the restart completed with its result,
+#   - the pool was replaced exactly once per crash.
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from concurrent.futures.process import BrokenProcessPool
+
+import discord
+from discord.ext import commands
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+
+async def crash_round(render_service, args) -> dict:
+    restarts = render_service.stats["pool_restarts"]
+    pool = render_service._pool
+    # Plain stdlib callables: workers never import this script
+    doomed = [asyncio.create_task(render_service.run(os._exit, 1))]
+    doomed += [asyncio.create_task(render_service.run(time.sleep, 0.2)) for _ in range(args.in_flight)]
+
+    # Submitted as soon as the pool is broken, before the failed jobs have been handled
+    while not pool._broken and render_service._pool is pool:
+        await asyncio.sleep(0)
+    after = [asyncio.create_task(render_service.run(pow, 2, index)) for index in range(args.after)]
+
+    doomed_results = await asyncio.gather(*doomed, return_exceptions=True)
+    after_results = await asyncio.gather(*after, return_exceptions=True)
+    return {
+        "broken": sum(isinstance(result, BrokenProcessPool) for result in doomed_results),
+        "completed_after": sum(result == 2 ** index for index, result in enumerate(after_results)),
+        "errors_after": [type(result).__name__ for result in after_results if isinstance(result, BaseException)],
+        "restarts": render_service.stats["pool_restarts"] - restarts
+    }
+
+
+async def run(args) -> bool:
+    import render
+    render.RENDER_WORKERS = args.workers
+    render.RENDER_QUEUE_LIMIT = args.in_flight + args.after + 1
+
+    bot = commands.Bot(command_prefix="!", intents=discord.Intents.none())
+    await render.setup(bot)
+    render_service = bot.get_cog("RenderService")
+    ok = True
+    try:
+        for round_no in range(1, args.rounds + 1):
+            result = await crash_round(render_service, args)
+            round_ok = result["completed_after"] == args.after and result["restarts"] == 1
+            ok = ok and round_ok
+            print(
+                f"round {round_no}: {result['broken']} broken, {result['completed_after']}/{args.after} "
+                f"completed after restart, {result['restarts']} restart(s)"
+                + (f", errors: {', '.join(result['errors_after'])}" if result["errors_after"] else "")
+            )
+    finally:
+        await bot.remove_cog("RenderService")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Crash-recovery check for the render pool")
+    parser.add_argument("--workers", type=int, default=2, help="Pool size")
+    parser.add_argument("--in-flight", type=int, default=8, help="Jobs queued when the worker dies")
+    parser.add_argument("--after", type=int, default=16, help="Jobs submitted right after the restart")
+    parser.add_argument("--rounds", type=int, default=5, help="Crashes to survive")
+    args = parser.parse_args()
+
+    ok = asyncio.run(run(args))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,235 @@
+# benchmarks/role_sync.py
+# Throughput test for the leveling cog's level role sync (LevelRoleReconciler).
+#
+#   python benchmarks/role_sync.py [--guilds 2] [--members 100000] [--changed 0.01]
+#                                  [--latency 0.1] [--route-limit 20] [--global-limit 50]
+#                                  [--seed 1]
+#
+# Each fake guild has `--members` members with random levels and one level role;
+# a `--changed` share of them have the wrong roles. A sync job is started in
+# every guild at once. Member edits take `--latency` seconds and go through a
+# fake Discord that allows `--route-limit` edits per second per guild and
+# `--global-limit` requests per second overall, answering anything above that
+# with a 429 and Retry-After, like the real API.
+#
+# Reports edits/s, 429s and wall time per guild, and exits non-zero unless every
+# member ends up with exactly the roles their level calls for.
+#
+# Data is written to a throwaway directory.
+
+import argparse
+import asyncio
+import os
+import random
+import sys
+import tempfile
+import time
+from collections import defaultdict
+
+import discord
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, REPO_ROOT)
+
+ROLE_LEVEL = 10
+
+
+# --- Fake Discord API: fixed one-second windows per route and globally ---
+class FakeResponse:
+    def __init__(self, retry_after: float, is_global: bool):
+        self.status = 429
+        self.reason = "Too Many Requests"
+        self.headers = {"Retry-After": f"{retry_after:.3f}", "X-RateLimit-Global": "true" if is_global else "false"}
+
+
+class FakeDiscord:
+    def __init__(self, route_limit: int, global_limit: int, latency: float):
+        self.route_limit = route_limit
+        self.global_limit = global_limit
+        self.latency = latency
+        self.windows = defaultdict(lambda: [0.0, 0])
+        self.rate_limited = defaultdict(int)
+        self.edits = defaultdict(int)
+
+    def _take(self, key, limit: int) -> float:
+        """0 if the request fits in `key`'s window, else the seconds until it resets."""
+        now = time.monotonic()
+        window = self.windows[key]
+        if now - window[0] >= 1.0:
+            window[0], window[1] = now, 0
+        if window[1] >= limit:
+            return window[0] + 1.0 - now
+        window[1] += 1
+        return 0.0
+
+    async def edit_member(self, guild_id: int):
+        retry_after = self._take("global", self.global_limit)
+        is_global = retry_after > 0
+        if not is_global:
+            retry_after = self._take(guild_id, self.route_limit)
+        if retry_after > 0:
+            self.rate_limited[guild_id] += 1
+            raise discord.HTTPException(FakeResponse(retry_after, is_global), "You are being rate limited.")
+        await asyncio.sleep(self.latency)
+        self.edits[guild_id] += 1
+
+
+# --- Fake discord objects (only what LevelRoleReconciler touches) ---
+class FakeRole:
+    managed = False
+
+    def __init__(self, role_id: int, position: int):
+        self.id = role_id
+        self.position = position
+
+    def is_default(self) -> bool:
+        return self.position == 0
+
+    def __gt__(self, other: "FakeRole") -> bool:
+        return self.position > other.position
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, member_id: int, guild: "FakeGuild", roles):
+        self.id = member_id
+        self.guild = guild
+        self.roles = roles
+
+    async def edit(self, roles, reason=None):
+        await self.guild.api.edit_member(self.guild.id)
+        self.roles = [self.guild.default_role] + list(roles)
+
+
+class FakeMe:
+    def __init__(self, top_role: FakeRole):
+        self.top_role = top_role
+
+
+class FakeGuild:
+    chunked = True
+
+    def __init__(self, guild_id: int, api: FakeDiscord):
+        self.id = guild_id
+        self.api = api
+        self.default_role = FakeRole(guild_id, 0)
+        self.level_role = FakeRole(guild_id * 1000 + 1, 1)
+        self.me = FakeMe(FakeRole(guild_id * 1000 + 2, 2))
+        self.members = []
+
+    def get_role(self, role_id: int):
+        return self.level_role if role_id == self.level_role.id else None
+
+    def get_channel(self, channel_id: int):
+        return None
+
+
+class FakeStore:
+    def __init__(self):
+        self.levels = {}
+
+    def get_config(self, guild_id: int):
+        return {"level_roles": {str(ROLE_LEVEL): guild_id * 1000 + 1}}
+
+    def get_guild_levels(self, guild_id: int):
+        return self.levels[guild_id]
+
+
+class FakeBot:
+    async def wait_until_ready(self):
+        pass
+
+    def get_guild(self, guild_id: int):
+        return None
+
+
+class FakeCog:
+    def __init__(self):
+        self.bot = FakeBot()
+        self.store = FakeStore()
+
+
+def build_guild(guild_id: int, args, api: FakeDiscord, store: FakeStore, rng: random.Random) -> FakeGuild:
+    guild = FakeGuild(guild_id, api)
+    levels = store.levels[guild_id] = {}
+    for index in range(args.members):
+        member_id = guild_id * 10_000_000 + index + 1
+        level = rng.randint(0, 2 * ROLE_LEVEL)
+        has_role = level >= ROLE_LEVEL
+        if rng.random() < args.changed:
+            has_role = not has_role
+        roles = [guild.default_role] + ([guild.level_role] if has_role else [])
+        guild.members.append(FakeMember(member_id, guild, roles))
+        levels[str(member_id)] = {"level": level}
+    return guild
+
+
+def wrong_roles(guild: FakeGuild, store: FakeStore) -> int:
+    wrong = 0
+    for member in guild.members:
+        wanted = store.levels[guild.id][str(member.id)]["level"] >= ROLE_LEVEL
+        if (guild.level_role in member.roles) != wanted:
+            wrong += 1
+    return wrong
+
+
+async def run(args) -> bool:
+    import leveling
+
+    rng = random.Random(args.seed)
+    api = FakeDiscord(args.route_limit, args.global_limit, args.latency)
+    cog = FakeCog()
+    guilds = [build_guild(guild_id, args, api, cog.store, rng) for guild_id in range(1, args.guilds + 1)]
+    needed = {guild.id: args.members - sum(
+        (guild.level_role in member.roles) == (cog.store.levels[guild.id][str(member.id)]["level"] >= ROLE_LEVEL)
+        for member in guild.members
+    ) for guild in guilds}
+
+    reconciler = leveling.LevelRoleReconciler(cog)
+    started = time.perf_counter()
+    finished = {}
+    for guild in guilds:
+        reconciler.schedule(guild)
+        reconciler._tasks[guild.id].add_done_callback(
+            lambda _, guild_id=guild.id: finished.setdefault(guild_id, time.perf_counter() - started)
+        )
+    await asyncio.gather(*list(reconciler._tasks.values()))
+    elapsed = time.perf_counter() - started
+
+    ok = True
+    for guild in guilds:
+        wrong = wrong_roles(guild, cog.store)
+        ok = ok and wrong == 0
+        seconds = finished[guild.id]
+        print(
+            f"guild {guild.id}: {args.members:,} members, {needed[guild.id]:,} needed edits, "
+            f"{api.edits[guild.id]:,} edits in {seconds:.1f}s ({api.edits[guild.id] / seconds:.1f}/s), "
+            f"{api.rate_limited[guild.id]:,} 429s, {wrong:,} still wrong"
+        )
+    total_edits = sum(api.edits.values())
+    print(f"total: {total_edits:,} edits in {elapsed:.1f}s ({total_edits / elapsed:.1f}/s), {sum(api.rate_limited.values()):,} 429s")
+    return ok
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Throughput test for level role sync")
+    parser.add_argument("--guilds", type=int, default=2, help="Guilds syncing at the same time")
+    parser.add_argument("--members", type=int, default=100_000, help="Members per guild")
+    parser.add_argument("--changed", type=float, default=0.01, help="Share of members whose roles are wrong")
+    parser.add_argument("--latency", type=float, default=0.1, help="Seconds per member edit")
+    parser.add_argument("--route-limit", type=int, default=20, help="Fake Discord: edits per second per guild")
+    parser.add_argument("--global-limit", type=int, default=50, help="Fake Discord: requests per second overall")
+    parser.add_argument("--seed", type=int, default=1, help="Random seed")
+    args = parser.parse_args()
+
+    # leveling creates data/ and fonts/ in the working directory on import
+    os.chdir(tempfile.mkdtemp(prefix="sentinel-bench-"))
+
+    ok = asyncio.run(run(args))
+    print("PASS" if ok else "FAIL")
+    sys.exit(0 if ok else 1)
+
+
+if __name__ == "__main__":
+    main()
@@ -4,6 +4,10 @@ from discord import app_commands
 import random
 import aiohttp
 from typing import Optional
+try:
+    from .webclient import http_session
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from webclient import http_session
 
 class FunGames(commands.Cog):
     def __init__(self, bot):
@@ -137,7 +141,7 @@ class FunGames(commands.Cog):
     async def joke(self, ctx: commands.Context):
         await ctx.defer()
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session(self.bot) as session:
                 async with session.get("https://official-joke-api.appspot.com/random_joke") as resp:
                     if resp.status == 200:
                         data = await resp.json()
@@ -161,7 +165,7 @@ class FunGames(commands.Cog):
     async def dadjoke(self, ctx: commands.Context):
         await ctx.defer()
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session(self.bot) as session:
                 headers = {"Accept": "application/json"}
                 async with session.get("https://icanhazdadjoke.com/", headers=headers) as resp:
                     if resp.status == 200:
@@ -185,7 +189,7 @@ class FunGames(commands.Cog):
         await ctx.defer()
         subreddits = ["memes", "dankmemes", "me_irl", "wholesomememes"]
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session(self.bot) as session:
                 url = f"https://meme-api.com/gimme/{random.choice(subreddits)}"
                 async with session.get(url) as resp:
                     if resp.status == 200:
@@ -208,7 +212,7 @@ class FunGames(commands.Cog):
     async def fact(self, ctx: commands.Context):
         await ctx.defer()
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session(self.bot) as session:
                 async with session.get("https://uselessfacts.jsph.pl/api/v2/facts/random") as resp:
                     if resp.status == 200:
                         data = await resp.json()
@@ -231,7 +235,7 @@ class FunGames(commands.Cog):
     async def quote(self, ctx: commands.Context):
         await ctx.defer()
         try:
-            async with aiohttp.ClientSession() as session:
+            async with http_session(self.bot) as session:
                 async with session.get("https://api.quotable.io/random") as resp:
                     if resp.status == 200:
                         data = await resp.json()
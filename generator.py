@@ -7,9 +7,24 @@ import json
 import aiofiles
 import random
 import asyncio
-from datetime import datetime, timedelta
-from typing import Optional, Literal, List, Union, cast, Dict, Any
+import shutil
+import heapq
+import hashlib
+import functools
+import zlib
+import bz2
+import lzma
+import aiohttp
+from datetime import datetime, timedelta, timezone
+from typing import Optional, Literal, List, Tuple, Union, cast, Dict, Any, Callable, Awaitable
 import time
+import itertools
+from collections import deque
+import bisect
+try:
+    from .webclient import TokenBucket, http_session
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from webclient import TokenBucket, http_session
 
 # --- Configuration and File Setup (Multi-Server) ---
 
@@ -20,6 +35,8 @@ GLOBAL_STATS_FILE = os.path.join(DATA_DIR, "global_stats.json")
 GLOBAL_BLACKLIST_FILE = os.path.join(DATA_DIR, "global_blacklist.json")
 GLOBAL_COOLDOWNS_FILE = os.path.join(DATA_DIR, "global_cooldowns.json")
 STOCK_BASE_FOLDER = os.path.join(DATA_DIR, "Stock")
+# Bot-wide settings shared with the other Sentinel cogs (only dm_fallback is read here)
+SENTINEL_CONFIG_FILE = "sentinel_config.json"
 
 os.makedirs(STOCK_BASE_FOLDER, exist_ok=True)
 os.makedirs(DATA_DIR, exist_ok=True)
@@ -62,16 +79,30 @@ async def save_json(filepath: str, data: Any):
     async with aiofiles.open(filepath, 'w') as f:
         await f.write(json.dumps(data, indent=4))
 
+# Guild configs, read from GLOBAL_CONFIG_FILE on first use and kept in sync by update_guild_config
+_guild_configs: Optional[Dict[str, Dict[str, Any]]] = None
+
+async def _load_guild_configs() -> Dict[str, Dict[str, Any]]:
+    global _guild_configs
+    if _guild_configs is None:
+        _guild_configs = await load_json(GLOBAL_CONFIG_FILE, {})
+    return _guild_configs
+
+def invalidate_guild_configs():
+    """Drops the cached configs so the next lookup re-reads GLOBAL_CONFIG_FILE."""
+    global _guild_configs
+    _guild_configs = None
+
 async def load_guild_config(guild_id: int) -> Dict[str, Any]:
-    global_config = await load_json(GLOBAL_CONFIG_FILE, {})
+    global_config = await _load_guild_configs()
     guild_id_str = str(guild_id)
     if guild_id_str not in global_config:
+        # Defaults live in memory only until the guild changes a setting
         global_config[guild_id_str] = DEFAULT_GUILD_CONFIG.copy()
-        await save_json(GLOBAL_CONFIG_FILE, global_config)
     return global_config[guild_id_str]
 
 async def update_guild_config(guild_id: int, key: str, value: Any):
-    global_config = await load_json(GLOBAL_CONFIG_FILE, {})
+    global_config = await _load_guild_configs()
     guild_id_str = str(guild_id)
     if guild_id_str not in global_config:
         global_config[guild_id_str] = DEFAULT_GUILD_CONFIG.copy()
@@ -93,27 +124,730 @@ async def load_blacklist() -> List[int]:
 async def update_blacklist(blacklist: List[int]):
     await save_json(GLOBAL_BLACKLIST_FILE, blacklist)
 
-async def load_cooldowns() -> Dict[str, Any]:
-    cooldowns = await load_json(GLOBAL_COOLDOWNS_FILE, {})
-    # Cleanup expired cooldowns on load
-    current_time = time.time()
-    valid_cooldowns = {}
-    for user_id, data in cooldowns.items():
-        new_data = {
-            service: expiry for service, expiry in data.items() if expiry > current_time
+def write_file_atomic(filepath: str, content: str):
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w') as f:
+        f.write(content)
+    os.replace(tmp_path, filepath)
+
+# Seconds between writes of batched generation counters to GLOBAL_STATS_FILE
+STATS_FLUSH_INTERVAL = 10
+
+def merge_stats_file(counts: Dict[str, int]):
+    """Adds `counts` to GLOBAL_STATS_FILE (blocking; run in a thread from the event loop)."""
+    try:
+        with open(GLOBAL_STATS_FILE, 'r') as f:
+            stats = json.load(f)
+    except (OSError, json.JSONDecodeError):
+        stats = {}
+    for service, count in counts.items():
+        stats[service] = stats.get(service, 0) + count
+    write_file_atomic(GLOBAL_STATS_FILE, json.dumps(stats, indent=4))
+
+
+# --- Change Notifications ---
+
+# Seconds between stat() checks of the watched data files
+DATA_WATCH_INTERVAL = 5
+
+class ChangeBus:
+    """
+    In-process invalidations. Topics are the data file paths: whoever writes a
+    file publishes its path, and every subscriber to it reloads what it derives
+    from that file.
+    """
+
+    def __init__(self):
+        self._handlers: Dict[str, List[Callable[[], Awaitable[None]]]] = {}
+
+    def subscribe(self, topic: str, handler: Callable[[], Awaitable[None]]):
+        self._handlers.setdefault(topic, []).append(handler)
+
+    async def publish(self, topic: str):
+        for handler in self._handlers.get(topic, []):
+            try:
+                await handler()
+            except Exception as e:
+                print(f"Change handler error for {topic}: {e}")
+
+class FileWatcher:
+    """
+    Publishes a file's path on the bus when it is edited outside the bot.
+    Files are compared by (mtime, size, inode), so a check is one stat() and
+    nothing is read unless it changed. Publishing a path also re-records its
+    signature, so the bot's own writes are not seen again as outside edits.
+    """
+
+    def __init__(self, bus: ChangeBus):
+        self.bus = bus
+        self._signatures: Dict[str, Optional[Tuple[int, int, int]]] = {}
+
+    @staticmethod
+    def _signature(path: str) -> Optional[Tuple[int, int, int]]:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def watch(self, path: str):
+        """Starts watching `path`, or re-records its signature if already watched."""
+        if path not in self._signatures:
+            # Watch before subscribing anything else, so the signature is current before anyone reloads
+            self.bus.subscribe(path, functools.partial(self._seen, path))
+        self._signatures[path] = self._signature(path)
+
+    async def _seen(self, path: str):
+        self._signatures[path] = self._signature(path)
+
+    async def check(self):
+        changed = [path for path, signature in self._signatures.items() if self._signature(path) != signature]
+        for path in changed:
+            await self.bus.publish(path)
+
+# --- Cooldown Table ---
+
+# Seconds between snapshots of GLOBAL_COOLDOWNS_FILE (written only when something changed)
+COOLDOWN_SNAPSHOT_INTERVAL = 30
+
+class CooldownTable:
+    """
+    {user_id: {service: expiry}} kept in memory, plus a min-heap of expiries so
+    expired entries are swept in O(log n) each. GLOBAL_COOLDOWNS_FILE is only a
+    snapshot: read once at startup, rewritten periodically.
+    """
+
+    def __init__(self):
+        self.entries: Dict[str, Dict[str, float]] = {}
+        self._expiries: List[Tuple[float, str, str]] = []
+        self.loaded = False
+        self.dirty = False
+
+    def _set(self, user_id: str, service: str, expiry: float):
+        self.entries.setdefault(user_id, {})[service] = expiry
+        heapq.heappush(self._expiries, (expiry, user_id, service))
+
+    def load(self, data: Dict[str, Dict[str, float]], now: float):
+        for user_id, services in data.items():
+            for service, expiry in services.items():
+                # Keep anything set in memory before the snapshot was read
+                if expiry > now and expiry > self.expiry(user_id, service):
+                    self._set(str(user_id), service, expiry)
+        self.loaded = True
+
+    def expiry(self, user_id: Union[int, str], service: str) -> float:
+        """When the user's cooldown for `service` ends (0 if none)."""
+        return self.entries.get(str(user_id), {}).get(service, 0)
+
+    def set(self, user_id: Union[int, str], service: str, expiry: float):
+        self._set(str(user_id), service, expiry)
+        self.dirty = True
+
+    def clear(self, user_id: Union[int, str], service: str, expiry: float):
+        """Undoes set(user_id, service, expiry), unless a later set() replaced it."""
+        services = self.entries.get(str(user_id))
+        if services is not None and services.get(service) == expiry:
+            # The heap entry stays; sweep() skips it
+            del services[service]
+            if not services:
+                del self.entries[str(user_id)]
+            self.dirty = True
+
+    def sweep(self, now: float):
+        while self._expiries and self._expiries[0][0] <= now:
+            expiry, user_id, service = heapq.heappop(self._expiries)
+            services = self.entries.get(user_id)
+            # Skip heap entries superseded by a later set()
+            if services is not None and services.get(service) == expiry:
+                del services[service]
+                if not services:
+                    del self.entries[user_id]
+
+    def snapshot(self) -> Optional[str]:
+        """JSON for GLOBAL_COOLDOWNS_FILE, or None if nothing changed since the last one."""
+        if not self.dirty:
+            return None
+        self.dirty = False
+        return json.dumps(self.entries, indent=4)
+
+# --- Stock Queues (O(1) dispense / restock) ---
+
+# Dispensed bytes at the front of a stock file before it is worth rewriting
+STOCK_COMPACT_MIN_BYTES = 1024 * 1024
+STOCK_COMPACT_INTERVAL = 300 # seconds
+
+class StockQueue:
+    """
+    One service's stock file, consumed from a persisted head offset.
+
+    Accounts are handed out in two steps: `reserve()` takes the next line without
+    consuming it, then `commit()` consumes it (after delivery) or `release()` puts it
+    back for the next caller. Every line covers the byte range [start, end) of the
+    file, and ranges tile the file from the head onwards. The head only advances over
+    committed ranges; ranges committed out of order are saved with it as `skip` so a
+    restart neither re-dispenses them nor loses reserved-but-undelivered accounts.
+
+    Restocking appends. Dispensed lines stay at the front of the file until `compact()`.
+    Duplicate checks use `index`, a count per account hash of everything still in
+    stock (reserved included), built on first use and kept current from then on.
+    `available` counts unreserved stock the same way; the head file stores it with the
+    file size, so a restart only recounts when the file changed behind our back.
+    Not thread-safe: StockStore runs one operation per service at a time.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.head_path = f"{path}.head"
+        self.lock = asyncio.Lock()
+        # Bumped when offsets stop meaning what they did (reset / compaction), invalidating old tokens
+        self.generation = 0
+        self.head = 0
+        self.committed: Dict[int, int] = {} # start -> end, committed beyond the head
+        self.available: Optional[int] = None # Accounts in stock and not reserved; None until counted
+        self._load_head()
+        self.cursor = self.head # Next unread byte
+        self.reserved: Dict[int, Tuple[int, str]] = {} # start -> (end, account)
+        self.released: List[Tuple[int, int, str]] = [] # heap of (start, end, account), served first
+        self.index: Optional[Dict[bytes, int]] = None # account hash -> copies in stock
+
+    def _load_head(self):
+        try:
+            with open(self.head_path, 'r') as f:
+                state = json.load(f)
+            stat = os.stat(self.path)
+        except (OSError, ValueError):
+            return
+        # A different file (replaced by hand, or compacted right before a crash) starts from the top
+        if state.get("inode") != stat.st_ino or state.get("offset", 0) > stat.st_size:
+            return
+        self.head = state.get("offset", 0)
+        self.committed = {start: end for start, end in state.get("skip", [])}
+        if state.get("size") == stat.st_size and isinstance(state.get("count"), int):
+            # Reservations do not survive a restart, so the saved count includes them
+            self.available = state["count"]
+
+    @staticmethod
+    def _account_hash(account: str) -> bytes:
+        return hashlib.blake2b(account.encode('utf-8'), digest_size=16).digest()
+
+    def _build_index(self) -> Dict[bytes, int]:
+        if self.index is None:
+            index: Dict[bytes, int] = {}
+            accounts = self.live_lines() + [account for _, account in self.reserved.values()]
+            for account in accounts:
+                key = self._account_hash(account)
+                index[key] = index.get(key, 0) + 1
+            self.index = index
+        return self.index
+
+    def _save_head(self):
+        stat = os.stat(self.path)
+        state: Dict[str, Any] = {
+            "offset": self.head,
+            "inode": stat.st_ino,
+            "skip": sorted(self.committed.items())
         }
-        if new_data:
-            valid_cooldowns[user_id] = new_data
-    await save_json(GLOBAL_COOLDOWNS_FILE, valid_cooldowns)
-    return valid_cooldowns
+        if self.available is not None:
+            state["count"] = self.available + len(self.reserved)
+            state["size"] = stat.st_size
+        tmp_path = f"{self.head_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, self.head_path)
+
+    def count(self) -> int:
+        """Accounts in stock and not reserved. Counts the file once, then stays current."""
+        if self.available is None:
+            self.available = len(self.live_lines())
+        return self.available
+
+    def reserve(self) -> Optional[Tuple[Tuple[int, int], str]]:
+        """
+        (token, account) for the next account, or None when out of stock.
+        Raises FileNotFoundError if the stock file is missing.
+        """
+        if self.released:
+            start, end, account = heapq.heappop(self.released)
+            self.reserved[start] = (end, account)
+            if self.available is not None:
+                self.available -= 1
+            return (self.generation, start), account
+
+        with open(self.path, 'rb') as f:
+            f.seek(self.cursor)
+            start = self.cursor
+            while True:
+                if self.cursor in self.committed:
+                    # Delivered before a restart; skip without handing it out again
+                    self.cursor = self.committed[self.cursor]
+                    f.seek(self.cursor)
+                    start = self.cursor
+                    continue
+                line = f.readline()
+                if not line:
+                    return None
+                self.cursor += len(line)
+                account = line.strip()
+                if account:
+                    # Blank lines before the account belong to its range
+                    account = account.decode('utf-8', errors='replace')
+                    self.reserved[start] = (self.cursor, account)
+                    if self.available is not None:
+                        self.available -= 1
+                    return (self.generation, start), account
+
+    def commit(self, token: Tuple[int, int]):
+        generation, start = token
+        if generation != self.generation or start not in self.reserved:
+            return # Stock was cleared or compacted meanwhile
+        end, account = self.reserved.pop(start)
+        if self.index is not None:
+            key = self._account_hash(account)
+            copies = self.index.get(key, 0) - 1
+            if copies > 0:
+                self.index[key] = copies
+            else:
+                self.index.pop(key, None)
+        self.committed[start] = end
+        while self.head in self.committed:
+            self.head = self.committed.pop(self.head)
+        self._save_head()
+
+    def release(self, token: Tuple[int, int]):
+        generation, start = token
+        if generation != self.generation or start not in self.reserved:
+            return
+        end, account = self.reserved.pop(start)
+        heapq.heappush(self.released, (start, end, account))
+        if self.available is not None:
+            self.available += 1
+
+    def append(self, accounts: List[str]):
+        with open(self.path, 'ab+') as f:
+            size = f.seek(0, os.SEEK_END)
+            prefix = b""
+            if size:
+                # Files edited by hand may lack a final newline
+                f.seek(size - 1)
+                if f.read(1) != b"\n":
+                    prefix = b"\n"
+            f.write(prefix + "".join(f"{account}\n" for account in accounts).encode('utf-8'))
+        if self.index is not None:
+            for account in accounts:
+                key = self._account_hash(account)
+                self.index[key] = self.index.get(key, 0) + 1
+        if self.available is not None:
+            self.available += len(accounts)
+        self._save_head()
+
+    def add_unique(self, accounts: List[str]) -> List[str]:
+        """Appends the accounts not already in stock (or repeated earlier in `accounts`); returns them."""
+        index = self._build_index()
+        added, seen = [], set()
+        for account in accounts:
+            key = self._account_hash(account)
+            if key not in index and key not in seen:
+                seen.add(key)
+                added.append(account)
+        if added:
+            self.append(added)
+        return added
+
+    def live_lines(self) -> List[str]:
+        """Accounts still in stock (not reserved). O(stock size); not used on the dispense path."""
+        lines = [account for _, _, account in sorted(self.released)]
+        try:
+            with open(self.path, 'rb') as f:
+                f.seek(self.cursor)
+                position = skip_until = self.cursor
+                for line in f:
+                    if position >= skip_until and position in self.committed:
+                        # Delivered before a restart
+                        skip_until = self.committed[position]
+                    if position >= skip_until and line.strip():
+                        lines.append(line.strip().decode('utf-8', errors='replace'))
+                    position += len(line)
+        except FileNotFoundError:
+            pass
+        return lines
+
+    def reset(self):
+        """Empties the stock file (creating it if needed)."""
+        with open(self.path, 'wb'):
+            pass
+        self.generation += 1
+        self.head = self.cursor = 0
+        self.committed.clear()
+        self.reserved.clear()
+        self.released.clear()
+        self.index = {}
+        self.available = 0
+        self._save_head()
+
+    def delete(self):
+        self.generation += 1
+        for path in (self.path, self.head_path):
+            if os.path.exists(path):
+                os.remove(path)
+
+    def needs_compact(self) -> bool:
+        # Offsets of in-flight reservations must stay valid, so only compact when idle
+        if self.reserved or self.released or self.committed:
+            return False
+        try:
+            size = os.path.getsize(self.path)
+        except OSError:
+            return False
+        return self.head >= STOCK_COMPACT_MIN_BYTES and self.head * 2 >= size
+
+    def compact(self):
+        """Rewrites the file without its dispensed prefix."""
+        tmp_path = f"{self.path}.compact"
+        with open(self.path, 'rb') as src, open(tmp_path, 'wb') as dst:
+            src.seek(self.head)
+            shutil.copyfileobj(src, dst, 1024 * 1024)
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.replace(tmp_path, self.path)
+        # A crash before this line is caught by the inode check in _load_head
+        self.generation += 1
+        self.cursor -= self.head
+        self.head = 0
+        self._save_head()
+
+class StockStore:
+    """Per-service StockQueues. File work runs in threads, one operation per service at a time."""
+
+    def __init__(self, folder: str):
+        self.folder = folder
+        self.queues: Dict[str, StockQueue] = {}
+
+    def queue(self, service_name: str) -> StockQueue:
+        queue = self.queues.get(service_name)
+        if queue is None:
+            queue = self.queues[service_name] = StockQueue(os.path.join(self.folder, f"{service_name}.txt"))
+        return queue
+
+    async def _run(self, service_name: str, func, *args):
+        queue = self.queue(service_name)
+        async with queue.lock:
+            return await asyncio.to_thread(func, queue, *args)
+
+    async def reserve(self, service_name: str) -> Optional[Tuple[Tuple[int, int], str]]:
+        return await self._run(service_name, StockQueue.reserve)
+
+    async def commit(self, service_name: str, token: Tuple[int, int]):
+        await self._run(service_name, StockQueue.commit, token)
+
+    async def release(self, service_name: str, token: Tuple[int, int]):
+        await self._run(service_name, StockQueue.release, token)
+
+    async def append(self, service_name: str, accounts: List[str]):
+        if accounts:
+            await self._run(service_name, StockQueue.append, accounts)
+
+    async def add_unique(self, service_name: str, accounts: List[str]) -> List[str]:
+        if not accounts:
+            return []
+        return await self._run(service_name, StockQueue.add_unique, accounts)
+
+    async def live_lines(self, service_name: str) -> List[str]:
+        return await self._run(service_name, StockQueue.live_lines)
+
+    async def count(self, service_name: str) -> int:
+        queue = self.queue(service_name)
+        if queue.available is not None:
+            return queue.available
+        return await self._run(service_name, StockQueue.count)
+
+    async def reset(self, service_name: str):
+        await self._run(service_name, StockQueue.reset)
+
+    async def delete(self, service_name: str):
+        await self._run(service_name, StockQueue.delete)
+        self.queues.pop(service_name, None)
+
+    async def compact_due(self):
+        for service_name, queue in list(self.queues.items()):
+            if not queue.needs_compact():
+                continue
+            try:
+                await self._run(service_name, StockQueue.compact)
+            except OSError as e:
+                print(f"Stock compaction error for {service_name}: {e}")
+
+
+# --- Stock File Import ---
+
+STOCK_IMPORT_EXTENSIONS = (".txt", ".gz", ".bz2", ".xz")
+STOCK_IMPORT_READ_BYTES = 64 * 1024 # Per network read
+STOCK_IMPORT_DECODE_BYTES = 4 * 1024 * 1024 # Max decompressed bytes per decode step
+STOCK_IMPORT_MAX_LINE_BYTES = 64 * 1024 # Longer "lines" are dropped as garbage
+STOCK_IMPORT_BATCH_LINES = 50_000 # Accounts per dedupe + append
+STOCK_IMPORT_PROGRESS_INTERVAL = 2.0 # seconds
+STOCK_IMPORT_STALL_SECONDS = 60 # A download that sends nothing for this long is given up
+# Replaces the shared session's total timeout, which would cut off large files mid-download
+STOCK_IMPORT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=STOCK_IMPORT_STALL_SECONDS)
+
+class StockFileDecoder:
+    """
+    Turns a stock file's bytes into account lines, decompressing .gz/.bz2/.xz
+    incrementally (concatenated streams included). Each step() yields at most
+    STOCK_IMPORT_DECODE_BYTES of output, so memory stays bounded no matter how
+    well the input compresses. Call step() while `has_output`, then feed() more.
+    """
+
+    def __init__(self, filename: str):
+        name = filename.lower()
+        self._factory = None
+        self._zlib = name.endswith(".gz")
+        if self._zlib:
+            self._factory = lambda: zlib.decompressobj(wbits=47) # gzip or zlib header
+        elif name.endswith(".bz2"):
+            self._factory = bz2.BZ2Decompressor
+        elif name.endswith(".xz"):
+            self._factory = lzma.LZMADecompressor
+        self._decompressor = self._factory() if self._factory else None
+        self._input = b"" # Bytes not yet handed to the decompressor
+        self._partial = b"" # Unterminated last line
+        self._first = True
+        self.skipped = 0
+
+    def feed(self, data: bytes):
+        self._input += data
+
+    @property
+    def has_output(self) -> bool:
+        if self._input:
+            return True
+        # bz2/lzma buffer input internally; zlib keeps it in unconsumed_tail (self._input)
+        return self._decompressor is not None and not self._zlib and not self._decompressor.needs_input
+
+    def _decompress(self) -> bytes:
+        decompressor = self._decompressor
+        if decompressor is None:
+            data, self._input = self._input, b""
+            return data
+        data = decompressor.decompress(self._input, STOCK_IMPORT_DECODE_BYTES)
+        self._input = getattr(decompressor, "unconsumed_tail", b"")
+        if decompressor.eof:
+            # Next member of a concatenated file starts in unused_data
+            self._input = decompressor.unused_data + self._input
+            self._decompressor = self._factory()
+        return data
+
+    def _lines(self, pieces: List[bytes]) -> List[str]:
+        lines = []
+        for piece in pieces:
+            if len(piece) > STOCK_IMPORT_MAX_LINE_BYTES:
+                self.skipped += 1
+                continue
+            account = piece.strip()
+            if self._first:
+                account = account.lstrip(b"\xef\xbb\xbf") # UTF-8 BOM
+                self._first = False
+            if account:
+                lines.append(account.decode('utf-8', errors='replace'))
+        return lines
+
+    def step(self) -> List[str]:
+        """Decodes the next block and returns its complete, non-empty lines."""
+        pieces = (self._partial + self._decompress()).split(b"\n")
+        self._partial = pieces.pop()
+        if len(self._partial) > STOCK_IMPORT_MAX_LINE_BYTES:
+            self.skipped += 1
+            self._partial = b""
+        return self._lines(pieces)
+
+    def finish(self) -> List[str]:
+        """The last line, if the file did not end with a newline."""
+        pieces, self._partial = [self._partial], b""
+        return self._lines(pieces)
+
+
+# --- DM Delivery Queue ---
+
+DM_WORKERS = 4
+DM_RATE = 10.0 # DMs started per second, across all workers
+DM_BURST = 20
+DM_MAX_ATTEMPTS = 4
+DM_RETRY_BASE = 1.0 # seconds; retry n waits a random time up to DM_RETRY_BASE * 2**n
+DM_LATENCY_SAMPLES = 500 # Kept per service for the stats command
+
+# Delivery outcomes
+DM_SENT = "sent"
+DM_CLOSED = "closed" # The user does not accept DMs from the bot
+DM_FAILED = "failed"
+
+async def load_dm_fallback() -> bool:
+    """settings.dm_fallback from SENTINEL_CONFIG_FILE (on when the file or key is missing)."""
+    try:
+        async with aiofiles.open(SENTINEL_CONFIG_FILE, 'r') as f:
+            config = json.loads(await f.read())
+        return bool(config.get("settings", {}).get("dm_fallback", True))
+    except (OSError, json.JSONDecodeError, AttributeError):
+        return True
+
+class DMDelivery:
+    __slots__ = ("service", "user", "embed", "future", "queued_at", "attempts")
+
+    def __init__(self, service: str, user: discord.abc.User, embed: discord.Embed, future: asyncio.Future):
+        self.service = service
+        self.user = user
+        self.embed = embed
+        self.future = future
+        self.queued_at = time.monotonic()
+        self.attempts = 0
+
+class DMQueue:
+    """
+    Sends generator DMs from a small worker pool rather than from each command's task.
+    Workers share one TokenBucket, so a rush after a restock is spread out instead of
+    hitting Discord's limits all at once. A 429 pauses the whole bucket for Retry-After;
+    server and connection errors are retried with jittered exponential backoff.
+    Callers await `deliver()` for the outcome.
+    """
+
+    def __init__(self, workers: int, rate: float, burst: int):
+        self.worker_count = workers
+        self.bucket = TokenBucket(rate, burst)
+        self._queue: "asyncio.Queue[DMDelivery]" = asyncio.Queue()
+        self._workers: List[asyncio.Task] = []
+        self._waiting: Dict[DMDelivery, asyncio.TimerHandle] = {} # Backing off before a retry
+        self.depth: Dict[str, int] = {} # service -> deliveries not finished yet
+        self.latencies: Dict[str, deque] = {} # service -> recent queued-to-sent seconds
+        self.stats: Dict[str, int] = {DM_SENT: 0, DM_CLOSED: 0, DM_FAILED: 0, "retried": 0, "rate_limited": 0}
+
+    async def deliver(self, service: str, user: discord.abc.User, embed: discord.Embed) -> str:
+        """DMs `embed` to `user`; returns DM_SENT, DM_CLOSED or DM_FAILED."""
+        if not self._workers:
+            self._workers = [asyncio.create_task(self._work()) for _ in range(self.worker_count)]
+        job = DMDelivery(service, user, embed, asyncio.get_running_loop().create_future())
+        self.depth[service] = self.depth.get(service, 0) + 1
+        self._queue.put_nowait(job)
+        try:
+            return await job.future
+        finally:
+            self.depth[service] -= 1
+            if not self.depth[service]:
+                del self.depth[service]
+
+    def stop(self):
+        """Cancels the workers and fails everything still queued, so reservations are released."""
+        for task in self._workers:
+            task.cancel()
+        self._workers = []
+        jobs = list(self._waiting)
+        for handle in self._waiting.values():
+            handle.cancel()
+        self._waiting.clear()
+        while not self._queue.empty():
+            jobs.append(self._queue.get_nowait())
+        for job in jobs:
+            self._finish(job, DM_FAILED)
+
+    def _finish(self, job: DMDelivery, outcome: str):
+        if job.future.done():
+            return # The caller gave up (cancelled)
+        self.stats[outcome] += 1
+        if outcome == DM_SENT:
+            samples = self.latencies.get(job.service)
+            if samples is None:
+                samples = self.latencies[job.service] = deque(maxlen=DM_LATENCY_SAMPLES)
+            samples.append(time.monotonic() - job.queued_at)
+        job.future.set_result(outcome)
+
+    def _retry(self, job: DMDelivery, delay: Optional[float] = None):
+        if job.attempts >= DM_MAX_ATTEMPTS:
+            return self._finish(job, DM_FAILED)
+        self.stats["retried"] += 1
+        if delay is None:
+            delay = random.uniform(0, DM_RETRY_BASE * 2 ** job.attempts)
+        self._waiting[job] = asyncio.get_running_loop().call_later(delay, self._requeue, job)
+
+    def _requeue(self, job: DMDelivery):
+        self._waiting.pop(job, None)
+        self._queue.put_nowait(job)
+
+    @staticmethod
+    def _retry_after(error: discord.HTTPException) -> float:
+        try:
+            return float(error.response.headers.get("Retry-After", 1))
+        except (AttributeError, TypeError, ValueError):
+            return 1.0
+
+    async def _work(self):
+        while True:
+            job = await self._queue.get()
+            if job.future.done():
+                continue
+            try:
+                await self.bucket.acquire()
+                job.attempts += 1
+                await job.user.send(embed=job.embed)
+            except asyncio.CancelledError:
+                self._finish(job, DM_FAILED)
+                raise
+            except discord.Forbidden:
+                self._finish(job, DM_CLOSED)
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    # discord.py already waited out the route's own limit; back everyone off
+                    self.stats["rate_limited"] += 1
+                    self.bucket.pause(self._retry_after(e))
+                    self._retry(job, 0)
+                elif e.status >= 500:
+                    self._retry(job)
+                else:
+                    self._finish(job, DM_FAILED)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError):
+                self._retry(job)
+            except Exception as e:
+                print(f"DM delivery error: {e}")
+                self._finish(job, DM_FAILED)
+            else:
+                self._finish(job, DM_SENT)
+
+    def service_stats(self) -> List[Tuple[str, int, List[float]]]:
+        """(service, depth, sorted latencies) for every service with queued or recent DMs, deepest first."""
+        services = set(self.depth) | set(self.latencies)
+        rows = [(service, self.depth.get(service, 0), sorted(self.latencies.get(service, ()))) for service in services]
+        rows.sort(key=lambda row: (-row[1], row[0]))
+        return rows
+
+
+def is_app_owner():
+    """Slash-command counterpart of commands.is_owner()."""
+    async def predicate(interaction: discord.Interaction) -> bool:
+        return await interaction.client.is_owner(interaction.user)
+    return app_commands.check(predicate)
+
+
+class ServiceNameIndex:
+    """Service names sorted case-insensitively, for prefix lookups without a full scan."""
+
+    def __init__(self):
+        self._names: List[Tuple[str, str]] = []
+
+    def rebuild(self, names):
+        self._names = sorted((name.lower(), name) for name in names)
+
+    def add(self, name: str):
+        bisect.insort(self._names, (name.lower(), name))
 
-async def update_cooldown(user_id: int, service: str, expiry_time: float):
-    cooldowns = await load_cooldowns()
-    user_id_str = str(user_id)
-    if user_id_str not in cooldowns:
-        cooldowns[user_id_str] = {}
-    cooldowns[user_id_str][service] = expiry_time
-    await save_json(GLOBAL_COOLDOWNS_FILE, cooldowns)
+    def remove(self, name: str):
+        entry = (name.lower(), name)
+        index = bisect.bisect_left(self._names, entry)
+        if index < len(self._names) and self._names[index] == entry:
+            del self._names[index]
+
+    def prefix(self, prefix: str, limit: int = 25) -> List[str]:
+        """Up to `limit` names starting with `prefix` (any case), in alphabetical order."""
+        prefix = prefix.lower()
+        start = bisect.bisect_left(self._names, (prefix,))
+        # Matches are contiguous from `start`, so the first `limit` entries hold all we can return
+        matches = itertools.takewhile(lambda entry: entry[0].startswith(prefix), self._names[start:start + limit])
+        return [name for _, name in matches]
 
 
 # --- Cog Implementation ---
@@ -121,28 +855,117 @@ class Generator(commands.Cog):
     def __init__(self, bot: commands.Bot):
         self.bot = bot
         self.services: Dict[str, Any] = {}
+        self.service_index = ServiceNameIndex()
         self.blacklist: List[int] = []
-        self.cooldowns: Dict[str, Any] = {}
+        self.global_config: Dict[str, Any] = DEFAULT_GLOBAL_CONFIG.copy()
+        self.cooldowns = CooldownTable()
+        # Generations per service not yet added to GLOBAL_STATS_FILE
+        self.pending_stats: Dict[str, int] = {}
+        self.stock = StockStore(STOCK_BASE_FOLDER)
+        self.dm_queue = DMQueue(DM_WORKERS, DM_RATE, DM_BURST)
+        self.dm_fallback = True
+        self.changes = ChangeBus()
+        self.watcher = FileWatcher(self.changes)
+        for path in (GLOBAL_SERVICES_FILE, GLOBAL_BLACKLIST_FILE, GLOBAL_CONFIG_FILE, SENTINEL_CONFIG_FILE):
+            self.watcher.watch(path)
+        # load_global_config reads GLOBAL_SERVICES_FILE as well
+        self.changes.subscribe(GLOBAL_SERVICES_FILE, self._reload_services)
+        self.changes.subscribe(GLOBAL_BLACKLIST_FILE, self._reload_blacklist)
+        self.changes.subscribe(GLOBAL_CONFIG_FILE, self._reload_guild_configs)
+        self.changes.subscribe(SENTINEL_CONFIG_FILE, self._reload_dm_fallback)
         self.bg_task = self.load_data_task.start()
+        self.compact_stock_task.start()
+        self.cooldown_snapshot_task.start()
+        self.stats_flush_task.start()
 
     def cog_unload(self):
         self.bg_task.cancel()
-
-    @tasks.loop(minutes=5)
+        self.watch_data_task.cancel()
+        self.dm_queue.stop()
+        self.compact_stock_task.cancel()
+        self.cooldown_snapshot_task.cancel()
+        self.stats_flush_task.cancel()
+        if self.pending_stats:
+            merge_stats_file(self.pending_stats)
+            self.pending_stats = {}
+        snapshot = self.cooldowns.snapshot()
+        if snapshot is not None:
+            write_file_atomic(GLOBAL_COOLDOWNS_FILE, snapshot)
+
+    @tasks.loop(count=1)
     async def load_data_task(self):
-        """Background task to periodically load and refresh all generator data."""
+        """Loads all generator data once; later changes arrive through self.changes."""
+        await self._reload_services()
+        await self._reload_blacklist()
+        await self._reload_dm_fallback()
+        if not self.cooldowns.loaded:
+            # Memory is authoritative afterwards; the file is only a snapshot of it
+            self.cooldowns.load(await load_json(GLOBAL_COOLDOWNS_FILE, {}), time.time())
+        # load_json creates missing files; record them so they don't count as edits
+        for path in (GLOBAL_SERVICES_FILE, GLOBAL_BLACKLIST_FILE):
+            self.watcher.watch(path)
+        self.watch_data_task.start()
+
+    @tasks.loop(seconds=DATA_WATCH_INTERVAL)
+    async def watch_data_task(self):
+        """Picks up data files edited outside the bot."""
+        await self.watcher.check()
+
+    async def _reload_services(self):
         self.services = await load_json(GLOBAL_SERVICES_FILE, {})
-        self.blacklist = await load_blacklist()
-        self.cooldowns = await load_cooldowns()
+        self.service_index.rebuild(self.services.keys())
         self.global_config = await load_global_config()
 
+    async def _reload_blacklist(self):
+        self.blacklist = await load_blacklist()
+
+    async def _reload_guild_configs(self):
+        invalidate_guild_configs()
+
+    async def _reload_dm_fallback(self):
+        self.dm_fallback = await load_dm_fallback()
+
+    @tasks.loop(seconds=STOCK_COMPACT_INTERVAL)
+    async def compact_stock_task(self):
+        """Drops dispensed lines from the front of large stock files."""
+        await self.stock.compact_due()
+
+    @tasks.loop(seconds=COOLDOWN_SNAPSHOT_INTERVAL)
+    async def cooldown_snapshot_task(self):
+        """Sweeps expired cooldowns and saves the table if it changed."""
+        self.cooldowns.sweep(time.time())
+        snapshot = self.cooldowns.snapshot()
+        if snapshot is None:
+            return
+        try:
+            await asyncio.to_thread(write_file_atomic, GLOBAL_COOLDOWNS_FILE, snapshot)
+        except OSError as e:
+            self.cooldowns.dirty = True
+            print(f"Cooldown snapshot error: {e}")
+
+    @tasks.loop(seconds=STATS_FLUSH_INTERVAL)
+    async def stats_flush_task(self):
+        await self.flush_stats()
+
+    async def flush_stats(self):
+        """Writes the batched generation counters to GLOBAL_STATS_FILE."""
+        if not self.pending_stats:
+            return
+        pending, self.pending_stats = self.pending_stats, {}
+        try:
+            await asyncio.to_thread(merge_stats_file, pending)
+        except OSError as e:
+            # Put them back for the next flush
+            for service, count in pending.items():
+                self.pending_stats[service] = self.pending_stats.get(service, 0) + count
+            print(f"Stats flush error: {e}")
+
     # --- Autocomplete for Service Names ---
     async def service_autocomplete(self, interaction: discord.Interaction, current: str) -> List[app_commands.Choice[str]]:
-        choices = []
-        for service_name in self.services.keys():
-            if current.lower() in service_name.lower():
-                choices.append(app_commands.Choice(name=service_name, value=service_name))
-        return choices[:25]
+        return [
+            app_commands.Choice(name=service_name, value=service_name)
+            for service_name in self.service_index.prefix(current)
+        ]
 
     # --- Core Generation Logic (Helper) ---
     async def _handle_generation(self, source, service_name: str, tier: Literal['free', 'premium', 'booster']):
@@ -205,12 +1028,9 @@ class Generator(commands.Cog):
             return
 
         # Check Cooldown
-        cooldown_key = str(user.id)
-        service_key = service_name
         cooldown_seconds = self.global_config.get(f'{tier}_cooldown_seconds', 60 if tier == 'free' else 30)
         
-        user_cooldowns = self.cooldowns.get(cooldown_key, {})
-        last_use = user_cooldowns.get(service_key, 0)
+        last_use = self.cooldowns.expiry(user.id, service_name)
         
         time_left = last_use - time.time()
         
@@ -225,17 +1045,19 @@ class Generator(commands.Cog):
             else: await interaction.followup.send(embed=embed, ephemeral=True)
             return
 
+        # Start the cooldown before the first await, so parallel requests from this user
+        # see it; rolled back below if no account is delivered
+        cooldown_expiry = time.time() + cooldown_seconds
+        self.cooldowns.set(user.id, service_name, cooldown_expiry)
+
         # --- Generation Logic ---
         
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
+        delivered = False
         try:
-            async with aiofiles.open(stock_file_path, mode='r') as f:
-                lines = await f.readlines()
-            
-            lines = [line.strip() for line in lines if line.strip()]
+            # Hold one account; it is only consumed once the DM has gone out
+            reservation = await self.stock.reserve(service_name)
 
-            if not lines:
+            if reservation is None:
                 embed = discord.Embed(
                     title="⚠️ Out of Stock", 
                     description=f"The `{service_name}` service is currently out of stock.", 
@@ -244,21 +1066,7 @@ class Generator(commands.Cog):
                 if ctx: await ctx.reply(embed=embed)
                 else: await interaction.followup.send(embed=embed, ephemeral=True)
                 return
-
-            # Get one account and remove it
-            account = lines.pop(0)
-
-            async with aiofiles.open(stock_file_path, mode='w') as f:
-                await f.write('\n'.join(lines) + '\n')
-                
-            # Update stats
-            stats = await load_json(GLOBAL_STATS_FILE, {})
-            stats[service_name] = stats.get(service_name, 0) + 1
-            await save_json(GLOBAL_STATS_FILE, stats)
-
-            # Set Cooldown
-            await update_cooldown(user.id, service_name, time.time() + cooldown_seconds)
-            self.cooldowns = await load_cooldowns() # Refresh local copy
+            token, account = reservation
 
             # --- Success Response ---
             success_embed = discord.Embed(
@@ -271,22 +1079,49 @@ class Generator(commands.Cog):
                 title=f"🔒 Your Generated {service_name} Account",
                 description=f"**Service:** `{service_name}`\n**Account:** ```{account}```",
                 color=discord.Color.blue(),
-                timestamp=datetime.now(tz=datetime.timezone.utc)
+                timestamp=datetime.now(tz=timezone.utc)
             )
             dm_embed.set_footer(text=f"Generated by {guild.name} | Cooldown: {cooldown_seconds}s")
             
             try:
-                await user.send(embed=dm_embed)
-                if ctx: await ctx.reply(embed=success_embed, ephemeral=True)
-                else: await interaction.followup.send(embed=success_embed, ephemeral=True)
-            except discord.Forbidden:
-                fail_embed = discord.Embed(
-                    title="❌ Generation Failed",
-                    description="Could not send you the account. Please enable your DMs for this server.",
-                    color=discord.Color.red()
-                )
-                if ctx: await ctx.reply(embed=fail_embed)
-                else: await interaction.followup.send(embed=fail_embed, ephemeral=True)
+                # Sent by the DM queue's workers, which pace DMs under Discord's rate limits
+                outcome = await self.dm_queue.deliver(service_name, user, dm_embed)
+                if outcome == DM_SENT:
+                    delivered = True
+                elif outcome == DM_CLOSED and interaction and self.dm_fallback:
+                    # Only the user can see an ephemeral followup, so it can stand in for the DM
+                    await interaction.followup.send(embed=dm_embed, ephemeral=True)
+                    delivered = True
+                    success_embed.description = f"You generated a `{service_name}` account. Your DMs are closed, so it was sent here instead."
+                else:
+                    if outcome == DM_CLOSED:
+                        description = "Could not send you the account. Please enable your DMs for this server."
+                        if self.dm_fallback:
+                            description += " You can also use the slash command to receive it privately here."
+                    else:
+                        description = "Could not send you the account right now. Please try again in a moment."
+                    fail_embed = discord.Embed(
+                        title="❌ Generation Failed",
+                        description=description,
+                        color=discord.Color.red()
+                    )
+                    if ctx: await ctx.reply(embed=fail_embed)
+                    else: await interaction.followup.send(embed=fail_embed, ephemeral=True)
+            finally:
+                # Undelivered accounts go back to the front of the queue
+                if delivered:
+                    await self.stock.commit(service_name, token)
+                else:
+                    await self.stock.release(service_name, token)
+
+            if not delivered:
+                return
+
+            # Update stats (in memory; written by stats_flush_task)
+            self.pending_stats[service_name] = self.pending_stats.get(service_name, 0) + 1
+
+            if ctx: await ctx.reply(embed=success_embed, ephemeral=True)
+            else: await interaction.followup.send(embed=success_embed, ephemeral=True)
             
         except FileNotFoundError:
             embed = discord.Embed(
@@ -305,43 +1140,46 @@ class Generator(commands.Cog):
             )
             if ctx: await ctx.reply(embed=error_embed)
             else: await interaction.followup.send(embed=error_embed, ephemeral=True)
+        finally:
+            if not delivered:
+                self.cooldowns.clear(user.id, service_name, cooldown_expiry)
 
     # =========================================================================
-# GENERATOR CORE COMMANDS (FREE, PREMIUM, BOOSTER)
-# =========================================================================
-
-# --- FREE GENERATOR ---
-@commands.command(name="fgen", description="Generate a free account from a service")
-@commands.cooldown(1, 5, commands.BucketType.user)
-async def freegen_prefix(self, ctx: commands.Context, service_name: str):
-    await self._handle_generation(ctx, service_name, 'free')
-        
-@app_commands.command(name="fgen", description="Generate a free account from a service")
-@app_commands.autocomplete(service_name=service_autocomplete)
-async def freegen_slash(self, interaction, service_name: str):
-    await self._handle_generation(interaction, service_name, 'free')
-
-# --- PREMIUM GENERATOR ---
-@commands.command(name="pgen", description="Generate a premium account from a service")
-@commands.cooldown(1, 5, commands.BucketType.user)
-async def premiumgen_prefix(self, ctx: commands.Context, service_name: str):
-    await self._handle_generation(ctx, service_name, 'premium')
-
-@app_commands.command(name="pgen", description="Generate a premium account from a service")
-@app_commands.autocomplete(service_name=service_autocomplete)
-async def premiumgen_slash(self, interaction, service_name: str):
-    await self._handle_generation(interaction, service_name, 'premium')
-
-# --- BOOSTER GENERATOR ---
-@commands.command(name="bgen", description="Generate a booster account from a service")
-@commands.cooldown(1, 5, commands.BucketType.user)
-async def boostergen_prefix(self, ctx: commands.Context, service_name: str):
-    await self._handle_generation(ctx, service_name, 'booster')
-        
-@app_commands.command(name="bgen", description="Generate a booster account from a service")
-@app_commands.autocomplete(service_name=service_autocomplete)
-async def boostergen_slash(self, interaction, service_name: str):
-    await self._handle_generation(interaction, service_name, 'booster')
+    # GENERATOR CORE COMMANDS (FREE, PREMIUM, BOOSTER)
+    # =========================================================================
+
+    # --- FREE GENERATOR ---
+    @commands.command(name="fgen", description="Generate a free account from a service")
+    @commands.cooldown(1, 5, commands.BucketType.user)
+    async def freegen_prefix(self, ctx: commands.Context, service_name: str):
+        await self._handle_generation(ctx, service_name, 'free')
+
+    @app_commands.command(name="fgen", description="Generate a free account from a service")
+    @app_commands.autocomplete(service_name=service_autocomplete)
+    async def freegen_slash(self, interaction, service_name: str):
+        await self._handle_generation(interaction, service_name, 'free')
+
+    # --- PREMIUM GENERATOR ---
+    @commands.command(name="pgen", description="Generate a premium account from a service")
+    @commands.cooldown(1, 5, commands.BucketType.user)
+    async def premiumgen_prefix(self, ctx: commands.Context, service_name: str):
+        await self._handle_generation(ctx, service_name, 'premium')
+
+    @app_commands.command(name="pgen", description="Generate a premium account from a service")
+    @app_commands.autocomplete(service_name=service_autocomplete)
+    async def premiumgen_slash(self, interaction, service_name: str):
+        await self._handle_generation(interaction, service_name, 'premium')
+
+    # --- BOOSTER GENERATOR ---
+    @commands.command(name="bgen", description="Generate a booster account from a service")
+    @commands.cooldown(1, 5, commands.BucketType.user)
+    async def boostergen_prefix(self, ctx: commands.Context, service_name: str):
+        await self._handle_generation(ctx, service_name, 'booster')
+
+    @app_commands.command(name="bgen", description="Generate a booster account from a service")
+    @app_commands.autocomplete(service_name=service_autocomplete)
+    async def boostergen_slash(self, interaction, service_name: str):
+        await self._handle_generation(interaction, service_name, 'booster')
 
     # =========================================================================
     # CONFIGURATION COMMANDS
@@ -371,6 +1209,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             return await ctx.reply(f"❌ Invalid setting key. Available keys: `{', '.join(DEFAULT_GUILD_CONFIG.keys())}`")
 
         await update_guild_config(ctx.guild.id, key, config_value)
+        await self.changes.publish(GLOBAL_CONFIG_FILE)
         
         # Display feedback
         display_value = f"<#{config_value}>" if 'channel' in key and config_value else \
@@ -412,6 +1251,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             config_value = value
 
         await update_guild_config(interaction.guild_id, key, config_value)
+        await self.changes.publish(GLOBAL_CONFIG_FILE)
         
         # Display feedback
         display_value = f"<#{config_value}>" if 'channel' in key and config_value else \
@@ -437,29 +1277,29 @@ async def boostergen_slash(self, interaction, service_name: str):
             return await ctx.reply(f"❌ Service `{service_name}` already exists.")
             
         self.services[service_name] = {"usage": 0}
+        self.service_index.add(service_name)
         await save_json(GLOBAL_SERVICES_FILE, self.services)
+        await self.changes.publish(GLOBAL_SERVICES_FILE)
         
         # Create the corresponding stock file
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        async with aiofiles.open(stock_file_path, mode='w') as f:
-            await f.write('')
+        await self.stock.reset(service_name)
 
         await ctx.reply(f"✅ Service `{service_name}` has been added and stock file created.")
 
     # --- ADD SERVICE (Slash) ---
     @app_commands.command(name="stockaddservice", description="Add a new service name to the generator")
-    @app_commands.is_owner()
+    @is_app_owner()
     async def stockaddservice_slash(self, interaction: discord.Interaction, service_name: str):
         if service_name in self.services:
             return await interaction.response.send_message(f"❌ Service `{service_name}` already exists.", ephemeral=True)
             
         self.services[service_name] = {"usage": 0}
+        self.service_index.add(service_name)
         await save_json(GLOBAL_SERVICES_FILE, self.services)
+        await self.changes.publish(GLOBAL_SERVICES_FILE)
         
         # Create the corresponding stock file
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        async with aiofiles.open(stock_file_path, mode='w') as f:
-            await f.write('')
+        await self.stock.reset(service_name)
 
         await interaction.response.send_message(f"✅ Service `{service_name}` has been added and stock file created.", ephemeral=True)
 
@@ -472,30 +1312,30 @@ async def boostergen_slash(self, interaction, service_name: str):
             return await ctx.reply(f"❌ Service `{service_name}` does not exist.")
             
         del self.services[service_name]
+        self.service_index.remove(service_name)
         await save_json(GLOBAL_SERVICES_FILE, self.services)
+        await self.changes.publish(GLOBAL_SERVICES_FILE)
         
         # Delete the corresponding stock file
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        if os.path.exists(stock_file_path):
-            os.remove(stock_file_path)
+        await self.stock.delete(service_name)
 
         await ctx.reply(f"✅ Service `{service_name}` has been removed.")
 
     # --- REMOVE SERVICE (Slash) ---
     @app_commands.command(name="stockremoveservice", description="Remove a service name from the generator")
     @app_commands.autocomplete(service_name=service_autocomplete)
-    @app_commands.is_owner()
+    @is_app_owner()
     async def stockremoveservice_slash(self, interaction: discord.Interaction, service_name: str):
         if service_name not in self.services:
             return await interaction.response.send_message(f"❌ Service `{service_name}` does not exist.", ephemeral=True)
             
         del self.services[service_name]
+        self.service_index.remove(service_name)
         await save_json(GLOBAL_SERVICES_FILE, self.services)
+        await self.changes.publish(GLOBAL_SERVICES_FILE)
         
         # Delete the corresponding stock file
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        if os.path.exists(stock_file_path):
-            os.remove(stock_file_path)
+        await self.stock.delete(service_name)
 
         await interaction.response.send_message(f"✅ Service `{service_name}` has been removed.", ephemeral=True)
 
@@ -507,28 +1347,16 @@ async def boostergen_slash(self, interaction, service_name: str):
         if service_name not in self.services:
             return await ctx.reply(f"❌ Service `{service_name}` does not exist.")
             
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
         # Ensure only unique, non-empty lines are added
         new_lines = [line.strip() for line in accounts.split('\n') if line.strip()]
         
         try:
-            async with aiofiles.open(stock_file_path, mode='a+') as f:
-                # Read existing lines to prevent duplicates
-                await f.seek(0)
-                existing_lines = [line.strip() for line in (await f.readlines()) if line.strip()]
-                
-                lines_to_add = []
-                for line in new_lines:
-                    if line not in existing_lines:
-                        lines_to_add.append(line)
-                        
-                # Append unique lines
-                if lines_to_add:
-                    await f.write('\n'.join(lines_to_add) + '\n')
-                    await ctx.reply(f"✅ Added **{len(lines_to_add)}** unique accounts to `{service_name}` stock.")
-                else:
-                    await ctx.reply(f"⚠️ No unique accounts were added to `{service_name}` stock.")
+            # Append unique lines (duplicates of accounts still in stock are skipped)
+            lines_to_add = await self.stock.add_unique(service_name, new_lines)
+            if lines_to_add:
+                await ctx.reply(f"✅ Added **{len(lines_to_add)}** unique accounts to `{service_name}` stock.")
+            else:
+                await ctx.reply(f"⚠️ No unique accounts were added to `{service_name}` stock.")
                     
         except Exception as e:
             await ctx.reply(f"❌ An error occurred while updating stock: {e}")
@@ -536,35 +1364,23 @@ async def boostergen_slash(self, interaction, service_name: str):
     # --- ADD/UPDATE STOCK (Slash) ---
     @app_commands.command(name="stockupdate", description="Add new accounts to a service stock (one account per line)")
     @app_commands.autocomplete(service_name=service_autocomplete)
-    @app_commands.is_owner()
+    @is_app_owner()
     async def stockupdate_slash(self, interaction: discord.Interaction, service_name: str, accounts: str):
         await interaction.response.defer(ephemeral=True)
 
         if service_name not in self.services:
             return await interaction.followup.send(f"❌ Service `{service_name}` does not exist.", ephemeral=True)
             
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
         # Ensure only unique, non-empty lines are added
         new_lines = [line.strip() for line in accounts.split('\n') if line.strip()]
         
         try:
-            async with aiofiles.open(stock_file_path, mode='a+') as f:
-                # Read existing lines to prevent duplicates
-                await f.seek(0)
-                existing_lines = [line.strip() for line in (await f.readlines()) if line.strip()]
-                
-                lines_to_add = []
-                for line in new_lines:
-                    if line and line not in existing_lines:
-                        lines_to_add.append(line)
-                        
-                # Append unique lines
-                if lines_to_add:
-                    await f.write('\n'.join(lines_to_add) + '\n')
-                    await interaction.followup.send(f"✅ Added **{len(lines_to_add)}** unique accounts to `{service_name}` stock.", ephemeral=True)
-                else:
-                    await interaction.followup.send(f"⚠️ No unique accounts were added to `{service_name}` stock.", ephemeral=True)
+            # Append unique lines (duplicates of accounts still in stock are skipped)
+            lines_to_add = await self.stock.add_unique(service_name, new_lines)
+            if lines_to_add:
+                await interaction.followup.send(f"✅ Added **{len(lines_to_add)}** unique accounts to `{service_name}` stock.", ephemeral=True)
+            else:
+                await interaction.followup.send(f"⚠️ No unique accounts were added to `{service_name}` stock.", ephemeral=True)
                     
         except Exception as e:
             await interaction.followup.send(f"❌ An error occurred while updating stock: {e}", ephemeral=True)
@@ -577,17 +1393,14 @@ async def boostergen_slash(self, interaction, service_name: str):
         if service_name not in self.services:
             return await ctx.reply(f"❌ Service `{service_name}` does not exist.")
 
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
         try:
+            if not os.path.exists(self.stock.queue(service_name).path):
+                raise FileNotFoundError(service_name)
             # Check current stock size before clearing
-            async with aiofiles.open(stock_file_path, mode='r') as f:
-                lines = await f.readlines()
-            count = len([line for line in lines if line.strip()])
+            count = await self.stock.count(service_name)
             
-            # Clear the file by opening in write mode and writing nothing
-            async with aiofiles.open(stock_file_path, mode='w') as f:
-                await f.write('')
+            # Clear the file
+            await self.stock.reset(service_name)
 
             await ctx.reply(f"✅ Cleared **{count}** accounts from `{service_name}` stock.")
         except FileNotFoundError:
@@ -598,22 +1411,19 @@ async def boostergen_slash(self, interaction, service_name: str):
     # --- CLEAR STOCK (Slash) ---
     @app_commands.command(name="stockclear", description="Clear all accounts from a service stock")
     @app_commands.autocomplete(service_name=service_autocomplete)
-    @app_commands.is_owner()
+    @is_app_owner()
     async def stockclear_slash(self, interaction: discord.Interaction, service_name: str):
         if service_name not in self.services:
             return await interaction.response.send_message(f"❌ Service `{service_name}` does not exist.", ephemeral=True)
 
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
         try:
+            if not os.path.exists(self.stock.queue(service_name).path):
+                raise FileNotFoundError(service_name)
             # Check current stock size before clearing
-            async with aiofiles.open(stock_file_path, mode='r') as f:
-                lines = await f.readlines()
-            count = len([line for line in lines if line.strip()])
+            count = await self.stock.count(service_name)
             
-            # Clear the file by opening in write mode and writing nothing
-            async with aiofiles.open(stock_file_path, mode='w') as f:
-                await f.write('')
+            # Clear the file
+            await self.stock.reset(service_name)
 
             await interaction.response.send_message(f"✅ Cleared **{count}** accounts from `{service_name}` stock.", ephemeral=True)
         except FileNotFoundError:
@@ -622,18 +1432,9 @@ async def boostergen_slash(self, interaction, service_name: str):
             await interaction.response.send_message(f"❌ An error occurred while clearing stock: {e}", ephemeral=True)
 
 
-    # --- BULK RESTOCK (Prefix) ---
-    @commands.command(name="stockrefill", description="Bulk restock multiple services (Format: service:account|service2:account2)")
-    @commands.is_owner()
-    async def stockrefill_prefix(self, ctx: commands.Context, *, accounts: str):
-        restocked_count = {}
-        
-        # Split into service:account pairs
-        pairs = [p.strip() for p in accounts.split('|') if p.strip()]
-        
-        if not pairs:
-            return await ctx.reply("⚠️ Invalid format. Use `service:account|service2:account2|...`")
-            
+    async def _restock_pairs(self, pairs: List[str]) -> Dict[str, int]:
+        """Adds `service:account` pairs, grouped so each service is deduplicated and appended once."""
+        by_service: Dict[str, List[str]] = {}
         for pair in pairs:
             if ':' not in pair:
                 continue
@@ -644,21 +1445,30 @@ async def boostergen_slash(self, interaction, service_name: str):
             
             if service_name not in self.services or not account:
                 continue
+            by_service.setdefault(service_name, []).append(account)
 
-            stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-            
+        restocked_count = {}
+        for service_name, service_accounts in by_service.items():
             try:
-                async with aiofiles.open(stock_file_path, mode='a+') as f:
-                    # Check for duplicates (simplified approach for restock - assumes no existing duplicates check needed for speed)
-                    await f.seek(0)
-                    existing_lines = [line.strip() for line in (await f.readlines()) if line.strip()]
-                    
-                    if account not in existing_lines:
-                        await f.write(account + '\n')
-                        restocked_count[service_name] = restocked_count.get(service_name, 0) + 1
-                        
+                # Duplicates of accounts still in stock are skipped
+                added = await self.stock.add_unique(service_name, service_accounts)
+                if added:
+                    restocked_count[service_name] = len(added)
             except Exception as e:
                 print(f"Restock error for {service_name}: {e}")
+        return restocked_count
+
+    # --- BULK RESTOCK (Prefix) ---
+    @commands.command(name="stockrefill", description="Bulk restock multiple services (Format: service:account|service2:account2)")
+    @commands.is_owner()
+    async def stockrefill_prefix(self, ctx: commands.Context, *, accounts: str):
+        # Split into service:account pairs
+        pairs = [p.strip() for p in accounts.split('|') if p.strip()]
+        
+        if not pairs:
+            return await ctx.reply("⚠️ Invalid format. Use `service:account|service2:account2|...`")
+            
+        restocked_count = await self._restock_pairs(pairs)
                 
         if restocked_count:
             summary = "\n".join([f"**{name}**: +{count}" for name, count in restocked_count.items()])
@@ -673,42 +1483,16 @@ async def boostergen_slash(self, interaction, service_name: str):
 
     # --- BULK RESTOCK (Slash) ---
     @app_commands.command(name="stockrefill", description="Bulk restock multiple services (Format: service:account|service2:account2)")
-    @app_commands.is_owner()
+    @is_app_owner()
     async def stockrefill_slash(self, interaction: discord.Interaction, accounts: str):
         await interaction.response.defer(ephemeral=True)
-        restocked_count = {}
-        
         # Split into service:account pairs
         pairs = [p.strip() for p in accounts.split('|') if p.strip()]
         
         if not pairs:
             return await interaction.followup.send("⚠️ Invalid format. Use `service:account|service2:account2|...`", ephemeral=True)
             
-        for pair in pairs:
-            if ':' not in pair:
-                continue
-                
-            service_name, account = pair.split(':', 1)
-            service_name = service_name.strip()
-            account = account.strip()
-            
-            if service_name not in self.services or not account:
-                continue
-
-            stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-            
-            try:
-                async with aiofiles.open(stock_file_path, mode='a+') as f:
-                    # Check for duplicates (simplified approach for restock)
-                    await f.seek(0)
-                    existing_lines = [line.strip() for line in (await f.readlines()) if line.strip()]
-                    
-                    if account not in existing_lines:
-                        await f.write(account + '\n')
-                        restocked_count[service_name] = restocked_count.get(service_name, 0) + 1
-                        
-            except Exception as e:
-                print(f"Restock error for {service_name}: {e}")
+        restocked_count = await self._restock_pairs(pairs)
                 
         if restocked_count:
             summary = "\n".join([f"**{name}**: +{count}" for name, count in restocked_count.items()])
@@ -722,6 +1506,93 @@ async def boostergen_slash(self, interaction, service_name: str):
             await interaction.followup.send("⚠️ No valid accounts were restocked.", ephemeral=True)
 
 
+    # --- IMPORT STOCK FROM FILE (Unified Handler) ---
+    async def _handle_stock_import(self, source, service_name: str, attachment: Optional[discord.Attachment]):
+        if isinstance(source, commands.Context):
+            async def respond(message: str):
+                return await source.reply(message)
+        else:
+            await source.response.defer(ephemeral=True)
+            async def respond(message: str):
+                return await source.followup.send(message, ephemeral=True, wait=True)
+
+        if service_name not in self.services:
+            return await respond(f"❌ Service `{service_name}` does not exist.")
+        if attachment is None or not attachment.filename.lower().endswith(STOCK_IMPORT_EXTENSIONS):
+            return await respond(f"❌ Attach a stock file (`{'`, `'.join(STOCK_IMPORT_EXTENSIONS)}`), one account per line.")
+
+        status = await respond(f"⏳ Importing `{attachment.filename}` into `{service_name}`...")
+        decoder = StockFileDecoder(attachment.filename)
+        started = time.monotonic()
+        last_report = started
+        read_bytes = added = duplicates = 0
+        batch: List[str] = []
+        error: Optional[str] = None
+
+        async def flush_batch():
+            nonlocal batch, added, duplicates
+            if batch:
+                new_accounts = await self.stock.add_unique(service_name, batch)
+                added += len(new_accounts)
+                duplicates += len(batch) - len(new_accounts)
+                batch = []
+
+        try:
+            async with http_session(self.bot) as session:
+                async with session.get(attachment.url, timeout=STOCK_IMPORT_TIMEOUT) as response:
+                    if response.status != 200:
+                        raise ValueError(f"Download failed (HTTP {response.status}).")
+                    async for chunk in response.content.iter_chunked(STOCK_IMPORT_READ_BYTES):
+                        read_bytes += len(chunk)
+                        decoder.feed(chunk)
+                        while decoder.has_output:
+                            # Decompression and splitting are CPU work; keep them off the event loop
+                            batch.extend(await asyncio.to_thread(decoder.step))
+                            if len(batch) >= STOCK_IMPORT_BATCH_LINES:
+                                await flush_batch()
+
+                        if time.monotonic() - last_report >= STOCK_IMPORT_PROGRESS_INTERVAL:
+                            last_report = time.monotonic()
+                            percent = read_bytes / attachment.size * 100 if attachment.size else 0
+                            try:
+                                await status.edit(content=f"⏳ Importing `{attachment.filename}` into `{service_name}`... **{percent:.0f}%** ({added:,} added, {duplicates:,} duplicates)")
+                            except discord.HTTPException:
+                                pass
+            batch.extend(decoder.finish())
+        except asyncio.TimeoutError:
+            # Also raised for aiohttp's socket timeouts, usually with an empty message
+            error = f"the download stalled (no data for {STOCK_IMPORT_STALL_SECONDS}s or the connection could not be made)."
+        except (aiohttp.ClientError, zlib.error, lzma.LZMAError, OSError, EOFError, ValueError) as e:
+            # bz2 reports corrupt data as OSError
+            error = str(e) or type(e).__name__
+        await flush_batch()
+
+        elapsed = time.monotonic() - started
+        if error is not None:
+            message = f"❌ Import stopped: {error}\nAdded **{added:,}** accounts to `{service_name}` before stopping ({duplicates:,} duplicates skipped)."
+        else:
+            message = f"✅ Added **{added:,}** accounts to `{service_name}` in {elapsed:.1f}s ({duplicates:,} duplicates, {decoder.skipped:,} invalid lines skipped)."
+        try:
+            await status.edit(content=message)
+        except discord.HTTPException:
+            await respond(message)
+
+    # --- IMPORT STOCK FROM FILE (Prefix) ---
+    @commands.command(name="stockimport", description="Add accounts to a service from an attached file (.txt, .gz, .bz2, .xz)")
+    @commands.is_owner()
+    async def stockimport_prefix(self, ctx: commands.Context, service_name: str):
+        attachment = ctx.message.attachments[0] if ctx.message.attachments else None
+        await self._handle_stock_import(ctx, service_name, attachment)
+
+    # --- IMPORT STOCK FROM FILE (Slash) ---
+    @app_commands.command(name="stockimport", description="Add accounts to a service from a file (.txt, .gz, .bz2, .xz)")
+    @app_commands.autocomplete(service_name=service_autocomplete)
+    @app_commands.describe(service_name="The service to add accounts to", attachment="Text file with one account per line (optionally compressed)")
+    @is_app_owner()
+    async def stockimport_slash(self, interaction: discord.Interaction, service_name: str, attachment: discord.Attachment):
+        await self._handle_stock_import(interaction, service_name, attachment)
+
+
     # --- CHECK STOCK (Prefix) ---
     @commands.command(name="stockview", description="View the current stock level for a specific service")
     @commands.is_owner()
@@ -729,12 +1600,10 @@ async def boostergen_slash(self, interaction, service_name: str):
         if service_name not in self.services:
             return await ctx.reply(f"❌ Service `{service_name}` does not exist.")
 
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
         try:
-            async with aiofiles.open(stock_file_path, mode='r') as f:
-                lines = await f.readlines()
-            count = len([line for line in lines if line.strip()])
+            if not os.path.exists(self.stock.queue(service_name).path):
+                raise FileNotFoundError(service_name)
+            count = await self.stock.count(service_name)
             
             embed = discord.Embed(
                 title=f"📊 Stock for `{service_name}`",
@@ -750,17 +1619,15 @@ async def boostergen_slash(self, interaction, service_name: str):
     # --- CHECK STOCK (Slash) ---
     @app_commands.command(name="stockview", description="View the current stock level for a specific service")
     @app_commands.autocomplete(service_name=service_autocomplete)
-    @app_commands.is_owner()
+    @is_app_owner()
     async def stockview_slash(self, interaction: discord.Interaction, service_name: str):
         if service_name not in self.services:
             return await interaction.response.send_message(f"❌ Service `{service_name}` does not exist.", ephemeral=True)
 
-        stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-        
         try:
-            async with aiofiles.open(stock_file_path, mode='r') as f:
-                lines = await f.readlines()
-            count = len([line for line in lines if line.strip()])
+            if not os.path.exists(self.stock.queue(service_name).path):
+                raise FileNotFoundError(service_name)
+            count = await self.stock.count(service_name)
             
             embed = discord.Embed(
                 title=f"📊 Stock for `{service_name}`",
@@ -798,7 +1665,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             config_value = value
             
         await update_global_config(key, config_value)
-        self.global_config = await load_global_config() # Refresh local copy
+        await self.changes.publish(GLOBAL_SERVICES_FILE)
 
         embed = discord.Embed(
             title="🌐 Global Settings Updated",
@@ -808,7 +1675,7 @@ async def boostergen_slash(self, interaction, service_name: str):
         await ctx.reply(embed=embed)
 
     @app_commands.command(name="globalconfig", description="Set global generator settings")
-    @app_commands.is_owner()
+    @is_app_owner()
     @app_commands.describe(key="The global setting key", value="The value for the setting")
     async def globalconfig_slash(self, interaction: discord.Interaction, key: str, value: str):
         key = key.lower()
@@ -827,7 +1694,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             config_value = value
             
         await update_global_config(key, config_value)
-        self.global_config = await load_global_config() # Refresh local copy
+        await self.changes.publish(GLOBAL_SERVICES_FILE)
 
         embed = discord.Embed(
             title="🌐 Global Settings Updated",
@@ -851,6 +1718,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             
         self.blacklist.append(member.id)
         await update_blacklist(self.blacklist)
+        await self.changes.publish(GLOBAL_BLACKLIST_FILE)
         
         embed = discord.Embed(
             title="🚫 User Blacklisted",
@@ -867,6 +1735,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             
         self.blacklist.remove(member.id)
         await update_blacklist(self.blacklist)
+        await self.changes.publish(GLOBAL_BLACKLIST_FILE)
         
         embed = discord.Embed(
             title="✅ Blacklist Removed",
@@ -895,7 +1764,7 @@ async def boostergen_slash(self, interaction, service_name: str):
 
     # --- BLACKLIST COMMAND (Slash) ---
     @app_commands.command(name="modblacklist", description="Manage the generator blacklist")
-    @app_commands.is_owner()
+    @is_app_owner()
     @app_commands.describe(
         action="The action to perform: add, remove, or list",
         member="The user to add or remove (required for add/remove)",
@@ -932,6 +1801,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             
             self.blacklist.append(member.id)
             await update_blacklist(self.blacklist)
+            await self.changes.publish(GLOBAL_BLACKLIST_FILE)
             
             embed = discord.Embed(
                 title="🚫 User Blacklisted",
@@ -947,6 +1817,7 @@ async def boostergen_slash(self, interaction, service_name: str):
             
             self.blacklist.remove(member.id)
             await update_blacklist(self.blacklist)
+            await self.changes.publish(GLOBAL_BLACKLIST_FILE)
             
             embed = discord.Embed(
                 title="✅ Blacklist Removed",
@@ -964,6 +1835,7 @@ async def boostergen_slash(self, interaction, service_name: str):
     @commands.command(name="viewstats", description="View global generation statistics")
     @commands.is_owner()
     async def viewstats_prefix(self, ctx: commands.Context):
+        await self.flush_stats()
         stats = await load_json(GLOBAL_STATS_FILE, {})
         
         if not stats:
@@ -981,8 +1853,9 @@ async def boostergen_slash(self, interaction, service_name: str):
         await ctx.reply(embed=embed)
 
     @app_commands.command(name="viewstats", description="View global generation statistics")
-    @app_commands.is_owner()
+    @is_app_owner()
     async def viewstats_slash(self, interaction: discord.Interaction):
+        await self.flush_stats()
         stats = await load_json(GLOBAL_STATS_FILE, {})
         
         if not stats:
@@ -1008,14 +1881,8 @@ async def boostergen_slash(self, interaction, service_name: str):
         total_stock = 0
         
         for service_name in self.services.keys():
-            stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-            count = 0
-            try:
-                async with aiofiles.open(stock_file_path, mode='r') as f:
-                    lines = await f.readlines()
-                count = len([line for line in lines if line.strip()])
-            except FileNotFoundError:
-                pass # File missing means 0 stock
+            # A missing file means 0 stock
+            count = await self.stock.count(service_name)
                 
             stock_summary.append(f"**{service_name}**: {count}")
             total_stock += count
@@ -1032,20 +1899,14 @@ async def boostergen_slash(self, interaction, service_name: str):
         await ctx.reply(embed=embed)
 
     @app_commands.command(name="viewstockall", description="View stock levels for all services")
-    @app_commands.is_owner()
+    @is_app_owner()
     async def viewstockall_slash(self, interaction: discord.Interaction):
         stock_summary = []
         total_stock = 0
         
         for service_name in self.services.keys():
-            stock_file_path = os.path.join(STOCK_BASE_FOLDER, f"{service_name}.txt")
-            count = 0
-            try:
-                async with aiofiles.open(stock_file_path, mode='r') as f:
-                    lines = await f.readlines()
-                count = len([line for line in lines if line.strip()])
-            except FileNotFoundError:
-                pass # File missing means 0 stock
+            # A missing file means 0 stock
+            count = await self.stock.count(service_name)
                 
             stock_summary.append(f"**{service_name}**: {count}")
             total_stock += count
@@ -1061,6 +1922,45 @@ async def boostergen_slash(self, interaction, service_name: str):
         embed.set_footer(text=f"Total Accounts in Stock: {total_stock}")
         await interaction.response.send_message(embed=embed, ephemeral=True)
 
+    # --- DM QUEUE STATS ---
+    def _dm_queue_embed(self) -> discord.Embed:
+        queue = self.dm_queue
+        lines = []
+        for service_name, depth, latencies in queue.service_stats()[:20]:
+            if latencies:
+                p50 = latencies[len(latencies) // 2]
+                p95 = latencies[min(len(latencies) - 1, int(len(latencies) * 0.95))]
+                latency = f"p50 {p50 * 1000:,.0f} ms | p95 {p95 * 1000:,.0f} ms"
+            else:
+                latency = "no deliveries yet"
+            lines.append(f"**{service_name}**: {depth} queued | {latency}")
+
+        embed = discord.Embed(
+            title="📨 DM Delivery Queue",
+            description="\n".join(lines) or "No DMs queued or delivered yet.",
+            color=discord.Color.blurple()
+        )
+        embed.add_field(
+            name="Totals",
+            value=(
+                f"**Sent:** {queue.stats[DM_SENT]:,} | **DMs closed:** {queue.stats[DM_CLOSED]:,} | **Failed:** {queue.stats[DM_FAILED]:,}\n"
+                f"**Retried:** {queue.stats['retried']:,} | **Rate limited:** {queue.stats['rate_limited']:,}"
+            ),
+            inline=False
+        )
+        embed.set_footer(text=f"{queue.worker_count} workers | {queue.bucket.rate:g} DMs/s | DM fallback {'on' if self.dm_fallback else 'off'}")
+        return embed
+
+    @commands.command(name="dmqueuestats", description="Show DM delivery queue depth and latency per service")
+    @commands.is_owner()
+    async def dmqueuestats_prefix(self, ctx: commands.Context):
+        await ctx.reply(embed=self._dm_queue_embed())
+
+    @app_commands.command(name="dmqueuestats", description="Show DM delivery queue depth and latency per service")
+    @is_app_owner()
+    async def dmqueuestats_slash(self, interaction: discord.Interaction):
+        await interaction.response.send_message(embed=self._dm_queue_embed(), ephemeral=True)
+
     # =========================================================================
     # NITRO COMMANDS
     # =========================================================================
@@ -1080,7 +1980,7 @@ async def boostergen_slash(self, interaction, service_name: str):
         await ctx.reply(embed=embed)
 
     @app_commands.command(name="sendfake", description="Send a fake item to a user (e.g., fake Nitro)")
-    @app_commands.is_owner()
+    @is_app_owner()
     @app_commands.describe(member="The user to send the fake item to", amount="The quantity", item="The item to send (only 'nitro')")
     async def sendfake_slash(self, interaction: discord.Interaction, member: discord.Member, amount: app_commands.Range[int, 1], item: Literal['nitro']):
         # No need to check amount > 0 due to app_commands.Range[int, 1]
@@ -1107,7 +2007,7 @@ async def boostergen_slash(self, interaction, service_name: str):
         await ctx.reply(embed=embed)
 
     @app_commands.command(name="sendmassfake", description="Mass send a fake item to all server members (e.g., fake Nitro)")
-    @app_commands.is_owner()
+    @is_app_owner()
     @app_commands.describe(amount="The quantity", item="The item to send (only 'nitro')")
     async def sendmassfake_slash(self, interaction: discord.Interaction, amount: app_commands.Range[int, 1], item: Literal['nitro']):
         # No need to check amount > 0 due to app_commands.Range[int, 1]
@@ -1159,7 +2059,8 @@ async def boostergen_slash(self, interaction, service_name: str):
                 "`!stockremoveservice <name>` - Remove a service\\n"
                 "`!stockupdate <service> <accounts>` - Add accounts to stock\\n"
                 "`!stockclear <service>` - Clear stock for a service\\n"
-                "`!stockrefill <service:acc|service2:acc2>` - Bulk restock"
+                "`!stockrefill <service:acc|service2:acc2>` - Bulk restock\\n"
+                "`!stockimport <service>` + attached file - Import a stock file (.txt/.gz/.bz2/.xz)"
             ),
             inline=False
         )
@@ -1178,7 +2079,8 @@ async def boostergen_slash(self, interaction, service_name: str):
             name="📊 Analytics",
             value=(
                 "`!viewstats` - View generation statistics\\n"
-                "`!viewstockall` - View current stock levels"
+                "`!viewstockall` - View current stock levels\\n"
+                "`!dmqueuestats` - View DM queue depth and delivery latency"
             ),
             inline=False
         )
@@ -1199,7 +2101,7 @@ async def boostergen_slash(self, interaction, service_name: str):
 
 
     @app_commands.command(name="genadminhelp", description="Shows the generator administration guide")
-    @app_commands.is_owner()
+    @is_app_owner()
     async def genadminhelp_slash(self, interaction: discord.Interaction):
         embed = discord.Embed(
             title="📜 Sentinel Generator Admin Guide",
@@ -1233,7 +2135,8 @@ async def boostergen_slash(self, interaction, service_name: str):
                 "`/stockremoveservice <name>` - Remove a service\\n"
                 "`/stockupdate <service> <accounts>` - Add accounts to stock\\n"
                 "`/stockclear <service>` - Clear stock for a service\\n"
-                "`/stockrefill <service:acc|service2:acc2>` - Bulk restock"
+                "`/stockrefill <service:acc|service2:acc2>` - Bulk restock\\n"
+                "`/stockimport <service> <file>` - Import a stock file (.txt/.gz/.bz2/.xz)"
             ),
             inline=False
         )
@@ -1252,7 +2155,8 @@ async def boostergen_slash(self, interaction, service_name: str):
             name="📊 Analytics",
             value=(
                 "`/viewstats` - View generation statistics\\n"
-                "`/viewstockall` - View current stock levels"
+                "`/viewstockall` - View current stock levels\\n"
+                "`/dmqueuestats` - View DM queue depth and delivery latency"
             ),
             inline=False
         )
@@ -1,13 +1,16 @@
 # Fixed leveling.py — only changed app_commands.group usage to a Group attribute on the Cog
 import discord
-from discord.ext import commands
+from discord.ext import commands, tasks
 from discord import app_commands
 import json
 import os
-import datetime
+import copy
+import atexit
 import random
+import bisect
+import time
 from json.decoder import JSONDecodeError
-from typing import Dict, List, Any, Optional, Union, Literal, cast
+from typing import Dict, List, Any, Optional, Set, Tuple, Union, Literal, cast
 
 # --- New Imports for Image Generation ---
 import io
@@ -15,11 +18,29 @@ import aiohttp
 from PIL import Image, ImageDraw, ImageFont, ImageOps
 import functools
 import asyncio
+import hashlib
+import csv
+import gzip
+import shutil
+import tempfile
+import zlib
+from collections import OrderedDict
+from array import array
+try:
+    from .webclient import TokenBucket, http_session
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from webclient import TokenBucket, http_session
+try:
+    from .render import run_render
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from render import run_render
 # ----------------------------------------
 
 # ------------------------------------------------------
 # 📁 File Path Setup
 # ------------------------------------------------------
+LEVELS_DIR = "data/levels" # One folder per guild (see GuildShard)
+# Legacy single-file storage, migrated into LEVELS_DIR on first start
 LEVELS_FILE = "data/levels.json"
 CONFIG_FILE = "data/level_config.json"
 FONTS_DIR = "fonts" # Folder for custom fonts (optional)
@@ -41,9 +62,13 @@ def load_data(file_path):
                 f.seek(0)
                 return json.load(f)
         except JSONDecodeError:
-            print(f"[ERROR] JSONDecodeError in {file_path}. File may be corrupted. Overwriting with empty data.")
-            with open(file_path, "w") as f:
-                json.dump({}, f)
+            # Keep the damaged file for recovery instead of wiping it
+            corrupt_path = f"{file_path}.corrupt-{int(time.time())}"
+            print(f"[ERROR] JSONDecodeError in {file_path}. File may be corrupted. Moved it to {corrupt_path}.")
+            try:
+                os.replace(file_path, corrupt_path)
+            except OSError as e:
+                print(f"[ERROR] Could not move {file_path} aside: {e}")
             return {}
         except Exception as e:
             print(f"[ERROR] An unexpected error occurred while loading {file_path}: {e}")
@@ -59,52 +84,6 @@ def save_data(file_path, data):
     except Exception as e:
         print(f"[ERROR] An unexpected error occurred while saving {file_path}: {e}")
 
-# Helper to get guild/user data
-def get_user_data(guild_id: int, user_id: int) -> Dict[str, Union[int, datetime.datetime]]:
-    levels = load_data(LEVELS_FILE)
-    guild_id_str = str(guild_id)
-    user_id_str = str(user_id)
-    
-    if guild_id_str not in levels:
-        levels[guild_id_str] = {}
-
-    if user_id_str not in levels[guild_id_str]:
-        levels[guild_id_str][user_id_str] = {
-            "xp": 0,
-            "level": 0,
-            "last_message": datetime.datetime.min.isoformat(),
-            "total_xp": 0
-        }
-    
-    # Convert ISO string back to datetime object for internal use
-    last_message_str = levels[guild_id_str][user_id_str]["last_message"]
-    levels[guild_id_str][user_id_str]["last_message"] = datetime.datetime.fromisoformat(last_message_str)
-    
-    return levels[guild_id_str][user_id_str]
-
-def update_user_data(guild_id: int, user_id: int, data: Dict[str, Any]):
-    levels = load_data(LEVELS_FILE)
-    guild_id_str = str(guild_id)
-    user_id_str = str(user_id)
-
-    if guild_id_str not in levels:
-        levels[guild_id_str] = {}
-
-    if user_id_str not in levels[guild_id_str]:
-        levels[guild_id_str][user_id_str] = {
-            "xp": 0,
-            "level": 0,
-            "last_message": datetime.datetime.min.isoformat(),
-            "total_xp": 0
-        }
-
-    # Convert datetime object back to ISO string for saving
-    if "last_message" in data and isinstance(data["last_message"], datetime.datetime):
-        data["last_message"] = data["last_message"].isoformat()
-
-    levels[guild_id_str][user_id_str].update(data)
-    save_data(LEVELS_FILE, levels)
-
 # Helper to get guild config
 DEFAULT_CONFIG = {
     "xp_cooldown": 60, # seconds
@@ -115,25 +94,763 @@ DEFAULT_CONFIG = {
     "ignore_channels": [],
     "level_roles": {}, # {level: role_id}
     "rank_card_background": None, # URL
-    "rank_card_text_color": "#FFFFFF"
+    "rank_card_text_color": "#FFFFFF",
+    "rank_card_prerender": False # Render cards in the background on level-up / top rank changes
 }
 
-def get_guild_config(guild_id: int) -> Dict[str, Any]:
-    config = load_data(CONFIG_FILE)
-    guild_id_str = str(guild_id)
-    if guild_id_str not in config:
-        config[guild_id_str] = DEFAULT_CONFIG.copy()
-        save_data(CONFIG_FILE, config)
-    return config[guild_id_str]
-
-def update_guild_config(guild_id: int, updates: Dict[str, Any]):
-    config = load_data(CONFIG_FILE)
-    guild_id_str = str(guild_id)
-    if guild_id_str not in config:
-        config[guild_id_str] = DEFAULT_CONFIG.copy()
-    
-    config[guild_id_str].update(updates)
-    save_data(CONFIG_FILE, config)
+# How often buffered journal lines are written + fsynced (seconds)
+JOURNAL_SYNC_INTERVAL = 0.25
+# Compact a guild's journal into a fresh snapshot once it holds this much data, or as
+# much as the snapshot itself if that is larger (so rewrites stay proportional to writes)...
+COMPACT_JOURNAL_BYTES = 1024 * 1024
+# ...or, for guilds whose snapshot is smaller than that, after this long (seconds)
+COMPACT_INTERVAL = 600
+# Records copied per event loop turn while taking a snapshot for compaction
+COMPACT_COPY_SLICE = 2000
+# Days of per-user XP history kept for windowed leaderboards
+XP_HISTORY_DAYS = 35
+# Leaderboard periods -> window length in days (must be <= XP_HISTORY_DAYS)
+LEADERBOARD_WINDOWS = {"week": 7, "month": 30}
+# Unload a guild's data after this long without use (seconds)
+LEVEL_SHARD_IDLE_SECONDS = int(os.environ.get("LEVEL_SHARD_IDLE_SECONDS", 1800))
+
+def _default_user_record() -> Dict[str, Any]:
+    return {
+        "xp": 0,
+        "level": 0,
+        "total_xp": 0
+    }
+
+def _atomic_write(file_path: str, content: str):
+    """Writes to a temp file and swaps it in, so a crash never leaves a half-written file."""
+    tmp_path = f"{file_path}.tmp"
+    with open(tmp_path, "w") as f:
+        f.write(content)
+    os.replace(tmp_path, file_path)
+
+class XpCooldowns:
+    """
+    XP cooldowns kept only in memory: {guild_id: {user_id: expiry}} on the monotonic clock.
+    Expired entries are dropped lazily on lookup and in bulk by `sweep`.
+    Not persisted, so after a restart everyone can earn XP once straight away.
+    """
+
+    def __init__(self):
+        self._expiry: Dict[int, Dict[int, float]] = {}
+
+    def __len__(self) -> int:
+        return sum(len(users) for users in self._expiry.values())
+
+    def on_cooldown(self, guild_id: int, user_id: int, now: float) -> bool:
+        users = self._expiry.get(guild_id)
+        if not users:
+            return False
+        expiry = users.get(user_id)
+        if expiry is None:
+            return False
+        if expiry > now:
+            return True
+        del users[user_id]
+        return False
+
+    def start(self, guild_id: int, user_id: int, seconds: float, now: float):
+        self._expiry.setdefault(guild_id, {})[user_id] = now + seconds
+
+    def clear(self, guild_id: int, user_id: Optional[int] = None):
+        if user_id is None:
+            self._expiry.pop(guild_id, None)
+        else:
+            self._expiry.get(guild_id, {}).pop(user_id, None)
+
+    def sweep(self, now: float) -> int:
+        """Drops every expired entry. Returns how many were removed."""
+        removed = 0
+        for guild_id in list(self._expiry):
+            users = self._expiry[guild_id]
+            expired = [user_id for user_id, expiry in users.items() if expiry <= now]
+            for user_id in expired:
+                del users[user_id]
+            removed += len(expired)
+            if not users:
+                del self._expiry[guild_id]
+        return removed
+
+
+def _today() -> int:
+    """Days since the epoch (UTC)."""
+    return int(time.time() // 86400)
+
+def _new_xp_history() -> array:
+    # One bucket per day in a ring, plus the day of the newest bucket in the last slot
+    return array("I", bytes(4 * (XP_HISTORY_DAYS + 1)))
+
+def _xp_history_slot(history: array, day: int) -> Optional[int]:
+    """Index of `day`'s bucket (advancing the ring if needed), or None if it is too old."""
+    last_day = history[XP_HISTORY_DAYS]
+    if day > last_day:
+        # Clear the buckets of days skipped since the last write
+        for skipped in range(max(last_day + 1, day - XP_HISTORY_DAYS + 1), day + 1):
+            history[skipped % XP_HISTORY_DAYS] = 0
+        history[XP_HISTORY_DAYS] = day
+    elif day <= last_day - XP_HISTORY_DAYS:
+        return None
+    return day % XP_HISTORY_DAYS
+
+def _xp_history_add(history: array, day: int, amount: int) -> int:
+    """Adds `amount` to `day`'s bucket. Returns the bucket's new value."""
+    slot = _xp_history_slot(history, day)
+    if slot is None:
+        return 0
+    history[slot] = min(history[slot] + amount, 0xFFFFFFFF)
+    return history[slot]
+
+def _xp_history_set(history: array, day: int, value: int):
+    slot = _xp_history_slot(history, day)
+    if slot is not None:
+        history[slot] = value
+
+def _xp_history_take(history: array, amount: int):
+    """Takes up to `amount` XP out of the buckets, newest day first."""
+    last_day = history[XP_HISTORY_DAYS]
+    for day in range(last_day, last_day - XP_HISTORY_DAYS, -1):
+        if amount <= 0:
+            return
+        slot = day % XP_HISTORY_DAYS
+        taken = min(history[slot], amount)
+        history[slot] -= taken
+        amount -= taken
+
+def _xp_history_total(history: array, today: int, days: int) -> int:
+    """XP earned in the `days` days ending today."""
+    last_day = history[XP_HISTORY_DAYS]
+    first_day = max(today - days + 1, last_day - XP_HISTORY_DAYS + 1)
+    return sum(history[day % XP_HISTORY_DAYS] for day in range(first_day, min(last_day, today) + 1))
+
+
+class LeaderboardIndex:
+    """
+    Order-statistic index of one guild's ranked users (total_xp > 0).
+    Entries are kept in a plain list sorted as (-total_xp, user_id): rank
+    lookups are a bisect, top-N and "users around me" are a slice, and an XP
+    change is one delete and one insort (a memmove, cheap at guild sizes).
+    """
+
+    def __init__(self, guild_levels: Dict[str, Dict[str, Any]]):
+        self._scores: Dict[int, int] = {
+            int(user_id): data.get("total_xp", 0)
+            for user_id, data in guild_levels.items() if data.get("total_xp", 0) > 0
+        }
+        self._ranked = sorted((-total_xp, user_id) for user_id, total_xp in self._scores.items())
+
+    @classmethod
+    def from_scores(cls, scores: Dict[int, int]) -> "LeaderboardIndex":
+        index = cls({})
+        index._scores = {user_id: score for user_id, score in scores.items() if score > 0}
+        index._ranked = sorted((-score, user_id) for user_id, score in index._scores.items())
+        return index
+
+    def __len__(self) -> int:
+        return len(self._ranked)
+
+    def update(self, user_id: int, total_xp: int):
+        old_xp = self._scores.get(user_id)
+        if old_xp == total_xp:
+            return
+        if old_xp is not None:
+            del self._ranked[bisect.bisect_left(self._ranked, (-old_xp, user_id))]
+            del self._scores[user_id]
+        if total_xp > 0:
+            self._scores[user_id] = total_xp
+            bisect.insort(self._ranked, (-total_xp, user_id))
+
+    def add(self, user_id: int, amount: int):
+        self.update(user_id, self._scores.get(user_id, 0) + amount)
+
+    def remove(self, user_id: int):
+        self.update(user_id, 0)
+
+    def rank(self, user_id: int) -> Optional[int]:
+        """1-based rank, or None if the user has no XP."""
+        total_xp = self._scores.get(user_id)
+        if total_xp is None:
+            return None
+        return bisect.bisect_left(self._ranked, (-total_xp, user_id)) + 1
+
+    def top(self, count: int) -> List[Tuple[int, int]]:
+        """[(user_id, total_xp), ...] for the first `count` ranks."""
+        return [(user_id, -neg_xp) for neg_xp, user_id in self._ranked[:count]]
+
+    def around(self, user_id: int, radius: int = 2) -> List[Tuple[int, int, int]]:
+        """[(rank, user_id, total_xp), ...] for the users within `radius` ranks of user_id."""
+        rank = self.rank(user_id)
+        if rank is None:
+            return []
+        start = max(rank - 1 - radius, 0)
+        return [
+            (start + offset + 1, uid, -neg_xp)
+            for offset, (neg_xp, uid) in enumerate(self._ranked[start:rank + radius])
+        ]
+
+
+class LevelJournal:
+    """
+    Append-only JSONL journal for one snapshot file.
+    Each line is an absolute upsert/delete, so replaying a line twice is harmless.
+    An upsert carries the record and, if XP was gained, that day's history bucket;
+    "hist" lines replace a user's whole history (after an admin reset or XP removal).
+    Lines are buffered in memory and written + fsynced in batches by the store.
+    Segments are `<snapshot>.journal.<seq>`; each startup and compaction opens a new one.
+    """
+
+    def __init__(self, snapshot_path: str):
+        self.prefix = f"{snapshot_path}.journal."
+        existing = self.segments()
+        self.seq = existing[-1] + 1 if existing else 1
+        # Journal bytes not yet folded into the snapshot (drives compaction)
+        self.bytes_since_compact = sum(os.path.getsize(self.segment_path(seq)) for seq in existing)
+        self._pending: List[str] = []
+        self._file = None
+
+    def segment_path(self, seq: int) -> str:
+        return f"{self.prefix}{seq:06d}"
+
+    def segments(self) -> List[int]:
+        directory, name = os.path.split(self.prefix)
+        seqs = []
+        for entry in os.listdir(directory or "."):
+            suffix = entry[len(name):]
+            if entry.startswith(name) and suffix.isdigit():
+                seqs.append(int(suffix))
+        return sorted(seqs)
+
+    def replay(self, from_seq: int = 0):
+        """Yields every journaled operation in segments >= from_seq, oldest first."""
+        for seq in self.segments():
+            if seq < from_seq:
+                continue
+            path = self.segment_path(seq)
+            with open(path, "r") as f:
+                for line_no, line in enumerate(f, 1):
+                    if not line.strip():
+                        continue
+                    try:
+                        yield json.loads(line)
+                    except JSONDecodeError:
+                        # Only a torn tail from a crash mid-append should land here
+                        print(f"[ERROR] Skipping unreadable journal line {path}:{line_no}")
+
+    # --- Called on the event loop ---
+    def append(self, op: Dict[str, Any]):
+        self._pending.append(json.dumps(op, separators=(",", ":")) + "\n")
+
+    @property
+    def has_pending(self) -> bool:
+        return bool(self._pending)
+
+    def take(self) -> List[str]:
+        lines, self._pending = self._pending, []
+        return lines
+
+    def restore(self, lines: List[str]):
+        self._pending[:0] = lines
+
+    # --- Called from a worker thread (one at a time) ---
+    def write(self, lines: List[str]):
+        if not lines:
+            return
+        if self._file is None:
+            self._file = open(self.segment_path(self.seq), "a")
+        data = "".join(lines)
+        self._file.write(data)
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.bytes_since_compact += len(data)
+
+    def rotate(self) -> int:
+        """Closes the current segment; later writes go to a new one. Returns the new seq."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self.seq += 1
+        return self.seq
+
+    def prune(self, before_seq: int):
+        for seq in self.segments():
+            if seq < before_seq:
+                os.remove(self.segment_path(seq))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+def _load_xp_history(daily: Optional[List[int]]) -> Optional[array]:
+    if daily and len(daily) == XP_HISTORY_DAYS + 1:
+        return array("I", daily)
+    return None
+
+def _apply_journal_op(users: Dict[str, Dict[str, Any]], op: Dict[str, Any], history: Optional[Dict[str, array]] = None):
+    """
+    Replays one journal line. With `history`, daily XP history is rebuilt there from
+    the line's "h" ([day, bucket value]); without it, records are taken as written.
+    """
+    kind = op.get("op")
+    if kind == "set":
+        record = op["r"]
+        if history is not None:
+            # Lines written before "h" existed carry the whole history
+            daily = _load_xp_history(record.pop("daily", None))
+            if daily is not None:
+                history[op["u"]] = daily
+            if "h" in op:
+                day, value = op["h"]
+                daily = history.get(op["u"])
+                if daily is None:
+                    daily = history[op["u"]] = _new_xp_history()
+                _xp_history_set(daily, day, value)
+        users[op["u"]] = record
+    elif kind == "hist":
+        daily = _load_xp_history(op["daily"])
+        if history is not None and daily is not None:
+            history[op["u"]] = daily
+    elif kind == "del":
+        users.pop(op["u"], None)
+        if history is not None:
+            history.pop(op["u"], None)
+    elif kind == "drop":
+        users.clear()
+        if history is not None:
+            history.clear()
+
+
+class GuildShard:
+    """
+    One guild's levels and config, stored under LEVELS_DIR/<guild_id>/.
+    `levels.json` is the snapshot, `levels.json.journal.<seq>` the journal on top of it
+    and `config.json` the guild's leveling config.
+    Daily XP history is stored in each snapshot record as "daily" but kept as arrays in `history`.
+    """
+
+    def __init__(self, guild_id: str):
+        self.guild_id = guild_id
+        self.directory = os.path.join(LEVELS_DIR, guild_id)
+        os.makedirs(self.directory, exist_ok=True)
+        self.levels_file = os.path.join(self.directory, "levels.json")
+        self.config_file = os.path.join(self.directory, "config.json")
+        self.meta_file = os.path.join(self.directory, "levels.meta.json")
+
+        self.journal = LevelJournal(self.levels_file)
+        self.history: Dict[str, array] = {}
+        self.users: Dict[str, Dict[str, Any]] = self._load_levels()
+        self.config: Optional[Dict[str, Any]] = load_data(self.config_file) or None
+        # Built lazily, then kept in sync by every XP change
+        self.leaderboard: Optional[LeaderboardIndex] = None
+        # Windowed boards ({period: index}), valid for `windows_day` only
+        self.windows: Dict[str, LeaderboardIndex] = {}
+        self.windows_day: Optional[int] = None
+
+        self.config_dirty = False
+        self.compacting = False
+        self.snapshot_bytes = os.path.getsize(self.levels_file) if os.path.exists(self.levels_file) else 0
+        self.last_compact = time.monotonic()
+        self.last_used = time.monotonic()
+        # Oldest segment the snapshot still needs once it becomes `.bak`
+        self.bak_segment = (self.journal.segments() or [self.journal.seq])[0]
+
+    def _load_levels(self) -> Dict[str, Dict[str, Any]]:
+        users = load_data(self.levels_file)
+        # Segments before the snapshot's rotation point are only kept for `.bak` recovery
+        from_seq = load_data(self.meta_file).get("journal_from", 0) if os.path.exists(self.levels_file) else 0
+        backup_file = f"{self.levels_file}.bak"
+        # Missing after a crash mid-compaction, or moved aside as corrupt
+        if not os.path.exists(self.levels_file) and os.path.exists(backup_file):
+            print(f"[ERROR] {self.levels_file} is missing; recovering from {backup_file} and the journal.")
+            users = load_data(backup_file)
+        for user_id, record in users.items():
+            daily = _load_xp_history(record.pop("daily", None))
+            if daily is not None:
+                self.history[user_id] = daily
+        for op in self.journal.replay(from_seq):
+            _apply_journal_op(users, op, self.history)
+        return users
+
+    def window_scores(self, days: int, today: int) -> Dict[int, int]:
+        return {int(user_id): _xp_history_total(history, today, days) for user_id, history in self.history.items()}
+
+    @property
+    def has_pending(self) -> bool:
+        return self.journal.has_pending or self.config_dirty
+
+    def should_compact(self) -> bool:
+        if self.compacting or not self.journal.bytes_since_compact:
+            return False
+        # A compaction rewrites the whole snapshot, so wait for at least that much journal
+        if self.journal.bytes_since_compact >= max(COMPACT_JOURNAL_BYTES, self.snapshot_bytes):
+            return True
+        return (
+            self.snapshot_bytes < COMPACT_JOURNAL_BYTES
+            and time.monotonic() - self.last_compact >= COMPACT_INTERVAL
+        )
+
+    def take_config(self) -> Optional[Dict[str, Any]]:
+        config_snapshot = copy.deepcopy(self.config) if self.config_dirty else None
+        self.config_dirty = False
+        return config_snapshot
+
+    # --- Called from a worker thread ---
+    def sync(self, lines: List[str], config_snapshot: Optional[Dict[str, Any]]):
+        self.journal.write(lines)
+        if config_snapshot is not None:
+            _atomic_write(self.config_file, json.dumps(config_snapshot, indent=4))
+
+    def sync_and_rotate(self, lines: List[str]) -> int:
+        self.journal.write(lines)
+        return self.journal.rotate()
+
+    def write_snapshot(self, users: Dict[str, Dict[str, Any]], history: Dict[str, array], journal_from: int) -> int:
+        """Replaces the snapshot with copies of `users` and `history`. Returns its size in bytes."""
+        tmp_path = f"{self.levels_file}.tmp"
+        with open(tmp_path, "w") as f:
+            # Encoded one record at a time: no second copy of the guild is built
+            f.write("{")
+            for index, (user_id, record) in enumerate(users.items()):
+                daily = history.get(user_id)
+                if daily is not None:
+                    record["daily"] = daily.tolist()
+                f.write(f'{"," if index else ""}{json.dumps(user_id)}:{json.dumps(record, separators=(",", ":"))}')
+            f.write("}")
+            f.flush()
+            os.fsync(f.fileno())
+            size = f.tell()
+        # The previous snapshot is kept as `.bak` until the next compaction
+        if os.path.exists(self.levels_file):
+            os.replace(self.levels_file, f"{self.levels_file}.bak")
+        os.replace(tmp_path, self.levels_file)
+        # Written last: a stale value only means replaying more than needed, which is harmless
+        _atomic_write(self.meta_file, json.dumps({"journal_from": journal_from}))
+        return size
+
+
+class LevelStore:
+    """
+    Per-guild store for leveling data and configs.
+    A guild's shard is loaded on first access and evicted after LEVEL_SHARD_IDLE_SECONDS
+    without use, so memory and load time follow active guilds rather than all guilds.
+    Record changes go to the shard's journal (fsynced in small batches); snapshots
+    are only rewritten by compaction, off the event loop.
+    """
+
+    def __init__(self):
+        os.makedirs(LEVELS_DIR, exist_ok=True)
+        self._shards: Dict[str, GuildShard] = {}
+        self._flush_lock = asyncio.Lock()
+        self._migrate_legacy_files()
+
+    # --- Shards ---
+    def _shard(self, guild_id: Union[int, str]) -> GuildShard:
+        guild_id_str = str(guild_id)
+        shard = self._shards.get(guild_id_str)
+        if shard is None:
+            shard = GuildShard(guild_id_str)
+            self._shards[guild_id_str] = shard
+        shard.last_used = time.monotonic()
+        return shard
+
+    @property
+    def loaded_guilds(self) -> int:
+        return len(self._shards)
+
+    def _migrate_legacy_files(self):
+        """Splits the old single-file LEVELS_FILE / CONFIG_FILE (and their journal) into shards."""
+        legacy_journal = LevelJournal(LEVELS_FILE)
+        legacy_files = [LEVELS_FILE, f"{LEVELS_FILE}.bak", CONFIG_FILE]
+        legacy_segments = [legacy_journal.segment_path(seq) for seq in legacy_journal.segments()]
+        if not any(os.path.exists(path) for path in legacy_files) and not legacy_segments:
+            return
+
+        levels = load_data(LEVELS_FILE)
+        if not os.path.exists(LEVELS_FILE) and os.path.exists(f"{LEVELS_FILE}.bak"):
+            levels = load_data(f"{LEVELS_FILE}.bak")
+        for op in legacy_journal.replay():
+            if op.get("op") == "drop":
+                levels.pop(op["g"], None)
+            else:
+                _apply_journal_op(levels.setdefault(op["g"], {}), op)
+        configs = load_data(CONFIG_FILE)
+
+        for guild_id in levels.keys() | configs.keys():
+            directory = os.path.join(LEVELS_DIR, guild_id)
+            os.makedirs(directory, exist_ok=True)
+            # Never clobber a shard that already exists
+            levels_path = os.path.join(directory, "levels.json")
+            if guild_id in levels and not os.path.exists(levels_path):
+                _atomic_write(levels_path, json.dumps(levels[guild_id], separators=(",", ":")))
+            config_path = os.path.join(directory, "config.json")
+            if guild_id in configs and not os.path.exists(config_path):
+                _atomic_write(config_path, json.dumps(configs[guild_id], indent=4))
+
+        for path in legacy_files + legacy_segments:
+            if os.path.exists(path):
+                os.replace(path, f"{path}.migrated")
+        print(f"[INFO] Leveling: migrated {len(levels.keys() | configs.keys()):,} guilds to per-guild storage in {LEVELS_DIR}.")
+
+    # --- User Data ---
+    def get_user(self, guild_id: int, user_id: int) -> Dict[str, Any]:
+        """Returns a copy of the user's record (or a fresh default one)."""
+        record = self._shard(guild_id).users.get(str(user_id))
+        return dict(record) if record else _default_user_record()
+
+    def update_user(self, guild_id: int, user_id: int, data: Dict[str, Any], xp_gained: int = 0):
+        """Saves `data` into the record; `xp_gained` also counts towards today's XP for windowed boards."""
+        shard = self._shard(guild_id)
+        user_id_str = str(user_id)
+        record = shard.users.setdefault(user_id_str, _default_user_record())
+        record.update(data)
+
+        op = {"op": "set", "u": user_id_str, "r": record}
+        if xp_gained > 0:
+            today = _today()
+            history = shard.history.get(user_id_str)
+            if history is None:
+                history = shard.history[user_id_str] = _new_xp_history()
+            op["h"] = [today, _xp_history_add(history, today, xp_gained)]
+            if shard.windows_day == today:
+                for window in shard.windows.values():
+                    window.add(int(user_id), xp_gained)
+
+        shard.journal.append(op)
+
+        if shard.leaderboard is not None:
+            shard.leaderboard.update(int(user_id), record["total_xp"])
+
+    def get_guild_levels(self, guild_id: int) -> Dict[str, Dict[str, Any]]:
+        """Live view of a guild's records. Treat as read-only."""
+        return self._shard(guild_id).users
+
+    def leaderboard(self, guild_id: int) -> LeaderboardIndex:
+        shard = self._shard(guild_id)
+        if shard.leaderboard is None:
+            shard.leaderboard = LeaderboardIndex(shard.users)
+        return shard.leaderboard
+
+    def window_leaderboard(self, guild_id: int, period: str) -> LeaderboardIndex:
+        """
+        Board of XP earned in the last LEADERBOARD_WINDOWS[period] days.
+        Built once per guild per day (when the window slides), then updated per XP grant.
+        """
+        shard = self._shard(guild_id)
+        today = _today()
+        if shard.windows_day != today:
+            shard.windows = {}
+            shard.windows_day = today
+        window = shard.windows.get(period)
+        if window is None:
+            window = LeaderboardIndex.from_scores(shard.window_scores(LEADERBOARD_WINDOWS[period], today))
+            shard.windows[period] = window
+        return window
+
+    def remove_xp_history(self, guild_id: int, user_id: int, amount: Optional[int] = None):
+        """
+        Takes `amount` XP (all of it if None) out of the user's daily history, newest
+        day first, so windowed boards drop it too. For admin resets and XP removals.
+        """
+        shard = self._shard(guild_id)
+        user_id_str = str(user_id)
+        history = shard.history.get(user_id_str)
+        if history is None:
+            return
+        if amount is None:
+            history[:XP_HISTORY_DAYS] = array("I", bytes(4 * XP_HISTORY_DAYS))
+        else:
+            _xp_history_take(history, amount)
+        shard.journal.append({"op": "hist", "u": user_id_str, "daily": history.tolist()})
+
+        today = _today()
+        if shard.windows_day == today:
+            for period, window in shard.windows.items():
+                window.update(int(user_id), _xp_history_total(history, today, LEADERBOARD_WINDOWS[period]))
+
+    def delete_guild(self, guild_id: int) -> bool:
+        shard = self._shard(guild_id)
+        shard.leaderboard = None
+        shard.windows = {}
+        if not shard.users:
+            return False
+        shard.users.clear()
+        shard.history.clear()
+        shard.journal.append({"op": "drop"})
+        return True
+
+    def delete_users(self, guild_id: int, user_ids: List[str]) -> int:
+        shard = self._shard(guild_id)
+        removed = 0
+        for user_id in user_ids:
+            if shard.users.pop(str(user_id), None) is not None:
+                removed += 1
+                shard.history.pop(str(user_id), None)
+                shard.journal.append({"op": "del", "u": str(user_id)})
+                if shard.leaderboard is not None:
+                    shard.leaderboard.remove(int(user_id))
+                for window in shard.windows.values():
+                    window.remove(int(user_id))
+        return removed
+
+    def import_users(self, guild_id: int, rows: List[Tuple[str, int]]) -> int:
+        """
+        Sets total XP (recomputing level/xp) for many users at once. The lifetime
+        leaderboard is dropped rather than updated per row; it is rebuilt on next use.
+        """
+        shard = self._shard(guild_id)
+        shard.leaderboard = None
+        for user_id, total_xp in rows:
+            record = shard.users.setdefault(user_id, _default_user_record())
+            info = get_level_info(total_xp)
+            record.update(xp=info["xp"], level=info["level"], total_xp=total_xp)
+            shard.journal.append({"op": "set", "u": user_id, "r": record})
+        return len(rows)
+
+    # --- Guild Config ---
+    def get_config(self, guild_id: int) -> Dict[str, Any]:
+        shard = self._shard(guild_id)
+        if shard.config is None:
+            # Only written to config.json once something is changed (update_config)
+            shard.config = copy.deepcopy(DEFAULT_CONFIG)
+        return shard.config
+
+    def update_config(self, guild_id: int, updates: Dict[str, Any]):
+        self.get_config(guild_id).update(updates)
+        self._shard(guild_id).config_dirty = True
+
+    # --- Journal Sync ---
+    @property
+    def is_dirty(self) -> bool:
+        return any(shard.has_pending for shard in self._shards.values())
+
+    def _take_batches(self):
+        return [
+            (shard, shard.journal.take(), shard.take_config())
+            for shard in self._shards.values() if shard.has_pending
+        ]
+
+    @staticmethod
+    def _sync_batches(batches):
+        failed = []
+        for shard, lines, config_snapshot in batches:
+            try:
+                shard.sync(lines, config_snapshot)
+            except Exception as e:
+                failed.append((shard, lines, config_snapshot, e))
+        return failed
+
+    @staticmethod
+    def _restore_failed(failed):
+        for shard, lines, config_snapshot, e in failed:
+            shard.journal.restore(lines)
+            if config_snapshot is not None:
+                shard.config_dirty = True
+            print(f"[ERROR] Failed to flush leveling data for guild {shard.guild_id}: {e}")
+
+    async def flush(self):
+        """Appends buffered journal lines (one fsync per guild per batch) and writes changed configs."""
+        async with self._flush_lock:
+            batches = self._take_batches()
+            if batches:
+                self._restore_failed(await asyncio.to_thread(self._sync_batches, batches))
+
+    def flush_sync(self):
+        """Blocking flush for shutdown paths where the event loop may be gone."""
+        batches = self._take_batches()
+        if batches:
+            self._restore_failed(self._sync_batches(batches))
+
+    # --- Compaction & Eviction ---
+    async def _copy_records(self, shard: GuildShard) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, array]]:
+        """
+        Copies every record and its history, COMPACT_COPY_SLICE per event loop turn.
+        Records may change between slices; every such change is journaled after the
+        rotation point, and journal lines are absolute, so replaying them over this
+        copy gives the live state.
+        """
+        users: Dict[str, Dict[str, Any]] = {}
+        history: Dict[str, array] = {}
+        user_ids = list(shard.users)
+        for start in range(0, len(user_ids), COMPACT_COPY_SLICE):
+            for user_id in user_ids[start:start + COMPACT_COPY_SLICE]:
+                record = shard.users.get(user_id)
+                if record is None:
+                    continue
+                users[user_id] = dict(record)
+                daily = shard.history.get(user_id)
+                if daily is not None:
+                    history[user_id] = array("I", daily)
+            await asyncio.sleep(0)
+        return users, history
+
+    async def _compact(self, shard: GuildShard):
+        """
+        Folds a shard's journal into a fresh snapshot. Only the journal sync + rotation
+        holds the flush lock; records are copied in slices afterwards, and the snapshot
+        is encoded and written in the background.
+        """
+        if shard.compacting:
+            return
+        shard.compacting = True
+        try:
+            async with self._flush_lock:
+                lines = shard.journal.take()
+                compacted_bytes = shard.journal.bytes_since_compact + sum(len(line) for line in lines)
+                try:
+                    new_segment = await asyncio.to_thread(shard.sync_and_rotate, lines)
+                except Exception as e:
+                    shard.journal.restore(lines)
+                    print(f"[ERROR] Failed to rotate leveling journal for guild {shard.guild_id}: {e}")
+                    return
+
+            # Everything from here on is journaled in new_segment or later
+            users, history = await self._copy_records(shard)
+            try:
+                shard.snapshot_bytes = await asyncio.to_thread(shard.write_snapshot, users, history, new_segment)
+                # The old snapshot is now `.bak`; keep only the segments it needs
+                await asyncio.to_thread(shard.journal.prune, shard.bak_segment)
+            except Exception as e:
+                print(f"[ERROR] Failed to compact leveling data for guild {shard.guild_id}: {e}")
+                return
+
+            shard.bak_segment = new_segment
+            shard.journal.bytes_since_compact = max(shard.journal.bytes_since_compact - compacted_bytes, 0)
+            shard.last_compact = time.monotonic()
+        finally:
+            shard.compacting = False
+
+    async def compact_guild(self, guild_id: int):
+        await self._compact(self._shard(guild_id))
+
+    async def compact_due(self):
+        for shard in list(self._shards.values()):
+            if shard.should_compact():
+                await self._compact(shard)
+
+    async def evict_idle(self, idle_seconds: Optional[float] = None) -> int:
+        """Compacts and unloads shards unused for `idle_seconds`. Returns how many were evicted."""
+        idle_seconds = LEVEL_SHARD_IDLE_SECONDS if idle_seconds is None else idle_seconds
+        evicted = 0
+        for guild_id, shard in list(self._shards.items()):
+            if time.monotonic() - shard.last_used < idle_seconds or shard.has_pending:
+                continue
+            # Fold the journal in first so the next load is a single file read
+            if shard.journal.bytes_since_compact:
+                await self._compact(shard)
+            if (
+                self._shards.get(guild_id) is shard
+                and not shard.has_pending
+                and not shard.compacting
+                and time.monotonic() - shard.last_used >= idle_seconds
+            ):
+                shard.journal.close()
+                del self._shards[guild_id]
+                evicted += 1
+        return evicted
 
 
 # Formula: XP needed for next level
@@ -142,34 +859,38 @@ def get_xp_needed(level: int) -> int:
 
 # Formula: Total XP required for a given level
 def get_total_xp_required(level: int) -> int:
-    # A simple summation of XP needed for all previous levels
-    total_xp = 0
-    for l in range(1, level + 1):
-        total_xp += get_xp_needed(l - 1)
-    return total_xp
+    # Closed form of sum(get_xp_needed(l) for l in range(level))
+    if level <= 0:
+        return 0
+    return (5 * (level - 1) * level * (2 * level - 1)) // 6 + 25 * (level - 1) * level + 100 * level
+
+# Cumulative XP per level, covering every level real users reach
+XP_TABLE_LEVELS = 1000
+_XP_TABLE = [get_total_xp_required(level) for level in range(XP_TABLE_LEVELS + 1)]
+
+def _level_from_total_xp(total_xp: int) -> int:
+    if total_xp < _XP_TABLE[-1]:
+        return max(bisect.bisect_right(_XP_TABLE, total_xp) - 1, 0)
+
+    # Past the table (e.g. huge setxp values): binary search the closed form
+    low, high = XP_TABLE_LEVELS, XP_TABLE_LEVELS * 2
+    while get_total_xp_required(high) <= total_xp:
+        low, high = high, high * 2
+    while high - low > 1:
+        mid = (low + high) // 2
+        if get_total_xp_required(mid) <= total_xp:
+            low = mid
+        else:
+            high = mid
+    return low
 
 # Formula: Calculate level from total XP
 def get_level_info(total_xp: int) -> Dict[str, int]:
-    level = 0
-    xp_at_current_level = 0
-    
-    # We start checking from level 0 (XP needed to reach level 1)
-    temp_xp = total_xp
-    
-    while True:
-        xp_to_next_level = get_xp_needed(level)
-        if temp_xp >= xp_to_next_level:
-            temp_xp -= xp_to_next_level
-            level += 1
-        else:
-            xp_at_current_level = temp_xp
-            xp_needed_for_next = xp_to_next_level
-            break
-            
+    level = _level_from_total_xp(total_xp)
     return {
         "level": level,
-        "xp": xp_at_current_level,
-        "xp_needed": xp_needed_for_next
+        "xp": total_xp - get_total_xp_required(level),
+        "xp_needed": get_xp_needed(level)
     }
 
 # ------------------------------------------------------
@@ -192,17 +913,316 @@ def get_font(size: int, font_name: str = "Roboto-Bold.ttf"):
     except:
         return ImageFont.load_default() # PIL default
 
-async def _fetch_image(session: aiohttp.ClientSession, url: str) -> Optional[io.BytesIO]:
-    """Asynchronously fetches an image from a URL."""
+async def _fetch_image(bot: commands.Bot, url: str) -> Optional[io.BytesIO]:
+    """
+    Asynchronously fetches an image from a URL.
+    Goes through the shared WebClient (pooled, cached) when loaded.
+    """
+    web_client = bot.get_cog("WebClient")
+    if web_client is not None:
+        data = await web_client.fetch_image(url)
+        return io.BytesIO(data) if data else None
     try:
-        async with session.get(url) as response:
-            if response.status == 200:
-                return io.BytesIO(await response.read())
-            return None
+        async with aiohttp.ClientSession() as session:
+            async with session.get(url) as response:
+                if response.status == 200:
+                    return io.BytesIO(await response.read())
+                return None
     except Exception:
         return None
 
+# --- Rank Card Layout ---
+CARD_WIDTH, CARD_HEIGHT = 900, 250
+AVATAR_SIZE = 180
+CARD_PADDING = 30
+BAR_WIDTH = CARD_WIDTH - (AVATAR_SIZE + 3 * CARD_PADDING) - 100
+BAR_HEIGHT = 30
+BAR_X = AVATAR_SIZE + 2 * CARD_PADDING
+BAR_Y = CARD_HEIGHT - 2 * CARD_PADDING - BAR_HEIGHT
+
+# Composited background layers, kept per guild on disk
+RANK_BACKGROUNDS_DIR = "data/rank_backgrounds"
+RANK_BACKGROUND_LAYERS_MAX = 64
+# Decoded layers kept by each render process (or the bot, without the pool)
+RANK_DECODED_LAYERS_MAX = 16 # ~0.9 MB each
+os.makedirs(RANK_BACKGROUNDS_DIR, exist_ok=True)
+
+def _compose_background_layer(background_data: Optional[io.BytesIO]) -> Image.Image:
+    """Builds the static part of a rank card: fitted background, dark overlay and empty XP bar track."""
+    if background_data:
+        bg_img = Image.open(background_data).convert("RGBA")
+        # Resize and crop the background image to fit the card
+        layer = ImageOps.fit(bg_img, (CARD_WIDTH, CARD_HEIGHT), method=Image.Resampling.LANCZOS).convert("RGBA")
+
+        # Apply a dark overlay for better text readability
+        overlay = Image.new('RGBA', (CARD_WIDTH, CARD_HEIGHT), (0, 0, 0, 150)) # Black, 60% opacity
+        layer.paste(overlay, (0, 0), overlay)
+    else:
+        # Default dark theme background
+        layer = Image.new('RGBA', (CARD_WIDTH, CARD_HEIGHT), (44, 47, 51, 255))
+
+    # --- Draw XP Bar (Background) ---
+    ImageDraw.Draw(layer).rounded_rectangle(
+        (BAR_X, BAR_Y, BAR_X + BAR_WIDTH, BAR_Y + BAR_HEIGHT),
+        radius=BAR_HEIGHT // 2,
+        fill=(32, 34, 37, 255) # Dark gray for background
+    )
+    return layer
+
+@functools.lru_cache(maxsize=RANK_DECODED_LAYERS_MAX)
+def _decoded_layer(path: Optional[str], mtime_ns: int) -> Image.Image:
+    # Keyed by mtime too, so a rewritten file is decoded again
+    if path is None:
+        return _compose_background_layer(None)
+    with Image.open(path) as img:
+        return img.convert("RGBA")
+
+def _load_layer(path: Optional[str]) -> Image.Image:
+    """The layer stored at `path` (None: the default layer), decoded once per process. Read-only."""
+    if path is not None:
+        try:
+            return _decoded_layer(path, os.stat(path).st_mtime_ns)
+        except OSError as e:
+            # Replaced by a newer background while this card was queued
+            print(f"[ERROR] Failed to load rank background layer {path}: {e}")
+    return _decoded_layer(None, 0)
+
+def _save_layer_file(layer: Image.Image, path: str, guild_id: int):
+    # Drop layers for this guild's previous backgrounds
+    prefix = f"{guild_id}-"
+    for name in os.listdir(RANK_BACKGROUNDS_DIR):
+        if name.startswith(prefix):
+            os.remove(os.path.join(RANK_BACKGROUNDS_DIR, name))
+    # Render workers may open the file at any time, so it only appears once complete
+    tmp_path = f"{path}.tmp"
+    layer.save(tmp_path, format="PNG")
+    os.replace(tmp_path, path)
+
+
+class BackgroundLayerCache:
+    """
+    Per-guild pre-composited rank card backgrounds.
+    A custom background URL is fetched and composited once into a PNG under
+    `RANK_BACKGROUNDS_DIR`. Render jobs are given that file's path and decode it
+    themselves (see `_load_layer`), so no pixel data is sent to the render pool.
+    """
+
+    def __init__(self, max_layers: int):
+        self.max_layers = max_layers
+        # guild_id -> (url, layer path), LRU bounded
+        self._layers: "OrderedDict[int, Tuple[str, str]]" = OrderedDict()
+
+    @staticmethod
+    def _layer_path(guild_id: int, url: str) -> str:
+        digest = hashlib.sha1(url.encode()).hexdigest()[:16]
+        return os.path.join(RANK_BACKGROUNDS_DIR, f"{guild_id}-{digest}.png")
+
+    def invalidate(self, guild_id: int):
+        self._layers.pop(guild_id, None)
+
+    async def get(self, guild_id: int, url: Optional[str], bot: commands.Bot) -> Optional[str]:
+        """Returns the path of the guild's layer file, or None for the default layer."""
+        if not url:
+            return None
+
+        entry = self._layers.get(guild_id)
+        if entry and entry[0] == url:
+            self._layers.move_to_end(guild_id)
+            return entry[1]
+
+        path = self._layer_path(guild_id, url)
+        if not os.path.exists(path):
+            background_data = await _fetch_image(bot, url)
+            if not background_data:
+                # Not cached, so the next card retries the fetch
+                return None
+            try:
+                layer = await asyncio.to_thread(_compose_background_layer, background_data)
+                await asyncio.to_thread(_save_layer_file, layer, path, guild_id)
+            except Exception as e:
+                print(f"[ERROR] Failed to build rank background layer for guild {guild_id}: {e}")
+                return None
+
+        self._layers[guild_id] = (url, path)
+        self._layers.move_to_end(guild_id)
+        while len(self._layers) > self.max_layers:
+            self._layers.popitem(last=False)
+        return path
+
+background_layers = BackgroundLayerCache(RANK_BACKGROUND_LAYERS_MAX)
+
+# Memory budget for rendered rank cards (bytes of PNG data)
+RANK_CARD_CACHE_BYTES = 32 * 1024 * 1024
+
+class RankCardCache:
+    """
+    LRU cache of rendered rank card PNGs, bounded by total bytes.
+    Keys cover everything drawn on the card, so any change is a natural miss.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple, bytes]" = OrderedDict()
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def get(self, key: Tuple) -> Optional[bytes]:
+        data = self._entries.get(key)
+        if data is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return data
+
+    def put(self, key: Tuple, data: bytes):
+        if len(data) > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= len(old)
+        self._entries[key] = data
+        self.size += len(data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+            self.evictions += 1
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "size": self.size,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+
+rank_card_cache = RankCardCache(RANK_CARD_CACHE_BYTES)
+
+def _rank_card_key(user: discord.Member, current_xp: int, level: int, total_xp: int, rank: int, background_url: Optional[str], text_color: str) -> Tuple:
+    return (user.id, user.display_avatar.key, user.display_name, level, current_xp, total_xp, rank, background_url, text_color)
+
+def _render_rank_card(
+    avatar_data: Optional[bytes],
+    layer_path: Optional[str],
+    display_name: str,
+    text_color: str,
+    current_xp: int,
+    level: int,
+    total_xp: int,
+    xp_needed: int,
+    rank: int
+) -> Optional[bytes]:
+    """
+    Draws a rank card onto a copy of the guild's background layer (by file path; None
+    for the default) and returns PNG bytes.
+    Module-level and plain-data only so it can run in the RenderService process pool.
+    """
+    try:
+        # --- Setup ---
+        card_width = CARD_WIDTH
+        card_height = CARD_HEIGHT
+        avatar_size = AVATAR_SIZE
+        padding = CARD_PADDING
+
+        # Convert hex color to RGB tuple
+        try:
+            text_color_rgb = tuple(int(text_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
+        except:
+            text_color_rgb = (255, 255, 255) # Default to white if invalid hex
+
+        # --- Base Image (pre-composited background + empty XP bar) ---
+        base_img = _load_layer(layer_path).copy()
+
+        # Create a drawing context
+        draw = ImageDraw.Draw(base_img)
+
+        # --- Fonts ---
+        font_large = get_font(40)
+        font_medium = get_font(30)
+        font_small = get_font(20)
+
+        # --- XP Bar Calculation ---
+        bar_width = BAR_WIDTH
+        bar_height = BAR_HEIGHT
+        bar_x = BAR_X
+        bar_y = BAR_Y
+
+        # Calculate progress
+        progress = current_xp / xp_needed if xp_needed > 0 else 0
+        progress_width = int(bar_width * progress)
+
+        # --- Draw XP Bar (Progress) ---
+        # Using a distinct color for progress (Discord Blurple: 88, 101, 242)
+        if progress_width > 0:
+            draw.rounded_rectangle(
+                (bar_x, bar_y, bar_x + progress_width, bar_y + bar_height), 
+                radius=bar_height // 2, 
+                fill=(88, 101, 242, 255)
+            )
+
+        # --- Text: Username, Discriminator, Rank, Level ---
+
+        # Username and Tag
+        username_text = str(display_name)
+        draw.text((bar_x, padding), username_text, font=font_large, fill=text_color_rgb)
+
+        # Level
+        level_text = f"LEVEL {level}"
+        level_x = card_width - padding - draw.textlength(level_text, font=font_large)
+        draw.text((level_x, padding), level_text, font=font_large, fill=text_color_rgb)
+
+        # Rank
+        rank_text = f"RANK #{rank}"
+        # Positioning rank text just below level text and aligned to the right
+        rank_x = card_width - padding - draw.textlength(rank_text, font=font_medium)
+        draw.text((rank_x, padding + 50), rank_text, font=font_medium, fill=(180, 180, 180)) # Gray
+
+        # XP numbers
+        xp_text = f"{current_xp:,} / {xp_needed:,} XP"
+        draw.text((bar_x, bar_y - 30), xp_text, font=font_small, fill=text_color_rgb)
+
+        # Total XP
+        total_xp_text = f"Total XP: {total_xp:,}"
+        total_xp_x = bar_x
+        draw.text((total_xp_x, bar_y + bar_height + 5), total_xp_text, font=font_small, fill=(180, 180, 180))
+
+
+        # --- Avatar Handling ---
+        if avatar_data:
+            avatar_img = Image.open(io.BytesIO(avatar_data)).convert("RGBA")
+            avatar_img = avatar_img.resize((avatar_size, avatar_size), Image.Resampling.LANCZOS)
+
+            # Create a circular mask
+            mask = Image.new('L', (avatar_size, avatar_size), 0)
+            mask_draw = ImageDraw.Draw(mask)
+            mask_draw.ellipse((0, 0, avatar_size, avatar_size), fill=255)
+
+            # Apply the mask
+            avatar_img.putalpha(mask)
+
+            # Paste the avatar
+            avatar_x = padding
+            avatar_y = (card_height - avatar_size) // 2
+            base_img.paste(avatar_img, (avatar_x, avatar_y), avatar_img)
+
+
+        # --- Finalize Image ---
+        final_buffer = io.BytesIO()
+        base_img.save(final_buffer, format="PNG")
+        return final_buffer.getvalue()
+
+    except Exception as e:
+        print(f"Error generating rank card: {e}")
+        return None
+
 async def _generate_rank_card(
+    bot: Optional[commands.Bot],
     user: discord.Member,
     current_xp: int,
     level: int,
@@ -214,141 +1234,717 @@ async def _generate_rank_card(
 ) -> Optional[io.BytesIO]:
     """
     Generates the rank card image with a custom background and colors.
-    This is run in a separate thread to avoid blocking the bot.
+    Rendering runs in the RenderService process pool (or a thread) to avoid blocking the bot.
+    Identical cards are served from `rank_card_cache` without any fetching or rendering.
     """
-    
-    async with aiohttp.ClientSession() as session:
-        # --- Asynchronous Fetching ---
-        avatar_size = 180
-        avatar_url = str(user.display_avatar.with_size(avatar_size).url)
-        avatar_data_task = asyncio.create_task(_fetch_image(session, avatar_url))
-        
-        background_data_task = None
-        if background_url:
-            background_data_task = asyncio.create_task(_fetch_image(session, background_url))
-            
-        avatar_data = await avatar_data_task
-        background_data = await background_data_task if background_data_task else None
-        
-    def sync_generate(avatar_data: Optional[io.BytesIO], background_data: Optional[io.BytesIO]):
+    cache_key = _rank_card_key(user, current_xp, level, total_xp, rank, background_url, text_color)
+    cached = rank_card_cache.get(cache_key)
+    if cached is not None:
+        return io.BytesIO(cached)
+
+    # --- Asynchronous Fetching ---
+    avatar_url = str(user.display_avatar.with_size(AVATAR_SIZE).url)
+    avatar_data_task = asyncio.create_task(_fetch_image(bot, avatar_url))
+    # Background is fetched and composited once per guild, not per card
+    layer_path = await background_layers.get(user.guild.id, background_url, bot)
+    avatar_data = await avatar_data_task
+
+    # --- Render off the event loop (process pool when available) ---
+    try:
+        card_data = await run_render(
+            bot, _render_rank_card,
+            avatar_data.getvalue() if avatar_data else None, layer_path,
+            str(user.display_name), text_color, current_xp, level, total_xp, xp_needed, rank
+        )
+    except Exception as e:
+        print(f"Error generating rank card: {e}")
+        return None
+
+    if card_data is None:
+        return None
+    rank_card_cache.put(cache_key, card_data)
+    return io.BytesIO(card_data)
+
+# Pending background renders; further requests are dropped while it is full
+PRERENDER_QUEUE_SIZE = 256
+# Rank changes within this many places trigger a prerender (level-ups always do)
+PRERENDER_TOP_RANKS = 100
+
+class RankCardPrerenderer:
+    """
+    Warms `rank_card_cache` for guilds with `rank_card_prerender` enabled, so the
+    next /rank after a level-up or a top-rank change is usually a cache hit.
+    A single worker drains a bounded queue and skips jobs while the render pool
+    is saturated, so prerendering never competes with interactive /rank calls.
+    """
+
+    def __init__(self, cog: "Leveling"):
+        self.cog = cog
+        self._queue: asyncio.Queue = asyncio.Queue(PRERENDER_QUEUE_SIZE)
+        # (guild_id, user_id) -> newest member object; one queue slot per user
+        self._pending: Dict[Tuple[int, int], discord.Member] = {}
+        self._worker: Optional[asyncio.Task] = None
+        self.stats: Dict[str, int] = {"queued": 0, "rendered": 0, "dropped": 0, "skipped_busy": 0, "failed": 0}
+
+    def start(self):
+        if self._worker is None:
+            self._worker = asyncio.create_task(self._run())
+
+    def stop(self):
+        if self._worker is not None:
+            self._worker.cancel()
+            self._worker = None
+
+    def request(self, member: discord.Member):
+        key = (member.guild.id, member.id)
+        if key in self._pending:
+            # Already queued; the card is rendered from the data current at that time
+            self._pending[key] = member
+            return
         try:
-            # --- Setup ---
-            card_width, card_height = 900, 250
-            avatar_size = 180
-            padding = 30
-            
-            # Convert hex color to RGB tuple
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            self.stats["dropped"] += 1
+            return
+        self._pending[key] = member
+        self.stats["queued"] += 1
+
+    async def _run(self):
+        while True:
+            key = await self._queue.get()
+            member = self._pending.pop(key, None)
+            if member is None:
+                continue
+
+            render_service = self.cog.bot.get_cog("RenderService")
+            if render_service is not None and render_service.saturated:
+                self.stats["skipped_busy"] += 1
+                continue
+
             try:
-                text_color_rgb = tuple(int(text_color.lstrip('#')[i:i+2], 16) for i in (0, 2, 4))
-            except:
-                text_color_rgb = (255, 255, 255) # Default to white if invalid hex
-
-            # --- Base Image (Default Background or Custom) ---
-            if background_data:
-                bg_img = Image.open(background_data).convert("RGBA")
-                # Resize and crop the background image to fit the card
-                base_img = ImageOps.fit(bg_img, (card_width, card_height), method=Image.Resampling.LANCZOS).convert("RGBA")
-                
-                # Apply a dark overlay for better text readability
-                overlay = Image.new('RGBA', (card_width, card_height), (0, 0, 0, 150)) # Black, 60% opacity
-                base_img.paste(overlay, (0, 0), overlay)
-            else:
-                # Default dark theme background
-                base_img = Image.new('RGBA', (card_width, card_height), (44, 47, 51, 255)) 
-
-            # Create a drawing context
-            draw = ImageDraw.Draw(base_img)
-
-            # --- Fonts ---
-            font_large = get_font(40)
-            font_medium = get_font(30)
-            font_small = get_font(20)
-
-            # --- XP Bar Calculation ---
-            bar_width = card_width - (avatar_size + 3 * padding) - 100 
-            bar_height = 30
-            bar_x = avatar_size + 2 * padding
-            bar_y = card_height - 2 * padding - bar_height
-            
-            # Calculate progress
-            progress = current_xp / xp_needed if xp_needed > 0 else 0
-            progress_width = int(bar_width * progress)
+                file_buffer, _ = await self.cog._render_member_card(member)
+            except Exception as e:
+                print(f"[ERROR] Failed to prerender rank card for {member.id} in guild {member.guild.id}: {e}")
+                file_buffer = None
+            self.stats["rendered" if file_buffer else "failed"] += 1
 
-            # --- Draw XP Bar (Background) ---
-            draw.rounded_rectangle(
-                (bar_x, bar_y, bar_x + bar_width, bar_y + bar_height), 
-                radius=bar_height // 2, 
-                fill=(32, 34, 37, 255) # Dark gray for background
-            )
+# ------------------------------------------------------
+# 🏆 Leaderboard Image
+# ------------------------------------------------------
+LEADERBOARD_IMAGE_WIDTH = 800
+LEADERBOARD_HEADER_HEIGHT = 80
+LEADERBOARD_ROW_HEIGHT = 64
+LEADERBOARD_THUMB_SIZE = 48
+LEADERBOARD_PADDING = 16
+LEADERBOARD_RANK_COLORS = {1: (255, 215, 0), 2: (192, 192, 192), 3: (205, 127, 50)}
+# Fetched avatar images kept by the bot (a few KB each)
+LEADERBOARD_AVATARS_MAX = 2048
+# Circle-masked thumbnails kept by each render process (~9 KB each)
+LEADERBOARD_THUMBNAILS_MAX = 512
+# Last rendered board per (guild, period, size), served again while nothing on it changes
+LEADERBOARD_IMAGES_MAX = 64
+
+@functools.lru_cache(maxsize=LEADERBOARD_THUMBNAILS_MAX)
+def _avatar_thumbnail(avatar_data: bytes) -> Image.Image:
+    """Resizes an avatar to LEADERBOARD_THUMB_SIZE and masks it to a circle, once per process. Read-only."""
+    size = LEADERBOARD_THUMB_SIZE
+    with Image.open(io.BytesIO(avatar_data)) as img:
+        thumb = img.convert("RGBA").resize((size, size), Image.Resampling.LANCZOS)
+    mask = Image.new("L", (size, size), 0)
+    ImageDraw.Draw(mask).ellipse((0, 0, size, size), fill=255)
+    thumb.putalpha(mask)
+    return thumb
+
+class AvatarCache:
+    """
+    LRU of fetched avatar images (encoded bytes), keyed by avatar hash (changes whenever
+    the avatar does). Thumbnails are built from these inside the render job.
+    """
 
-            # --- Draw XP Bar (Progress) ---
-            # Using a distinct color for progress (Discord Blurple: 88, 101, 242)
-            if progress_width > 0:
-                draw.rounded_rectangle(
-                    (bar_x, bar_y, bar_x + progress_width, bar_y + bar_height), 
-                    radius=bar_height // 2, 
-                    fill=(88, 101, 242, 255)
-                )
+    def __init__(self, max_items: int):
+        self.max_items = max_items
+        self._avatars: "OrderedDict[str, bytes]" = OrderedDict()
 
-            # --- Text: Username, Discriminator, Rank, Level ---
-            
-            # Username and Tag
-            username_text = str(user.display_name)
-            draw.text((bar_x, padding), username_text, font=font_large, fill=text_color_rgb)
-
-            # Level
-            level_text = f"LEVEL {level}"
-            level_x = card_width - padding - draw.textlength(level_text, font=font_large)
-            draw.text((level_x, padding), level_text, font=font_large, fill=text_color_rgb)
-            
-            # Rank
-            rank_text = f"RANK #{rank}"
-            # Positioning rank text just below level text and aligned to the right
-            rank_x = card_width - padding - draw.textlength(rank_text, font=font_medium)
-            draw.text((rank_x, padding + 50), rank_text, font=font_medium, fill=(180, 180, 180)) # Gray
-
-            # XP numbers
-            xp_text = f"{current_xp:,} / {xp_needed:,} XP"
-            draw.text((bar_x, bar_y - 30), xp_text, font=font_small, fill=text_color_rgb)
-
-            # Total XP
-            total_xp_text = f"Total XP: {total_xp:,}"
-            total_xp_x = bar_x
-            draw.text((total_xp_x, bar_y + bar_height + 5), total_xp_text, font=font_small, fill=(180, 180, 180))
-
-
-            # --- Avatar Handling ---
-            if avatar_data:
-                avatar_img = Image.open(avatar_data).convert("RGBA")
-                avatar_img = avatar_img.resize((avatar_size, avatar_size), Image.Resampling.LANCZOS)
-
-                # Create a circular mask
-                mask = Image.new('L', (avatar_size, avatar_size), 0)
-                mask_draw = ImageDraw.Draw(mask)
-                mask_draw.ellipse((0, 0, avatar_size, avatar_size), fill=255)
-
-                # Apply the mask
-                avatar_img.putalpha(mask)
-
-                # Paste the avatar
-                avatar_x = padding
-                avatar_y = (card_height - avatar_size) // 2
-                base_img.paste(avatar_img, (avatar_x, avatar_y), avatar_img)
-
-
-            # --- Finalize Image ---
-            final_buffer = io.BytesIO()
-            base_img.save(final_buffer, format="PNG")
-            final_buffer.seek(0)
-            return final_buffer
-        
+    async def get(self, bot: commands.Bot, member: discord.Member) -> Optional[bytes]:
+        avatar = member.display_avatar
+        avatar_data = self._avatars.get(avatar.key)
+        if avatar_data is not None:
+            self._avatars.move_to_end(avatar.key)
+            return avatar_data
+
+        fetched = await _fetch_image(bot, str(avatar.with_size(64).url))
+        if fetched is None:
+            # Not cached, so the next render retries the fetch
+            return None
+
+        avatar_data = self._avatars[avatar.key] = fetched.getvalue()
+        while len(self._avatars) > self.max_items:
+            self._avatars.popitem(last=False)
+        return avatar_data
+
+leaderboard_avatars = AvatarCache(LEADERBOARD_AVATARS_MAX)
+
+def _fit_text(draw: ImageDraw.ImageDraw, text: str, font, max_width: float) -> str:
+    if draw.textlength(text, font=font) <= max_width:
+        return text
+    while text and draw.textlength(f"{text}...", font=font) > max_width:
+        text = text[:-1]
+    return f"{text}..."
+
+def _draw_leaderboard_row(img: Image.Image, draw: ImageDraw.ImageDraw, index: int, row: Tuple):
+    """Paints one row, background included."""
+    rank, name, level, xp, avatar_data = row
+    top = LEADERBOARD_HEADER_HEIGHT + index * LEADERBOARD_ROW_HEIGHT
+    bottom = top + LEADERBOARD_ROW_HEIGHT
+    fill = (54, 57, 63, 255) if index % 2 == 0 else (47, 49, 54, 255)
+    draw.rectangle((0, top, LEADERBOARD_IMAGE_WIDTH, bottom - 1), fill=fill)
+
+    font_rank = get_font(26)
+    font_name = get_font(24)
+    font_stats = get_font(20)
+    center_y = top + LEADERBOARD_ROW_HEIGHT // 2
+    x = LEADERBOARD_PADDING
+
+    draw.text((x, center_y), f"#{rank}", font=font_rank, fill=LEADERBOARD_RANK_COLORS.get(rank, (180, 180, 180)), anchor="lm")
+    x += 70
+
+    thumb = None
+    if avatar_data is not None:
+        try:
+            thumb = _avatar_thumbnail(avatar_data)
+        except Exception as e:
+            print(f"[ERROR] Failed to build avatar thumbnail for leaderboard rank {rank}: {e}")
+    if thumb is not None:
+        img.paste(thumb, (x, center_y - LEADERBOARD_THUMB_SIZE // 2), thumb)
+    else:
+        draw.ellipse((x, center_y - LEADERBOARD_THUMB_SIZE // 2, x + LEADERBOARD_THUMB_SIZE, center_y + LEADERBOARD_THUMB_SIZE // 2), fill=(88, 101, 242, 255))
+    x += LEADERBOARD_THUMB_SIZE + LEADERBOARD_PADDING
+
+    stats_text = f"{xp:,} XP" if level is None else f"Level {level}  |  {xp:,} XP"
+    stats_x = LEADERBOARD_IMAGE_WIDTH - LEADERBOARD_PADDING - draw.textlength(stats_text, font=font_stats)
+    draw.text((stats_x, center_y), stats_text, font=font_stats, fill=(180, 180, 180), anchor="lm")
+
+    name = _fit_text(draw, name, font_name, stats_x - x - LEADERBOARD_PADDING)
+    draw.text((x, center_y), name, font=font_name, fill=(255, 255, 255), anchor="lm")
+
+def _render_leaderboard_image(title: str, rows: List[Tuple]) -> bytes:
+    """
+    Draws the board (`rows` is [(rank, name, level, xp, avatar bytes), ...]) and returns PNG bytes.
+    Module-level and plain-data only so it can run in the RenderService process pool;
+    avatar thumbnails are built (and cached) in the process that draws them.
+    """
+    height = LEADERBOARD_HEADER_HEIGHT + len(rows) * LEADERBOARD_ROW_HEIGHT
+    img = Image.new("RGBA", (LEADERBOARD_IMAGE_WIDTH, height), (44, 47, 51, 255))
+    draw = ImageDraw.Draw(img)
+    draw.text((LEADERBOARD_PADDING, LEADERBOARD_HEADER_HEIGHT // 2), title, font=get_font(34), fill=(255, 255, 255), anchor="lm")
+    for index, row in enumerate(rows):
+        _draw_leaderboard_row(img, draw, index, row)
+
+    buffer = io.BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
+class LeaderboardImageCache:
+    """
+    Last rendered image per (guild_id, period, size) plus the per-row data it shows,
+    so a refresh where nothing changed is served without rendering again.
+    """
+
+    def __init__(self, max_boards: int):
+        self.max_boards = max_boards
+        self._boards: "OrderedDict[Tuple, Tuple[str, List[Tuple], bytes]]" = OrderedDict()
+        self.stats: Dict[str, int] = {"rendered": 0, "unchanged": 0}
+
+    def _unchanged(self, key: Tuple, title: str, signatures: List[Tuple]) -> Optional[bytes]:
+        previous = self._boards.get(key)
+        if previous is None or previous[0] != title or previous[1] != signatures:
+            return None
+        self._boards.move_to_end(key)
+        self.stats["unchanged"] += 1
+        return previous[2]
+
+    async def render(self, bot: commands.Bot, key: Tuple, title: str, rows: List[Tuple[Tuple, Optional[discord.Member]]]) -> Optional[bytes]:
+        """
+        `rows` is [(signature, member), ...] where signature is (rank, user_id, name, avatar_key, level, xp).
+        Returns PNG bytes, or None if rendering failed.
+        """
+        # Same rows, all drawn with their avatars: no avatars needed either
+        png = self._unchanged(key, title, [signature + (True,) for signature, _ in rows])
+        if png is not None:
+            return png
+
+        avatars = await asyncio.gather(*(
+            leaderboard_avatars.get(bot, member) if member is not None else _no_avatar()
+            for _, member in rows
+        ))
+        # Avatar availability is part of the signature, so missing ones are retried next time
+        signatures = [signature + (avatar_data is not None,) for (signature, _), avatar_data in zip(rows, avatars)]
+        png = self._unchanged(key, title, signatures)
+        if png is not None:
+            return png
+
+        board_rows = []
+        for (signature, _), avatar_data in zip(rows, avatars):
+            rank, _, name, _, level, xp = signature
+            board_rows.append((rank, name, level, xp, avatar_data))
+        try:
+            png = await run_render(bot, _render_leaderboard_image, title, board_rows)
         except Exception as e:
-            print(f"Error generating rank card: {e}")
+            print(f"[ERROR] Failed to render leaderboard image: {e}")
             return None
 
-    # --- Run image generation synchronously in a thread pool ---
-    buffer = await asyncio.to_thread(sync_generate, avatar_data, background_data)
-    return buffer
+        self.stats["rendered"] += 1
+        self._boards[key] = (title, signatures, png)
+        self._boards.move_to_end(key)
+        while len(self._boards) > self.max_boards:
+            self._boards.popitem(last=False)
+        return png
+
+async def _no_avatar() -> None:
+    return None
+
+leaderboard_images = LeaderboardImageCache(LEADERBOARD_IMAGES_MAX)
+
+# ------------------------------------------------------
+# 📦 Level Import / Export Helpers
+# ------------------------------------------------------
+IMPORT_BATCH_ROWS = 10_000 # Rows applied + journaled per batch (bounds memory)
+IMPORT_PROGRESS_INTERVAL = 2.0 # seconds between progress message edits
+IMPORT_READ_BYTES = 64 * 1024 # Per network read
+IMPORT_DECODE_BYTES = 4 * 1024 * 1024 # Max gunzipped bytes per decompress call
+IMPORT_MAX_LINE_BYTES = 64 * 1024 # Longer lines are dropped (and counted as skipped)
+IMPORT_STALL_SECONDS = 60 # A download that sends nothing for this long is given up
+# Replaces the shared session's total timeout, which would cut off large files mid-download
+IMPORT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=10, sock_read=IMPORT_STALL_SECONDS)
+# Column / key names accepted from other bots' exports (compared lowercase)
+IMPORT_USER_ID_KEYS = ("user_id", "userid", "id", "user", "discord_id", "member_id")
+IMPORT_TOTAL_XP_KEYS = ("total_xp", "totalxp", "total", "experience")
+
+def _import_values(user_id: Any, total_xp: Any, level: Any, xp: Any) -> Optional[Tuple[str, int]]:
+    """(user_id, total_xp) from one imported row's fields, or None if it is unusable."""
+    try:
+        user_id = int(str(user_id).strip())
+        if total_xp not in (None, ""):
+            total_xp = int(float(total_xp))
+        elif level not in (None, ""):
+            # level + progress into that level
+            total_xp = get_total_xp_required(int(float(level))) + int(float(xp or 0))
+        else:
+            # A lone "xp" column is the lifetime total in most bots' exports
+            total_xp = int(float(xp))
+    except (TypeError, ValueError, OverflowError):
+        return None
+    if user_id <= 0:
+        return None
+    return str(user_id), max(total_xp, 0)
+
+def _import_columns(names: List[str]) -> Tuple[Optional[Any], ...]:
+    """The first matching name for user id, total XP, level and xp (None where absent)."""
+    def first(candidates):
+        return next((name for name in candidates if name in names), None)
+    return first(IMPORT_USER_ID_KEYS), first(IMPORT_TOTAL_XP_KEYS), first(("level",)), first(("xp",))
+
+def _parse_import_lines(lines: List[str], file_format: str, state: Dict[str, Any]) -> Tuple[List[Tuple[str, int]], int]:
+    """Parses a batch of complete lines. `state` carries the CSV header between batches."""
+    rows, skipped = [], 0
+    if file_format == "csv":
+        for fields in csv.reader(lines):
+            if not fields:
+                continue
+            columns = state.get("columns")
+            if columns is None:
+                header = [field.strip().lower() for field in fields]
+                user_column, total_column, level_column, xp_column = _import_columns(header)
+                if user_column is None:
+                    raise ValueError(f"CSV header must contain a user id column ({', '.join(IMPORT_USER_ID_KEYS)}).")
+                state["columns"] = [header.index(name) if name else None for name in (user_column, total_column, level_column, xp_column)]
+                continue
+            try:
+                values = _import_values(*(fields[index] if index is not None else None for index in columns))
+            except IndexError:
+                values = None
+            if values is None:
+                skipped += 1
+            else:
+                rows.append(values)
+    else:
+        for line in lines:
+            if not line.strip():
+                continue
+            try:
+                item = json.loads(line)
+            except JSONDecodeError:
+                skipped += 1
+                continue
+            values = None
+            if isinstance(item, dict):
+                item = {str(key).lower(): value for key, value in item.items()}
+                user_key, total_key, level_key, xp_key = _import_columns(item)
+                if user_key is not None:
+                    values = _import_values(*(item[key] if key else None for key in (user_key, total_key, level_key, xp_key)))
+            if values is None:
+                skipped += 1
+            else:
+                rows.append(values)
+    return rows, skipped
+
+async def _iter_remote_lines(session: aiohttp.ClientSession, url: str, gzipped: bool):
+    """
+    Yields (lines, dropped) as a URL downloads, gunzipping on the fly: lists of
+    complete text lines, and how many lines over IMPORT_MAX_LINE_BYTES were dropped.
+    Decompressed output and the unterminated last line are both capped, so memory
+    stays bounded however well the file compresses or however long its lines are.
+    """
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    buffer = b""
+    discarding = False # Inside a dropped line, until its newline arrives
+    first = True
+
+    def split(data: bytes) -> Tuple[List[str], int]:
+        nonlocal buffer, discarding, first
+        pieces = (buffer + data).split(b"\n")
+        buffer = pieces.pop()
+        if discarding and pieces:
+            pieces.pop(0) # The rest of the dropped line
+            discarding = False
+        dropped = 0
+        if len(buffer) > IMPORT_MAX_LINE_BYTES:
+            if not discarding:
+                dropped += 1
+            buffer = b""
+            discarding = True
+        lines = []
+        for piece in pieces:
+            if len(piece) > IMPORT_MAX_LINE_BYTES:
+                dropped += 1
+                continue
+            line = piece.decode("utf-8", errors="replace").rstrip("\r")
+            if first:
+                line = line.lstrip("\ufeff")
+                first = False
+            lines.append(line)
+        return lines, dropped
+
+    async with session.get(url, timeout=IMPORT_TIMEOUT) as response:
+        response.raise_for_status()
+        async for chunk in response.content.iter_chunked(IMPORT_READ_BYTES):
+            while chunk:
+                if decompressor is not None:
+                    data = decompressor.decompress(chunk, IMPORT_DECODE_BYTES)
+                    chunk = decompressor.unconsumed_tail
+                else:
+                    data, chunk = chunk, b""
+                lines, dropped = split(data)
+                if lines or dropped:
+                    yield lines, dropped
+        if decompressor is not None:
+            lines, dropped = split(decompressor.flush())
+            if lines or dropped:
+                yield lines, dropped
+        if buffer.strip() and not discarding:
+            lines, dropped = split(b"\n")
+            yield lines, dropped
+
+def _write_level_export(path: str, users: Dict[str, Dict[str, Any]], user_ids: List[str], file_format: str) -> int:
+    """Writes one row per user, reading records as it goes. Runs in a worker thread."""
+    written = 0
+    with open(path, "w", newline="") as f:
+        writer = csv.writer(f) if file_format == "csv" else None
+        if writer is not None:
+            writer.writerow(["user_id", "total_xp", "level", "xp"])
+        for user_id in user_ids:
+            record = users.get(user_id)
+            if record is None:
+                continue # Deleted since the export started
+            row = [user_id, record.get("total_xp", 0), record.get("level", 0), record.get("xp", 0)]
+            if writer is not None:
+                writer.writerow(row)
+            else:
+                f.write(json.dumps(dict(zip(("user_id", "total_xp", "level", "xp"), row))) + "\n")
+            written += 1
+    return written
+
+def _gzip_file(path: str) -> str:
+    gz_path = f"{path}.gz"
+    with open(path, "rb") as source, gzip.open(gz_path, "wb") as target:
+        shutil.copyfileobj(source, target, 1024 * 1024)
+    return gz_path
+
+# ------------------------------------------------------
+# 🎭 Level Role Reconciliation
+# ------------------------------------------------------
+LEVEL_ROLE_JOBS_FILE = "data/level_role_jobs.json" # Resume state of unfinished jobs
+RECONCILE_WORKERS = 16 # Concurrent member edits per job; each edit is mostly round trip time
+# Member edits share one Discord route bucket per guild...
+RECONCILE_ROUTE_EDITS_PER_SECOND = 20.0
+# ...and every route shares the bot's global limit (50 requests/s), leaving room for other traffic
+RECONCILE_GLOBAL_EDITS_PER_SECOND = 40.0
+RECONCILE_ROUTES_MAX = 1024 # Route buckets kept; an evicted one only forgets its pause
+RECONCILE_PROGRESS_INTERVAL = 5.0 # seconds between progress message edits
+
+def _rate_limit_info(error: discord.HTTPException) -> Tuple[float, bool]:
+    """(retry_after seconds, is_global) from a 429 response."""
+    headers = getattr(error.response, "headers", None) or {}
+    try:
+        retry_after = float(headers.get("Retry-After", 5.0))
+    except (TypeError, ValueError):
+        retry_after = 5.0
+    return retry_after, headers.get("X-RateLimit-Global") == "true"
+
+class RouteRateLimiter:
+    """
+    Paces API calls the way Discord limits them: one TokenBucket per route (here, a
+    guild's member edits) under one bot-wide bucket. A 429 pauses only the bucket it
+    names, so one guild hitting its limit does not hold back jobs in other guilds.
+    """
+
+    def __init__(self, route_rate: float, global_rate: float):
+        self.route_rate = route_rate
+        self.global_bucket = TokenBucket(global_rate, global_rate)
+        self._routes: "OrderedDict[Any, TokenBucket]" = OrderedDict()
+
+    def route(self, key: Any) -> TokenBucket:
+        bucket = self._routes.get(key)
+        if bucket is None:
+            bucket = self._routes[key] = TokenBucket(self.route_rate, self.route_rate)
+            while len(self._routes) > RECONCILE_ROUTES_MAX:
+                self._routes.popitem(last=False)
+        self._routes.move_to_end(key)
+        return bucket
+
+    async def acquire(self, key: Any):
+        # Route first, so a paused route never holds the global bucket
+        await self.route(key).acquire()
+        await self.global_bucket.acquire()
+
+    def rate_limited(self, key: Any, retry_after: float, is_global: bool = False):
+        (self.global_bucket if is_global else self.route(key)).pause(retry_after)
+
+def _level_role_thresholds(level_roles: Dict[str, Any]) -> List[Tuple[int, int]]:
+    """[(level, role_id), ...] from a guild's `level_roles` config, skipping invalid entries."""
+    thresholds = []
+    for level, role_id in level_roles.items():
+        try:
+            thresholds.append((int(level), int(role_id)))
+        except (TypeError, ValueError):
+            continue
+    return thresholds
+
+
+class LevelRoleReconciler:
+    """
+    Background jobs that bring every member's level roles in line with `level_roles`:
+    roles for reached levels are added, roles for higher levels (or roles no longer
+    configured) are removed. Members are walked in id order and the position is saved
+    to LEVEL_ROLE_JOBS_FILE, so a restart resumes where the job left off.
+    Members whose roles already match cost no API call; the rest are edited by
+    RECONCILE_WORKERS workers per job, paced per guild by a RouteRateLimiter.
+    """
+
+    def __init__(self, cog: "Leveling"):
+        self.cog = cog
+        self.jobs: Dict[str, Dict[str, Any]] = load_data(LEVEL_ROLE_JOBS_FILE)
+        # Shared by every job's workers, keyed by guild (Discord's member edit route)
+        self.limiter = RouteRateLimiter(RECONCILE_ROUTE_EDITS_PER_SECOND, RECONCILE_GLOBAL_EDITS_PER_SECOND)
+        self._tasks: Dict[int, asyncio.Task] = {}
+
+    # --- Planning ---
+    @staticmethod
+    def _assignable(guild: discord.Guild, role_ids: Set[int]) -> Dict[int, discord.Role]:
+        me = guild.me
+        roles = {}
+        for role_id in role_ids:
+            role = guild.get_role(role_id)
+            if role and not role.managed and me is not None and me.top_role > role:
+                roles[role_id] = role
+        return roles
+
+    @staticmethod
+    def _changes(member: discord.Member, level: int, thresholds: List[Tuple[int, int]], managed: Dict[int, discord.Role]):
+        wanted = {role_id for required, role_id in thresholds if level >= required and role_id in managed}
+        current = {role.id for role in member.roles}
+        add = [managed[role_id] for role_id in wanted - current]
+        remove = [managed[role_id] for role_id in (managed.keys() - wanted) & current]
+        return add, remove
+
+    async def _apply(self, member: discord.Member, add: List[discord.Role], remove: List[discord.Role]) -> bool:
+        """One member edit for all changes, retried on 429/5xx."""
+        route = member.guild.id
+        remove_ids = {role.id for role in remove}
+        for attempt in range(3):
+            await self.limiter.acquire(route)
+            roles = [role for role in member.roles if not role.is_default() and role.id not in remove_ids]
+            roles.extend(role for role in add if role not in roles)
+            try:
+                await member.edit(roles=roles, reason="Level role sync")
+                return True
+            except discord.Forbidden:
+                return False
+            except discord.NotFound:
+                return False # Left the server
+            except discord.RateLimited as e:
+                # discord.py would have waited longer than its max_ratelimit_timeout
+                self.limiter.rate_limited(route, e.retry_after)
+            except discord.HTTPException as e:
+                if e.status == 429:
+                    self.limiter.rate_limited(route, *_rate_limit_info(e))
+                elif e.status >= 500:
+                    await asyncio.sleep(1 + attempt)
+                else:
+                    return False
+        return False
+
+    async def reconcile_member(self, member: discord.Member) -> bool:
+        """Fixes a single member's level roles right away (used after admin XP/level changes)."""
+        config = self.cog.store.get_config(member.guild.id)
+        thresholds = _level_role_thresholds(config.get("level_roles", {}))
+        managed = self._assignable(member.guild, {role_id for _, role_id in thresholds})
+        level = self.cog.store.get_user(member.guild.id, member.id)["level"]
+        add, remove = self._changes(member, level, thresholds, managed)
+        if not add and not remove:
+            return True
+        return await self._apply(member, add, remove)
+
+    # --- Jobs ---
+    def schedule(self, guild: discord.Guild, channel: Optional[discord.abc.Messageable] = None, remove_role_ids: Set[int] = frozenset()):
+        """Starts (or restarts from the first member) the guild's reconcile job."""
+        guild_id = str(guild.id)
+        previous = self.jobs.get(guild_id, {})
+        task = self._tasks.pop(guild.id, None)
+        if task is not None:
+            task.cancel()
+        self.jobs[guild_id] = {
+            # Roles that were unassigned from a level still need to be taken away
+            "remove_roles": sorted(set(previous.get("remove_roles", [])) | set(remove_role_ids)),
+            "resume_after": 0,
+            "channel_id": channel.id if channel is not None else previous.get("channel_id"),
+            "message_id": None,
+            "total": None,
+            "checked": 0,
+            "updated": 0,
+            "failed": 0
+        }
+        self._start(guild)
+
+    def _start(self, guild: discord.Guild):
+        task = asyncio.create_task(self._run(guild))
+        self._tasks[guild.id] = task
+        task.add_done_callback(lambda done: self._tasks.pop(guild.id, None) if self._tasks.get(guild.id) is done else None)
+
+    async def resume_all(self):
+        await self.cog.bot.wait_until_ready()
+        for guild_id in list(self.jobs):
+            guild = self.cog.bot.get_guild(int(guild_id))
+            if guild is None:
+                del self.jobs[guild_id] # Bot left the guild
+            elif int(guild_id) not in self._tasks:
+                self._start(guild)
+        await self._save()
+
+    async def cancel_all(self):
+        """Stops every job and saves their resume points for the next start."""
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        self._tasks.clear()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await self._save()
+
+    async def _save(self):
+        content = json.dumps(self.jobs, indent=4)
+        try:
+            await asyncio.to_thread(_atomic_write, LEVEL_ROLE_JOBS_FILE, content)
+        except Exception as e:
+            print(f"[ERROR] Failed to save level role jobs: {e}")
+
+    async def _report(self, guild: discord.Guild, job: Dict[str, Any], finished: bool = False):
+        channel = guild.get_channel(job["channel_id"]) if job.get("channel_id") else None
+        if channel is not None:
+            if finished:
+                embed = self.cog.premium_embed(
+                    "Level Roles Synced",
+                    f"✅ Checked **{job['checked']:,}** members: **{job['updated']:,}** updated, **{job['failed']:,}** failed.",
+                    discord.Color.green()
+                )
+            else:
+                embed = self.cog.premium_embed(
+                    "Syncing Level Roles",
+                    f"🎭 Checked **{job['checked']:,}/{job['total'] or 0:,}** members: "
+                    f"**{job['updated']:,}** updated, **{job['failed']:,}** failed so far.",
+                    discord.Color.blue()
+                )
+            try:
+                if job.get("message_id"):
+                    await channel.get_partial_message(job["message_id"]).edit(embed=embed)
+                else:
+                    job["message_id"] = (await channel.send(embed=embed)).id
+            except discord.NotFound:
+                job["message_id"] = None
+            except discord.HTTPException:
+                pass
+        await self._save()
+
+    async def _run(self, guild: discord.Guild):
+        guild_id = str(guild.id)
+        job = self.jobs[guild_id]
+        try:
+            if not guild.chunked:
+                await guild.chunk()
+        except discord.HTTPException:
+            pass # Work with whatever is cached
+
+        config = self.cog.store.get_config(guild.id)
+        thresholds = _level_role_thresholds(config.get("level_roles", {}))
+        managed = self._assignable(guild, {role_id for _, role_id in thresholds} | set(job["remove_roles"]))
+        guild_levels = self.cog.store.get_guild_levels(guild.id)
+
+        members = sorted((m for m in guild.members if not m.bot and m.id > job["resume_after"]), key=lambda m: m.id)
+        if job["total"] is None:
+            job["total"] = len(members)
+
+        queue: asyncio.Queue = asyncio.Queue(maxsize=RECONCILE_WORKERS * 4)
+        in_flight: Set[int] = set()
+
+        async def worker():
+            while True:
+                member, add, remove = await queue.get()
+                try:
+                    if await self._apply(member, add, remove):
+                        job["updated"] += 1
+                    else:
+                        job["failed"] += 1
+                finally:
+                    in_flight.discard(member.id)
+                    queue.task_done()
+
+        workers = [asyncio.create_task(worker()) for _ in range(RECONCILE_WORKERS if managed else 0)]
+        last_report = 0.0
+        try:
+            for member in members:
+                if managed:
+                    record = guild_levels.get(str(member.id))
+                    add, remove = self._changes(member, record["level"] if record else 0, thresholds, managed)
+                    if add or remove:
+                        in_flight.add(member.id)
+                        await queue.put((member, add, remove))
+                job["checked"] += 1
+                # Everything below the oldest unfinished edit is done
+                job["resume_after"] = min(in_flight) - 1 if in_flight else member.id
+
+                if time.monotonic() - last_report >= RECONCILE_PROGRESS_INTERVAL:
+                    last_report = time.monotonic()
+                    await self._report(guild, job)
+                elif job["checked"] % 500 == 0:
+                    await asyncio.sleep(0) # Let the bot breathe between large cached chunks
+
+            await queue.join()
+        finally:
+            for task in workers:
+                task.cancel()
+
+        if self.jobs.get(guild_id) is job:
+            del self.jobs[guild_id]
+        await self._report(guild, job, finished=True)
 
 # ------------------------------------------------------
 # 🤖 Cog Implementation
@@ -363,9 +1959,43 @@ class Leveling(commands.Cog):
 
     def __init__(self, bot: commands.Bot):
         self.bot = bot
-        # Load data on init
-        self.levels = load_data(LEVELS_FILE)
-        self.config = load_data(CONFIG_FILE)
+        # Guilds load on first use; message handling only touches memory
+        self.store = LevelStore()
+        self.cooldowns = XpCooldowns()
+        self.role_sync = LevelRoleReconciler(self)
+        self.prerender = RankCardPrerenderer(self)
+        self._role_sync_resume: Optional[asyncio.Task] = None
+        atexit.register(self.store.flush_sync)
+        self.flush_task.start()
+        self.compact_task.start()
+
+    async def cog_load(self):
+        self.prerender.start()
+        # Unfinished level role jobs pick up where they stopped once the cache is ready
+        if self.role_sync.jobs:
+            self._role_sync_resume = asyncio.create_task(self.role_sync.resume_all())
+
+    async def cog_unload(self):
+        self.flush_task.cancel()
+        self.compact_task.cancel()
+        if self._role_sync_resume is not None:
+            self._role_sync_resume.cancel()
+        await self.role_sync.cancel_all()
+        self.prerender.stop()
+        atexit.unregister(self.store.flush_sync)
+        await self.store.flush()
+
+    @tasks.loop(seconds=JOURNAL_SYNC_INTERVAL)
+    async def flush_task(self):
+        """Batches journal appends into one write + fsync."""
+        await self.store.flush()
+
+    @tasks.loop(seconds=30)
+    async def compact_task(self):
+        """Folds guild journals into fresh snapshots and unloads idle guilds."""
+        await self.store.compact_due()
+        await self.store.evict_idle()
+        self.cooldowns.sweep(time.monotonic())
 
     def premium_embed(self, title, description, color=discord.Color.dark_green()):
         """Consistent embed generator."""
@@ -405,27 +2035,28 @@ class Leveling(commands.Cog):
         if message.content.startswith('!'): 
              return
 
-        config = get_guild_config(guild_id)
+        # Most messages in an active channel stop here, before any store access
+        now = time.monotonic()
+        if self.cooldowns.on_cooldown(guild_id, user_id, now):
+            return
+
+        config = self.store.get_config(guild_id)
         
         # Check ignored channels
         if message.channel.id in config.get("ignore_channels", []):
             return
 
-        user_data = get_user_data(guild_id, user_id)
-        last_message_time = user_data["last_message"] # This is a datetime object now
-        cooldown = config.get("xp_cooldown", 60)
-        
-        # Check cooldown
-        if (discord.utils.utcnow() - last_message_time).total_seconds() < cooldown:
-            return
+        user_data = self.store.get_user(guild_id, user_id)
+        self.cooldowns.start(guild_id, user_id, config.get("xp_cooldown", 60), now)
 
         # Grant XP
         xp_gain = random.randint(config.get("xp_min", 15), config.get("xp_max", 25))
         
         old_level = user_data["level"]
+        prerender = config.get("rank_card_prerender", False)
+        old_rank = self.store.leaderboard(guild_id).rank(user_id) if prerender else None
         user_data["xp"] += xp_gain
         user_data["total_xp"] += xp_gain
-        user_data["last_message"] = discord.utils.utcnow() # Update last message time
 
         # Level up check
         xp_needed = get_xp_needed(user_data["level"])
@@ -437,8 +2068,13 @@ class Leveling(commands.Cog):
             xp_needed = get_xp_needed(user_data["level"])
             leveled_up = True
         
-        # Save updated data
-        update_user_data(guild_id, user_id, user_data)
+        # Save updated data (in memory; flushed by flush_task)
+        self.store.update_user(guild_id, user_id, user_data, xp_gained=xp_gain)
+
+        if prerender:
+            new_rank = self.store.leaderboard(guild_id).rank(user_id)
+            if leveled_up or (new_rank != old_rank and new_rank <= PRERENDER_TOP_RANKS):
+                self.prerender.request(message.author)
         
         # --- Level Up Handling ---
         if leveled_up:
@@ -480,33 +2116,15 @@ class Leveling(commands.Cog):
     # ------------------------------------------------------
     # 📈 Rank Command (Unified)
     # ------------------------------------------------------
-    async def _handle_rank(self, source: Union[commands.Context, discord.Interaction], member: discord.Member):
-        if not member.guild:
-            # Only happens if the command is used outside a guild, which shouldn't happen for these commands
-            await self._send_response(source, self.premium_embed("Error", "❌ This command must be used in a server.", discord.Color.red()), ephemeral=True)
-            return
-
-        # Defer interaction for slash commands since image generation takes time
-        if isinstance(source, discord.Interaction) and not source.response.is_done():
-            await source.response.defer()
-
+    async def _render_member_card(self, member: discord.Member) -> Tuple[Optional[io.BytesIO], Dict[str, int]]:
+        """Renders (or serves from cache) a member's rank card. Also used by the prerenderer."""
         guild_id = member.guild.id
-        user_data = get_user_data(guild_id, member.id)
-        config = get_guild_config(guild_id)
-
-        # Calculate rank
-        guild_levels = load_data(LEVELS_FILE).get(str(guild_id), {})
-        # Filter out users with 0 total_xp and sort by total_xp descending
-        sorted_users = sorted(
-            [
-                (user_id, data['total_xp']) 
-                for user_id, data in guild_levels.items() if data.get('total_xp', 0) > 0
-            ], 
-            key=lambda item: item[1], 
-            reverse=True
-        )
-        
-        rank = next((i + 1 for i, (uid, xp) in enumerate(sorted_users) if int(uid) == member.id), len(sorted_users) + 1)
+        user_data = self.store.get_user(guild_id, member.id)
+        config = self.store.get_config(guild_id)
+
+        # Calculate rank (users without XP rank after everyone else)
+        leaderboard = self.store.leaderboard(guild_id)
+        rank = leaderboard.rank(member.id) or len(leaderboard) + 1
         
         # Prepare data for card generation
         level = user_data["level"]
@@ -516,6 +2134,7 @@ class Leveling(commands.Cog):
         
         # Generate the card
         file_buffer = await _generate_rank_card(
+            self.bot,
             user=member,
             current_xp=current_xp,
             level=level,
@@ -525,15 +2144,33 @@ class Leveling(commands.Cog):
             background_url=config.get("rank_card_background"),
             text_color=config.get("rank_card_text_color")
         )
+        card_stats = {"level": level, "current_xp": current_xp, "xp_needed": xp_needed, "rank": rank, "ranked": len(leaderboard)}
+        return file_buffer, card_stats
+
+    async def _handle_rank(self, source: Union[commands.Context, discord.Interaction], member: discord.Member):
+        if not member.guild:
+            # Only happens if the command is used outside a guild, which shouldn't happen for these commands
+            await self._send_response(source, self.premium_embed("Error", "❌ This command must be used in a server.", discord.Color.red()), ephemeral=True)
+            return
+
+        # Defer interaction for slash commands since image generation takes time
+        if isinstance(source, discord.Interaction) and not source.response.is_done():
+            await source.response.defer()
+
+        file_buffer, card_stats = await self._render_member_card(member)
 
         if not file_buffer:
+            render_service = self.bot.get_cog("RenderService")
+            if render_service is not None and render_service.saturated:
+                await self._send_response(source, self.premium_embed("Busy", "⏳ Rank cards are in high demand right now. Please try again in a few seconds.", discord.Color.orange()), ephemeral=True)
+                return
             await self._send_response(source, self.premium_embed("Error", "❌ Failed to generate rank card image. Check bot permissions or internal error log.", discord.Color.red()), ephemeral=True)
             return
 
         file = discord.File(file_buffer, filename="rank_card.png")
         embed = self.premium_embed(
             f"{member.display_name}'s Rank",
-            f"**Level:** {level} | **XP:** {current_xp}/{xp_needed} | **Rank:** #{rank}/{len(sorted_users)}"
+            f"**Level:** {card_stats['level']} | **XP:** {card_stats['current_xp']}/{card_stats['xp_needed']} | **Rank:** #{card_stats['rank']}/{card_stats['ranked']}"
         )
         embed.set_image(url="attachment://rank_card.png")
         
@@ -560,7 +2197,7 @@ class Leveling(commands.Cog):
     # ------------------------------------------------------
     # 🏆 Leaderboard Command (Unified)
     # ------------------------------------------------------
-    async def _handle_leaderboard(self, source: Union[commands.Context, discord.Interaction]):
+    async def _handle_leaderboard(self, source: Union[commands.Context, discord.Interaction], period: str = "lifetime"):
         if not source.guild:
             await self._send_response(source, self.premium_embed("Error", "❌ This command must be used in a server.", discord.Color.red()), ephemeral=True)
             return
@@ -570,65 +2207,139 @@ class Leveling(commands.Cog):
             await source.response.defer(ephemeral=True)
             
         guild_id = source.guild.id
-        guild_levels = load_data(LEVELS_FILE).get(str(guild_id), {})
-
-        # Filter and sort users by total_xp
-        sorted_users = sorted(
-            [
-                (uid, data['total_xp']) 
-                for uid, data in guild_levels.items() if data.get('total_xp', 0) > 0
-            ], 
-            key=lambda item: item[1], 
-            reverse=True
-        )
+        window_days = LEADERBOARD_WINDOWS.get(period)
+        if window_days is None:
+            leaderboard = self.store.leaderboard(guild_id)
+        else:
+            leaderboard = self.store.window_leaderboard(guild_id, period)
 
-        if not sorted_users:
-            await self._send_response(source, self.premium_embed("Leaderboard", "The leaderboard is empty. Start chatting to gain XP!"), ephemeral=True)
+        if not len(leaderboard):
+            empty_text = "The leaderboard is empty. Start chatting to gain XP!"
+            if window_days is not None:
+                empty_text = f"Nobody has earned XP in the last {window_days} days. Start chatting to gain XP!"
+            await self._send_response(source, self.premium_embed("Leaderboard", empty_text), ephemeral=True)
             return
 
-        top_10 = sorted_users[:10]
+        top_10 = leaderboard.top(10)
         
         leaderboard_text = []
-        for i, (user_id_str, total_xp) in enumerate(top_10):
-            user = source.guild.get_member(int(user_id_str))
-            
-            # Fetch level info based on total_xp
-            level_info = get_level_info(total_xp)
-            
-            name = user.display_name if user else f"User ID: {user_id_str}"
+        for i, (ranked_user_id, total_xp) in enumerate(top_10):
+            user = source.guild.get_member(ranked_user_id)
+            name = user.display_name if user else f"User ID: {ranked_user_id}"
             
             # Add emojis for top ranks
             rank_emoji = {1: "🥇", 2: "🥈", 3: "🥉"}.get(i + 1, "🏅")
             
-            leaderboard_text.append(
-                f"{rank_emoji} **#{i+1}:** {name} - Level **{level_info['level']}** ({total_xp:,} XP)"
-            )
+            if window_days is None:
+                # Fetch level info based on total_xp
+                level_info = get_level_info(total_xp)
+                leaderboard_text.append(
+                    f"{rank_emoji} **#{i+1}:** {name} - Level **{level_info['level']}** ({total_xp:,} XP)"
+                )
+            else:
+                leaderboard_text.append(f"{rank_emoji} **#{i+1}:** {name} - **{total_xp:,} XP**")
         
-        embed = self.premium_embed(
-            "👑 Server Leaderboard (Top 10)",
-            "\n".join(leaderboard_text)
-        )
+        title = "👑 Server Leaderboard (Top 10)"
+        if window_days is not None:
+            title = f"👑 Server Leaderboard — Last {window_days} Days (Top 10)"
+        embed = self.premium_embed(title, "\n".join(leaderboard_text))
         
         # Find user's rank (if they are in the guild and have XP)
         user_id = source.author.id if isinstance(source, commands.Context) else source.user.id
-        user_rank = next((i + 1 for i, (uid, xp) in enumerate(sorted_users) if int(uid) == user_id), None)
+        user_rank = leaderboard.rank(user_id)
+
+        # Show the neighbourhood for users outside the top 10
+        if user_rank is not None and user_rank > len(top_10):
+            nearby_text = []
+            for nearby_rank, nearby_user_id, total_xp in leaderboard.around(user_id, radius=2):
+                user = source.guild.get_member(nearby_user_id)
+                name = user.display_name if user else f"User ID: {nearby_user_id}"
+                marker = "➡️" if nearby_user_id == user_id else "▫️"
+                nearby_text.append(f"{marker} **#{nearby_rank}:** {name} ({total_xp:,} XP)")
+            embed.add_field(name="Around You", value="\n".join(nearby_text), inline=False)
         
         if user_rank is not None:
-            embed.set_footer(text=f"Your Rank: #{user_rank} | Total Ranked Users: {len(sorted_users)}")
+            embed.set_footer(text=f"Your Rank: #{user_rank} | Total Ranked Users: {len(leaderboard)}")
         else:
-            embed.set_footer(text=f"Total Ranked Users: {len(sorted_users)}")
+            embed.set_footer(text=f"Total Ranked Users: {len(leaderboard)}")
 
         await self._send_response(source, embed, ephemeral=True)
 
     # --- PREFIX COMMAND ---
     @commands.command(name="leaderboard", description="View the server's XP leaderboard")
-    async def leaderboard_prefix(self, ctx: commands.Context):
-        await self._handle_leaderboard(ctx)
+    async def leaderboard_prefix(self, ctx: commands.Context, period: Literal['lifetime', 'week', 'month'] = 'lifetime'):
+        await self._handle_leaderboard(ctx, period)
 
     # --- SLASH COMMAND ---
     @app_commands.command(name="leaderboard", description="View the server's XP leaderboard")
-    async def leaderboard_slash(self, interaction: discord.Interaction):
-        await self._handle_leaderboard(interaction)
+    @app_commands.describe(period="Lifetime XP, or XP earned in the last 7 (week) or 30 (month) days.")
+    async def leaderboard_slash(self, interaction: discord.Interaction, period: Literal['lifetime', 'week', 'month'] = 'lifetime'):
+        await self._handle_leaderboard(interaction, period)
+
+    async def _handle_leaderboard_image(self, source: Union[commands.Context, discord.Interaction], period: str = "lifetime", size: int = 10):
+        if not source.guild:
+            await self._send_response(source, self.premium_embed("Error", "❌ This command must be used in a server.", discord.Color.red()), ephemeral=True)
+            return
+
+        # Defer interaction for slash commands since image generation takes time
+        if isinstance(source, discord.Interaction) and not source.response.is_done():
+            await source.response.defer(ephemeral=True)
+
+        guild_id = source.guild.id
+        window_days = LEADERBOARD_WINDOWS.get(period)
+        if window_days is None:
+            leaderboard = self.store.leaderboard(guild_id)
+        else:
+            leaderboard = self.store.window_leaderboard(guild_id, period)
+
+        if not len(leaderboard):
+            await self._send_response(source, self.premium_embed("Leaderboard", "The leaderboard is empty. Start chatting to gain XP!"), ephemeral=True)
+            return
+
+        rows = []
+        for rank, (ranked_user_id, xp) in enumerate(leaderboard.top(size), start=1):
+            member = source.guild.get_member(ranked_user_id)
+            name = member.display_name if member else f"User ID: {ranked_user_id}"
+            avatar_key = member.display_avatar.key if member else None
+            level = get_level_info(xp)["level"] if window_days is None else None
+            rows.append(((rank, ranked_user_id, name, avatar_key, level, xp), member))
+
+        title = f"Server Leaderboard - Top {size}"
+        if window_days is not None:
+            title = f"Server Leaderboard - Last {window_days} Days - Top {size}"
+        png = await leaderboard_images.render(self.bot, (guild_id, period, size), title, rows)
+
+        if png is None:
+            render_service = self.bot.get_cog("RenderService")
+            if render_service is not None and render_service.saturated:
+                await self._send_response(source, self.premium_embed("Busy", "⏳ Leaderboard images are in high demand right now. Please try again in a few seconds.", discord.Color.orange()), ephemeral=True)
+                return
+            await self._send_response(source, self.premium_embed("Error", "❌ Failed to generate the leaderboard image.", discord.Color.red()), ephemeral=True)
+            return
+
+        file = discord.File(io.BytesIO(png), filename="leaderboard.png")
+        embed = self.premium_embed(title, "")
+        embed.set_image(url="attachment://leaderboard.png")
+
+        user_id = source.author.id if isinstance(source, commands.Context) else source.user.id
+        user_rank = leaderboard.rank(user_id)
+        if user_rank is not None:
+            embed.set_footer(text=f"Your Rank: #{user_rank} | Total Ranked Users: {len(leaderboard)}")
+        else:
+            embed.set_footer(text=f"Total Ranked Users: {len(leaderboard)}")
+
+        await self._send_response(source, embed, file, ephemeral=True)
+
+    # --- PREFIX COMMAND ---
+    @commands.command(name="leaderboardimage", aliases=["lbimage"], description="View the server's XP leaderboard as an image")
+    async def leaderboardimage_prefix(self, ctx: commands.Context, period: Literal['lifetime', 'week', 'month'] = 'lifetime', size: Literal[10, 25] = 10):
+        await self._handle_leaderboard_image(ctx, period, size)
+
+    # --- SLASH COMMAND ---
+    @app_commands.command(name="leaderboardimage", description="View the server's XP leaderboard as an image")
+    @app_commands.describe(period="Lifetime XP, or XP earned in the last 7 (week) or 30 (month) days.", size="How many ranks to show")
+    async def leaderboardimage_slash(self, interaction: discord.Interaction, period: Literal['lifetime', 'week', 'month'] = 'lifetime', size: Literal[10, 25] = 10):
+        await self._handle_leaderboard_image(interaction, period, size)
 
 
     # ------------------------------------------------------
@@ -637,7 +2348,7 @@ class Leveling(commands.Cog):
     @commands.group(name="levelsettings", description="Configure the leveling system for this server", invoke_without_command=True)
     @commands.has_permissions(administrator=True)
     async def levelsettings_prefix(self, ctx: commands.Context):
-        config = get_guild_config(ctx.guild.id)
+        config = self.store.get_config(ctx.guild.id)
         
         # Display current settings
         role_mentions = "\n".join([
@@ -660,7 +2371,7 @@ class Leveling(commands.Cog):
         embed.add_field(name="Level Up Message", value=f"Enabled: `{config['level_up_message_enabled']}`\nChannel: <#{config['level_up_channel']}>" if config['level_up_channel'] else f"Enabled: `{config['level_up_message_enabled']}`\nChannel: `Current Channel`", inline=True)
         embed.add_field(name="Level Roles", value=role_mentions, inline=False)
         embed.add_field(name="Ignored Channels", value=ignore_channel_mentions, inline=False)
-        embed.add_field(name="Rank Card", value=f"Background: {'Configured' if config['rank_card_background'] else 'Default'}\nText Color: `{config['rank_card_text_color']}`", inline=False)
+        embed.add_field(name="Rank Card", value=f"Background: {'Configured' if config['rank_card_background'] else 'Default'}\nText Color: `{config['rank_card_text_color']}`\nPrerender: `{config.get('rank_card_prerender', False)}`", inline=False)
         
         await ctx.reply(embed=embed)
 
@@ -676,9 +2387,10 @@ class Leveling(commands.Cog):
             await source.response.defer(ephemeral=True)
              
         guild_id = source.guild.id
-        config = get_guild_config(guild_id)
+        config = self.store.get_config(guild_id)
         updates = {}
         message = ""
+        removed_role_ids: Set[int] = set()
 
         if key == "setrole":
             try:
@@ -689,6 +2401,9 @@ class Leveling(commands.Cog):
                     await self._send_response(source, self.premium_embed("Error", "❌ Invalid role or level provided."), ephemeral=True)
                     return
                 
+                replaced_role_id = config["level_roles"].get(str(level))
+                if replaced_role_id and int(replaced_role_id) != role.id:
+                    removed_role_ids.add(int(replaced_role_id))
                 config["level_roles"][str(level)] = role.id
                 updates["level_roles"] = config["level_roles"]
                 message = f"Level **{level}** now grants the {role.mention} role."
@@ -700,6 +2415,7 @@ class Leveling(commands.Cog):
             try:
                 level = str(value)
                 if level in config["level_roles"]:
+                    removed_role_ids.add(int(config["level_roles"][level]))
                     del config["level_roles"][level]
                     updates["level_roles"] = config["level_roles"]
                     message = f"Cleared level role for level **{level}**."
@@ -753,6 +2469,7 @@ class Leveling(commands.Cog):
                 
                 updates["rank_card_background"] = bg_url if bg_url.lower() != 'default' else None
                 updates["rank_card_text_color"] = text_color
+                background_layers.invalidate(guild_id)
                 message = "Rank card background and text color updated."
             except (ValueError, IndexError):
                 await self._send_response(source, self.premium_embed("Error", "❌ Usage: `!levelsettings rankcardconfig <bg_url or 'default'> <#hex_color>`"), ephemeral=True)
@@ -772,6 +2489,11 @@ class Leveling(commands.Cog):
             updates["level_up_message_enabled"] = state
             message = f"Level up messages are now **{'enabled' if state else 'disabled'}**."
 
+        elif key == "prerender":
+            state = value # bool
+            updates["rank_card_prerender"] = state
+            message = f"Background rank card prerendering is now **{'enabled' if state else 'disabled'}**."
+
         elif key == "cooldown":
             try:
                 cooldown_seconds = int(value)
@@ -786,7 +2508,11 @@ class Leveling(commands.Cog):
 
         
         if updates:
-            update_guild_config(guild_id, updates)
+            self.store.update_config(guild_id, updates)
+            if key in ("setrole", "clearrole"):
+                # Existing members get (or lose) the role in the background
+                self.role_sync.schedule(source.guild, source.channel, removed_role_ids)
+                message += "\nRoles for existing members are being synced in the background."
             embed = self.premium_embed("Configuration Updated", f"✅ {message}", discord.Color.blue())
             await self._send_response(source, embed, ephemeral=True)
         else:
@@ -823,6 +2549,10 @@ class Leveling(commands.Cog):
     async def togglemessage_prefix(self, ctx: commands.Context, state: bool):
         await self._handle_level_setting(ctx, "togglemessage", state)
         
+    @levelsettings_prefix.command(name="prerender", description="Render rank cards in the background after level-ups")
+    async def prerender_prefix(self, ctx: commands.Context, state: bool):
+        await self._handle_level_setting(ctx, "prerender", state)
+
     @levelsettings_prefix.command(name="cooldown", description="Set the cooldown in seconds between XP gain (5-300)")
     async def cooldown_prefix(self, ctx: commands.Context, cooldown_seconds: int):
         await self._handle_level_setting(ctx, "cooldown", cooldown_seconds)
@@ -872,6 +2602,12 @@ class Leveling(commands.Cog):
     async def togglemessage_slash(self, interaction: discord.Interaction, state: bool):
         await self._handle_level_setting(interaction, "togglemessage", state)
         
+    @levelsettings.command(name="prerender", description="Render rank cards in the background after level-ups")
+    @app_commands.describe(state="True to enable, False to disable")
+    @app_commands.default_permissions(administrator=True)
+    async def prerender_slash(self, interaction: discord.Interaction, state: bool):
+        await self._handle_level_setting(interaction, "prerender", state)
+
     @levelsettings.command(name="cooldown", description="Set the cooldown in seconds between XP gain (5-300)")
     @app_commands.describe(cooldown_seconds="The cooldown in the seconds (5-300)")
     @app_commands.default_permissions(administrator=True)
@@ -893,7 +2629,8 @@ class Leveling(commands.Cog):
             await source.response.defer(ephemeral=True)
         
         guild_id = source.guild.id
-        user_data = get_user_data(guild_id, member.id)
+        user_data = self.store.get_user(guild_id, member.id)
+        previous_total_xp = user_data["total_xp"]
         
         updates = {}
         message = ""
@@ -902,9 +2639,9 @@ class Leveling(commands.Cog):
             updates = {
                 "xp": 0,
                 "level": 0,
-                "total_xp": 0,
-                "last_message": datetime.datetime.min # Resets cooldown
+                "total_xp": 0
             }
+            self.cooldowns.clear(guild_id, member.id)
             message = f"Leveling data for {member.mention} has been **reset**."
         
         elif action == "addxp":
@@ -966,15 +2703,19 @@ class Leveling(commands.Cog):
 
         # Update the user data
         if updates:
-            # We explicitly update the internal dictionary first to ensure last_message is correctly handled if resetuser
             final_updates = {
                 "xp": updates.get("xp", user_data["xp"]),
                 "level": updates.get("level", user_data["level"]),
-                "total_xp": updates.get("total_xp", user_data["total_xp"]),
-                # Only reset last_message if it was explicitly updated (e.g., by resetuser)
-                "last_message": updates.get("last_message", user_data["last_message"])
+                "total_xp": updates.get("total_xp", user_data["total_xp"])
             }
-            update_user_data(guild_id, member.id, final_updates)
+            self.store.update_user(guild_id, member.id, final_updates)
+            # Week/month boards count earned XP, so resets and removals apply there too
+            if action == "resetuser":
+                self.store.remove_xp_history(guild_id, member.id)
+            elif final_updates["total_xp"] < previous_total_xp:
+                self.store.remove_xp_history(guild_id, member.id, previous_total_xp - final_updates["total_xp"])
+            # Grant/remove level roles to match the new level
+            await self.role_sync.reconcile_member(member)
             
             embed = self.premium_embed(f"User Level Updated: {action.title()}", f"✅ {message}", discord.Color.green())
             await self._send_response(source, embed, ephemeral=True)
@@ -1046,13 +2787,10 @@ class Leveling(commands.Cog):
         if not ctx.guild:
             return
 
-        levels = load_data(LEVELS_FILE)
-        guild_id_str = str(ctx.guild.id)
-        
-        if guild_id_str in levels:
-            del levels[guild_id_str]
-            save_data(LEVELS_FILE, levels)
-            embed = self.premium_embed("Server Reset", "✅ Leveling data for this server has been **cleared**.")
+        self.cooldowns.clear(ctx.guild.id)
+        if self.store.delete_guild(ctx.guild.id):
+            self.role_sync.schedule(ctx.guild, ctx.channel)
+            embed = self.premium_embed("Server Reset", "✅ Leveling data for this server has been **cleared**. Level roles are being removed in the background.")
             await ctx.reply(embed=embed)
         else:
             embed = self.premium_embed("Server Reset", "⚠️ No leveling data found to reset.")
@@ -1066,19 +2804,32 @@ class Leveling(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        levels = load_data(LEVELS_FILE)
-        guild_id_str = str(interaction.guild_id)
-        
-        if guild_id_str in levels:
-            del levels[guild_id_str]
-            save_data(LEVELS_FILE, levels)
-            embed = self.premium_embed("Server Reset", "✅ Leveling data for this server has been **cleared**.")
+        self.cooldowns.clear(interaction.guild_id)
+        if self.store.delete_guild(interaction.guild_id):
+            self.role_sync.schedule(interaction.guild, interaction.channel)
+            embed = self.premium_embed("Server Reset", "✅ Leveling data for this server has been **cleared**. Level roles are being removed in the background.")
             await interaction.followup.send(embed=embed, ephemeral=True)
         else:
             embed = self.premium_embed("Server Reset", "⚠️ No leveling data found to reset.")
             await interaction.followup.send(embed=embed, ephemeral=True)
 
 
+    # --- RANK CARD CACHE STATS (Owner) ---
+    @commands.command(name="rankcachestats", description="Show rank card cache hit/miss counters")
+    @commands.is_owner()
+    async def rankcachestats_prefix(self, ctx: commands.Context):
+        stats = rank_card_cache.stats()
+        embed = self.premium_embed(
+            "Rank Card Cache",
+            f"**Entries:** {stats['entries']:,}\n"
+            f"**Size:** {stats['size'] / 1024 / 1024:.1f} / {stats['max_bytes'] / 1024 / 1024:.0f} MiB\n"
+            f"**Hits / Misses:** {stats['hits']:,} / {stats['misses']:,} ({stats['hit_rate']:.0%} hit rate)\n"
+            f"**Evictions:** {stats['evictions']:,}\n"
+            f"**Prerendered:** {self.prerender.stats['rendered']:,} | **Dropped:** {self.prerender.stats['dropped']:,} | "
+            f"**Skipped (busy):** {self.prerender.stats['skipped_busy']:,} | **Failed:** {self.prerender.stats['failed']:,}"
+        )
+        await ctx.reply(embed=embed)
+
     # --- SYNC (Prefix & Slash) ---
     @commands.command(name="sync", description="Sync the leveling data with member list (removes inactive members)")
     @commands.is_owner()
@@ -1086,27 +2837,21 @@ class Leveling(commands.Cog):
         if not ctx.guild:
             return
 
-        levels = load_data(LEVELS_FILE)
-        guild_id_str = str(ctx.guild.id)
+        guild_levels = self.store.get_guild_levels(ctx.guild.id)
         
-        if guild_id_str not in levels:
+        if not guild_levels:
             return await ctx.reply("⚠️ No leveling data found to sync.")
 
-        removed_count = 0
         current_members = {str(m.id) for m in ctx.guild.members}
         
         # Identify members in data but not in guild
         user_ids_to_remove = [
             user_id 
-            for user_id in levels[guild_id_str].keys() 
+            for user_id in guild_levels.keys() 
             if user_id not in current_members
         ]
 
-        for user_id in user_ids_to_remove:
-            del levels[guild_id_str][user_id]
-            removed_count += 1
-            
-        save_data(LEVELS_FILE, levels)
+        removed_count = self.store.delete_users(ctx.guild.id, user_ids_to_remove)
         
         embed = self.premium_embed("Data Sync Complete", f"✅ Removed **{removed_count}** entries for members no longer in the server.")
         await ctx.reply(embed=embed)
@@ -1119,13 +2864,11 @@ class Leveling(commands.Cog):
 
         await interaction.response.defer(ephemeral=True)
 
-        levels = load_data(LEVELS_FILE)
-        guild_id_str = str(interaction.guild_id)
+        guild_levels = self.store.get_guild_levels(interaction.guild_id)
         
-        if guild_id_str not in levels:
+        if not guild_levels:
             return await interaction.followup.send("⚠️ No leveling data found to sync.", ephemeral=True)
 
-        removed_count = 0
         # Fetch members list - ensure intents are correct if this fails
         try:
             current_members = {str(m.id) for m in interaction.guild.members}
@@ -1136,20 +2879,168 @@ class Leveling(commands.Cog):
         # Identify members in data but not in guild
         user_ids_to_remove = [
             user_id 
-            for user_id in levels[guild_id_str].keys() 
+            for user_id in guild_levels.keys() 
             if user_id not in current_members
         ]
 
-        for user_id in user_ids_to_remove:
-            del levels[guild_id_str][user_id]
-            removed_count += 1
-            
-        save_data(LEVELS_FILE, levels)
+        removed_count = self.store.delete_users(interaction.guild_id, user_ids_to_remove)
         
         embed = self.premium_embed("Data Sync Complete", f"✅ Removed **{removed_count}** entries for members no longer in the server.")
         await interaction.followup.send(embed=embed, ephemeral=True)
 
 
+    # ------------------------------------------------------
+    # 📦 Level Import / Export (Prefix & Slash)
+    # ------------------------------------------------------
+    async def _send_status(self, source: Union[commands.Context, discord.Interaction], embed: discord.Embed):
+        """Sends a message that can be edited later for progress updates."""
+        if isinstance(source, commands.Context):
+            return await source.reply(embed=embed)
+        return await source.followup.send(embed=embed, ephemeral=True, wait=True)
+
+    async def _handle_level_export(self, source: Union[commands.Context, discord.Interaction], file_format: str):
+        if not source.guild:
+            return
+        if isinstance(source, discord.Interaction) and not source.response.is_done():
+            await source.response.defer(ephemeral=True)
+
+        guild_id = source.guild.id
+        users = self.store.get_guild_levels(guild_id)
+        if not users:
+            await self._send_response(source, self.premium_embed("Export", "⚠️ No leveling data found to export."), ephemeral=True)
+            return
+
+        fd, path = tempfile.mkstemp(prefix=f"levels-{guild_id}-", suffix=f".{file_format}")
+        os.close(fd)
+        paths = [path]
+        try:
+            written = await asyncio.to_thread(_write_level_export, path, users, list(users), file_format)
+            filename = f"levels-{guild_id}.{file_format}"
+            if os.path.getsize(path) > source.guild.filesize_limit:
+                path = await asyncio.to_thread(_gzip_file, path)
+                paths.append(path)
+                filename += ".gz"
+            if os.path.getsize(path) > source.guild.filesize_limit:
+                await self._send_response(source, self.premium_embed("Export", "❌ The export is larger than this server's upload limit.", discord.Color.red()), ephemeral=True)
+                return
+
+            embed = self.premium_embed("Export Complete", f"✅ Exported **{written:,}** users as `{filename}`.")
+            await self._send_response(source, embed, discord.File(path, filename=filename), ephemeral=True)
+        finally:
+            for leftover in paths:
+                try:
+                    os.remove(leftover)
+                except OSError:
+                    pass
+
+    async def _handle_level_import(self, source: Union[commands.Context, discord.Interaction], attachment: Optional[discord.Attachment], replace: bool):
+        if not source.guild:
+            return
+        if isinstance(source, discord.Interaction) and not source.response.is_done():
+            await source.response.defer(ephemeral=True)
+
+        if attachment is None:
+            await self._send_response(source, self.premium_embed("Error", "❌ Attach a `.csv` or `.ndjson` file (optionally `.gz`)."), ephemeral=True)
+            return
+
+        name = attachment.filename.lower()
+        gzipped = name.endswith(".gz")
+        base_name = name[:-3] if gzipped else name
+        if base_name.endswith(".csv"):
+            file_format = "csv"
+        elif base_name.endswith((".ndjson", ".jsonl", ".json")):
+            file_format = "ndjson"
+        else:
+            await self._send_response(source, self.premium_embed("Error", "❌ Unsupported file type. Use `.csv` or `.ndjson` (optionally `.gz`)."), ephemeral=True)
+            return
+
+        guild_id = source.guild.id
+        status = await self._send_status(source, self.premium_embed("Importing Levels", f"⏳ Reading `{attachment.filename}`..."))
+        if replace:
+            self.store.delete_guild(guild_id)
+            self.cooldowns.clear(guild_id)
+
+        started = time.monotonic()
+        last_report = started
+        imported = skipped = 0
+        pending: List[Tuple[str, int]] = []
+        parse_state: Dict[str, Any] = {}
+        error: Optional[str] = None
+        try:
+            async with http_session(self.bot) as session:
+                async for lines, dropped in _iter_remote_lines(session, attachment.url, gzipped):
+                    rows, bad_rows = _parse_import_lines(lines, file_format, parse_state)
+                    pending.extend(rows)
+                    skipped += bad_rows + dropped
+                    if len(pending) >= IMPORT_BATCH_ROWS:
+                        imported += self.store.import_users(guild_id, pending)
+                        pending = []
+                        await self.store.flush()
+                    if time.monotonic() - last_report >= IMPORT_PROGRESS_INTERVAL:
+                        last_report = time.monotonic()
+                        try:
+                            await status.edit(embed=self.premium_embed("Importing Levels", f"⏳ Imported **{imported:,}** rows so far ({skipped:,} skipped)..."))
+                        except discord.HTTPException:
+                            pass
+        except asyncio.TimeoutError:
+            # Also raised for aiohttp's socket timeouts, usually with an empty message
+            error = f"The download stalled (no data for {IMPORT_STALL_SECONDS}s or the connection could not be made)."
+        except (aiohttp.ClientError, zlib.error, ValueError) as e:
+            error = str(e) or type(e).__name__
+
+        imported += self.store.import_users(guild_id, pending)
+        await self.store.flush()
+        # One leaderboard build for the whole import, then fold the journal into a snapshot
+        self.store.leaderboard(guild_id)
+        await self.store.compact_guild(guild_id)
+        if self.store.get_config(guild_id).get("level_roles"):
+            self.role_sync.schedule(source.guild, source.channel)
+
+        elapsed = time.monotonic() - started
+        if error is not None:
+            embed = self.premium_embed(
+                "Import Stopped",
+                f"❌ {error}\nImported **{imported:,}** rows before stopping ({skipped:,} skipped).",
+                discord.Color.red()
+            )
+        else:
+            embed = self.premium_embed(
+                "Import Complete",
+                f"✅ Imported **{imported:,}** rows in {elapsed:.1f}s ({skipped:,} skipped).",
+                discord.Color.green()
+            )
+        try:
+            await status.edit(embed=embed)
+        except discord.HTTPException:
+            await self._send_response(source, embed, ephemeral=True)
+
+    @commands.command(name="levelexport", description="Export this server's leveling data as CSV or NDJSON")
+    @commands.has_permissions(administrator=True)
+    async def levelexport_prefix(self, ctx: commands.Context, file_format: Literal['csv', 'ndjson'] = 'csv'):
+        await self._handle_level_export(ctx, file_format)
+
+    @app_commands.command(name="levelexport", description="Export this server's leveling data as CSV or NDJSON")
+    @app_commands.describe(file_format="File format (default: csv).")
+    @app_commands.default_permissions(administrator=True)
+    async def levelexport_slash(self, interaction: discord.Interaction, file_format: Literal['csv', 'ndjson'] = 'csv'):
+        await self._handle_level_export(interaction, file_format)
+
+    @commands.command(name="levelimport", description="Import leveling data from an attached CSV or NDJSON file")
+    @commands.has_permissions(administrator=True)
+    async def levelimport_prefix(self, ctx: commands.Context, replace: bool = False):
+        attachment = ctx.message.attachments[0] if ctx.message.attachments else None
+        await self._handle_level_import(ctx, attachment, replace)
+
+    @app_commands.command(name="levelimport", description="Import leveling data from a CSV or NDJSON file")
+    @app_commands.describe(
+        file="CSV or NDJSON (optionally .gz) with user_id and total_xp (or level + xp) per row.",
+        replace="Clear this server's existing data first (default: merge)."
+    )
+    @app_commands.default_permissions(administrator=True)
+    async def levelimport_slash(self, interaction: discord.Interaction, file: discord.Attachment, replace: bool = False):
+        await self._handle_level_import(interaction, file, replace)
+
+
     # ------------------------------------------------------
     # 🚨 Error Handling
     # ------------------------------------------------------
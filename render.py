@@ -0,0 +1,196 @@
+# render.py
+# Sentinel Render Service — shared process pool for Pillow workloads
+#
+# Other cogs submit jobs through `run_render(bot, func, *args)`, which falls back
+# to `asyncio.to_thread` when this cog is not loaded. Jobs must be picklable
+# module-level functions that take and return plain data (bytes, ints, str...).
+
+import discord
+from discord.ext import commands
+import os
+import sys
+import time
+import asyncio
+import contextlib
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Callable, Dict, Optional
+
+# ==== SETTINGS ====
+# Leave one core for the gateway/event loop
+RENDER_WORKERS = max(1, (os.cpu_count() or 2) - 1)
+# Queued + running jobs accepted before callers are told the service is busy
+RENDER_QUEUE_LIMIT = RENDER_WORKERS * 8
+RENDER_JOB_TIMEOUT = 15.0 # seconds
+
+
+class RenderBusy(Exception):
+    """Raised when the render queue is full."""
+
+
+def _warmup() -> int:
+    return os.getpid()
+
+
+def _pool_context():
+    # Workers come from a forkserver (spawn on Windows), never forked from the bot
+    # itself: by the time the pool starts, or is rebuilt after a crash, the bot has
+    # threads (to_thread, aiohttp's resolver) and a fork can copy their held locks.
+    if sys.platform != "win32":
+        return multiprocessing.get_context("forkserver")
+    return multiprocessing.get_context("spawn")
+
+
+@contextlib.contextmanager
+def _entry_script_hidden():
+    """
+    forkserver/spawn workers re-run the parent's entry script (as __mp_main__)
+    unless __main__ looks like an interactive session. Jobs only need the modules
+    they are defined in, so __main__ is hidden while workers start; otherwise an
+    unguarded `bot.run()` would start another bot in every worker.
+    """
+    main = sys.modules["__main__"]
+    spec = getattr(main, "__spec__", None)
+    path = main.__dict__.pop("__file__", None)
+    main.__spec__ = None
+    try:
+        yield
+    finally:
+        main.__spec__ = spec
+        if path is not None:
+            main.__file__ = path
+
+
+class RenderService(commands.Cog):
+    """Bounded process pool that keeps CPU-heavy rendering off the event loop and the GIL."""
+
+    Busy = RenderBusy
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self._pool = self._new_pool()
+        self._inflight = 0
+        self._finished = 0
+        self._busy_time = 0.0
+        self.stats: Dict[str, int] = {
+            "submitted": 0,
+            "completed": 0,
+            "failed": 0,
+            "rejected": 0,
+            "timed_out": 0,
+            "pool_restarts": 0
+        }
+
+    @staticmethod
+    def _new_pool() -> ProcessPoolExecutor:
+        return ProcessPoolExecutor(max_workers=RENDER_WORKERS, mp_context=_pool_context())
+
+    async def cog_load(self):
+        # Start every worker now, before the bot has many threads running
+        loop = asyncio.get_running_loop()
+        with _entry_script_hidden():
+            warmups = [loop.run_in_executor(self._pool, _warmup) for _ in range(RENDER_WORKERS)]
+        await asyncio.gather(*warmups)
+
+    async def cog_unload(self):
+        self._pool.shutdown(wait=False, cancel_futures=True)
+
+    @property
+    def saturated(self) -> bool:
+        return self._inflight >= RENDER_QUEUE_LIMIT
+
+    def _restart_pool(self, broken: ProcessPoolExecutor):
+        """Replaces `broken`, unless another failed job already did."""
+        if self._pool is not broken:
+            return
+        broken.shutdown(wait=False, cancel_futures=True)
+        self._pool = self._new_pool()
+        self.stats["pool_restarts"] += 1
+
+    def _job_done(self, started: float):
+        self._inflight -= 1
+        self._finished += 1
+        self._busy_time += time.perf_counter() - started
+
+    async def run(self, func: Callable[..., Any], *args: Any, timeout: float = RENDER_JOB_TIMEOUT) -> Any:
+        """
+        Runs `func(*args)` in a worker process.
+        Raises RenderBusy when saturated and asyncio.TimeoutError when the job overruns.
+        """
+        if self.saturated:
+            self.stats["rejected"] += 1
+            raise RenderBusy(f"Render queue is full ({self._inflight} jobs).")
+
+        loop = asyncio.get_running_loop()
+        # Submitting is what starts workers, as they are needed
+        with _entry_script_hidden():
+            pool = self._pool
+            try:
+                future = pool.submit(func, *args)
+            except (BrokenProcessPool, RuntimeError):
+                # A worker died (e.g. OOM killed); replace the pool and retry once
+                self._restart_pool(pool)
+                pool = self._pool
+                future = pool.submit(func, *args)
+
+        self._inflight += 1
+        self.stats["submitted"] += 1
+        started = time.perf_counter()
+
+        def on_done(_):
+            # Called from the pool's manager thread
+            try:
+                loop.call_soon_threadsafe(self._job_done, started)
+            except RuntimeError:
+                pass # Loop already closed
+
+        future.add_done_callback(on_done)
+
+        try:
+            result = await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            # A queued job is cancelled; a running one finishes in the background
+            # and keeps its slot until then, so backpressure stays accurate.
+            self.stats["timed_out"] += 1
+            raise
+        except BrokenProcessPool:
+            self.stats["failed"] += 1
+            self._restart_pool(pool)
+            raise
+        except Exception:
+            self.stats["failed"] += 1
+            raise
+
+        self.stats["completed"] += 1
+        return result
+
+    # ==== OWNER STATS COMMAND ====
+    @commands.command(name="renderstats", description="Show render pool load and counters")
+    @commands.is_owner()
+    async def renderstats_prefix(self, ctx: commands.Context):
+        finished = self._finished or 1
+        embed = discord.Embed(
+            title="🖼️ Render Service",
+            description=(
+                f"**Workers:** {RENDER_WORKERS} | **In flight:** {self._inflight}/{RENDER_QUEUE_LIMIT}\n"
+                f"**Submitted:** {self.stats['submitted']:,} | **Completed:** {self.stats['completed']:,}\n"
+                f"**Rejected (busy):** {self.stats['rejected']:,} | **Timed out:** {self.stats['timed_out']:,} | **Failed:** {self.stats['failed']:,}\n"
+                f"**Avg job time:** {self._busy_time / finished * 1000:.1f} ms | **Pool restarts:** {self.stats['pool_restarts']}\n"
+                f"**Heartbeat latency:** {self.bot.latency * 1000:.0f} ms"
+            ),
+            color=discord.Color.blurple()
+        )
+        await ctx.reply(embed=embed)
+
+
+async def run_render(bot: Optional[commands.Bot], func: Callable[..., Any], *args: Any) -> Any:
+    """Runs a Pillow job on the shared RenderService process pool if loaded, else in a thread."""
+    render_service = bot.get_cog("RenderService") if bot else None
+    if render_service is not None:
+        return await render_service.run(func, *args)
+    return await asyncio.to_thread(func, *args)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(RenderService(bot))
@@ -17,6 +17,14 @@ import ast  # Added for safer evaluation in calc command
 from discord.ext.commands import Context
 import os
 import math
+try:
+    from .webclient import http_session
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from webclient import http_session
+try:
+    from .render import run_render
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from render import run_render
 
 # --- Global Constants for Utility ---
 AFK_TIMEOUT = 120  # Time in seconds for AFK status expiry (2 minutes)
@@ -35,6 +43,22 @@ async def send_response(context, content: Optional[str] = None, embed: Optional[
         # Prefix commands cannot send ephemeral messages
         await context.reply(content=content, embed=embed, mention_author=False, file=file)
 
+def render_qrcode(text_or_url: str) -> bytes:
+    """Builds a QR code PNG (plain data in/out so it can run in the RenderService pool)."""
+    qr = qrcode.QRCode(
+        version=1,
+        error_correction=qrcode.constants.ERROR_CORRECT_L,
+        box_size=10,
+        border=4,
+    )
+    qr.add_data(text_or_url)
+    qr.make(fit=True)
+
+    img = qr.make_image(fill_color="black", back_color="white")
+    buffer = BytesIO()
+    img.save(buffer, format="PNG")
+    return buffer.getvalue()
+
 class Utility(commands.Cog):
     """Premium Utility Cog with all commands."""
     
@@ -511,7 +535,7 @@ class Utility(commands.Cog):
             'units': 'metric' # Use Celsius for metric system
         }
 
-        async with aiohttp.ClientSession() as session:
+        async with http_session(self.bot) as session:
             try:
                 async with session.get(BASE_URL, params=params) as resp:
                     if resp.status == 200:
@@ -930,26 +954,18 @@ class Utility(commands.Cog):
         
         if isinstance(context, discord.Interaction):
              await context.response.defer()
+
+        render_service = self.bot.get_cog("RenderService")
+        if render_service is not None and render_service.saturated:
+            embed = self.premium_embed("Busy", "⏳ Image generation is in high demand right now. Please try again in a few seconds.", discord.Color.orange())
+            return await send_response(context, embed=embed, ephemeral=True)
              
         try:
-            # Create QR Code instance
-            qr = qrcode.QRCode(
-                version=1,
-                error_correction=qrcode.constants.ERROR_CORRECT_L,
-                box_size=10,
-                border=4,
-            )
-            qr.add_data(text_or_url)
-            qr.make(fit=True)
-            
-            # Create image and save to buffer
-            img = qr.make_image(fill_color="black", back_color="white")
-            buffer = BytesIO()
-            img.save(buffer, format="PNG")
-            buffer.seek(0)
+            # Render off the event loop (process pool when available)
+            qr_data = await run_render(self.bot, render_qrcode, text_or_url)
             
             # Create Discord File
-            file = discord.File(buffer, filename="qrcode.png")
+            file = discord.File(BytesIO(qr_data), filename="qrcode.png")
             
             embed = self.premium_embed(
                 "QR Code Generated 📸",
@@ -8,6 +8,10 @@ from discord.ui import View, Button, Select, Modal, TextInput
 import os, json, random, string, io, asyncio
 from datetime import datetime, timedelta, timezone
 from typing import Optional, Union # Added for structure support
+try:
+    from .render import run_render
+except ImportError: # Imported as a top-level module (benchmarks, scripts)
+    from render import run_render
 
 # PIL Library for Image Generation
 try:
@@ -128,8 +132,8 @@ async def send_response(context: Union[discord.Interaction, commands.Context], c
 
 
 # ==== CAPTCHA GENERATOR ====
-def send_captcha(code: str):
-    """Generates a simple CAPTCHA image."""
+def render_captcha(code: str) -> bytes:
+    """Generates a simple CAPTCHA image as PNG bytes (runs in the RenderService pool)."""
     img_width, img_height = 300, 100
     background_color = (255, 255, 255)
     
@@ -142,7 +146,8 @@ def send_captcha(code: str):
     except IOError:
         font = ImageFont.load_default()
         
-    text_width, text_height = d.textsize(code, font=font)
+    left, top, right, bottom = d.textbbox((0, 0), code, font=font)
+    text_width, text_height = right - left, bottom - top
     x = (img_width - text_width) / 2
     y = (img_height - text_height) / 2
     
@@ -158,8 +163,14 @@ def send_captcha(code: str):
     # Convert image to bytes
     buffer = io.BytesIO()
     img.save(buffer, format='PNG')
-    buffer.seek(0)
-    return discord.File(buffer, filename="captcha.png")
+    return buffer.getvalue()
+
+def render_busy(bot) -> bool:
+    render_service = bot.get_cog("RenderService")
+    return render_service is not None and render_service.saturated
+
+def captcha_file(captcha_data: bytes) -> discord.File:
+    return discord.File(io.BytesIO(captcha_data), filename="captcha.png")
 
 # ===================================================================
 #                               VIEWS
@@ -218,10 +229,20 @@ class VerificationButton(View):
         # Get challenge type and data
         mode = cfg["mode"]
         
+        captcha_data = None
         if mode == "captcha":
+            if render_busy(self.cog.bot):
+                embed = pembed("Busy ⏳", "Verification is in high demand right now. Please press the button again in a few seconds.", 0xFFA500)
+                return await interaction.followup.send(embed=embed, ephemeral=True)
             code = ''.join(random.choices(string.ascii_uppercase + string.digits, k=5))
             challenge_answer = code
-            file = send_captcha(code)
+            try:
+                captcha_data = await run_render(self.cog.bot, render_captcha, code)
+            except Exception as e:
+                print(f"Captcha render failed: {e}")
+                embed = pembed("Busy ⏳", "Could not generate a captcha right now. Please try again in a few seconds.", 0xFFA500)
+                return await interaction.followup.send(embed=embed, ephemeral=True)
+            file = captcha_file(captcha_data)
             challenge_message = "Please enter the code shown in the image to verify yourself."
         
         elif mode == "question":
@@ -274,8 +295,8 @@ class VerificationButton(View):
                 dm_embed = pembed("Verification Challenge 🔒", f"You have **5 minutes** to answer the challenge in the server channel or here in DMs (if not a CAPTCHA).\n\n**Challenge:** {challenge_message}", 0x00BFFF)
                 
                 if mode == "captcha":
-                    # Send Captcha image to DM
-                    dm_file = send_captcha(challenge_answer)
+                    # Send Captcha image to DM (same render, new File object)
+                    dm_file = captcha_file(captcha_data)
                     await user.send(embed=dm_embed, file=dm_file)
                 else:
                     await user.send(embed=dm_embed)
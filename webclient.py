@@ -0,0 +1,283 @@
+# webclient.py
+# Sentinel Web Client — one pooled aiohttp session for the whole bot,
+# plus a small memory + disk cache for image bytes (avatars, backgrounds).
+#
+# Other cogs borrow the session through `http_session(bot)`, which falls back
+# to a throwaway aiohttp session when this cog is not loaded, and pace their
+# Discord API calls with `TokenBucket`.
+
+import discord
+from discord.ext import commands
+import os
+import json
+import time
+import asyncio
+import hashlib
+import contextlib
+import aiohttp
+from collections import OrderedDict
+from email.utils import parsedate_to_datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+# ==== SETTINGS ====
+HTTP_POOL_LIMIT = 100 # Total open connections
+HTTP_PER_HOST_LIMIT = 10 # Open connections per host
+HTTP_DNS_CACHE_TTL = 300 # seconds
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+
+IMAGE_CACHE_DIR = "data/http_cache"
+IMAGE_CACHE_MEMORY_BYTES = 16 * 1024 * 1024
+IMAGE_CACHE_MAX_ITEM_BYTES = 4 * 1024 * 1024 # Larger bodies are returned but not cached
+IMAGE_CACHE_DISK_MAX_AGE = 7 * 24 * 3600 # Unused disk entries older than this are pruned on load
+
+os.makedirs(IMAGE_CACHE_DIR, exist_ok=True)
+
+
+def _cache_policy(headers) -> Optional[Dict[str, Any]]:
+    """
+    Builds cache metadata from response headers.
+    Returns None when the response must not be stored.
+    """
+    cache_control = headers.get("Cache-Control", "").lower()
+    directives = {}
+    for part in cache_control.split(","):
+        key, _, value = part.strip().partition("=")
+        if key:
+            directives[key] = value.strip('"')
+
+    if "no-store" in directives:
+        return None
+
+    now = time.time()
+    expires = now
+    if "no-cache" not in directives:
+        if "max-age" in directives:
+            try:
+                expires = now + int(directives["max-age"])
+            except ValueError:
+                pass
+        elif headers.get("Expires"):
+            try:
+                expires = parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                pass
+
+    meta = {
+        "etag": headers.get("ETag"),
+        "last_modified": headers.get("Last-Modified"),
+        "expires": expires
+    }
+    # Nothing to serve fresh and nothing to revalidate with: not worth keeping
+    if expires <= now and not meta["etag"] and not meta["last_modified"]:
+        return None
+    return meta
+
+
+@contextlib.asynccontextmanager
+async def http_session(bot: commands.Bot):
+    """Yields the shared WebClient session if loaded, else a throwaway one."""
+    web_client = bot.get_cog("WebClient")
+    if web_client is not None and web_client.session is not None:
+        yield web_client.session
+    else:
+        async with aiohttp.ClientSession() as session:
+            yield session
+
+
+class TokenBucket:
+    """
+    Lets callers through at `rate` per second, with bursts of up to `burst`.
+    Waiters are served in arrival order; `pause` backs everyone off, e.g. after a 429.
+    """
+
+    def __init__(self, rate: float, burst: float):
+        self.rate = rate
+        self.burst = burst
+        self._tokens = float(burst)
+        self._updated = time.monotonic()
+        self._paused_until = 0.0
+        self._lock = asyncio.Lock()
+
+    def pause(self, seconds: float):
+        """Holds every caller back for `seconds`."""
+        self._paused_until = max(self._paused_until, time.monotonic() + seconds)
+
+    async def acquire(self):
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                if now < self._paused_until:
+                    await asyncio.sleep(self._paused_until - now)
+                    continue
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+
+
+class ImageCache:
+    """URL -> (body, meta). In-memory LRU bounded by bytes, backed by files in IMAGE_CACHE_DIR."""
+
+    def __init__(self, directory: str, memory_bytes: int):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self._memory: "OrderedDict[str, Tuple[bytes, Dict[str, Any]]]" = OrderedDict()
+        self._size = 0
+
+    def _paths(self, url: str) -> Tuple[str, str]:
+        digest = hashlib.sha1(url.encode()).hexdigest()
+        base = os.path.join(self.directory, digest)
+        return f"{base}.bin", f"{base}.json"
+
+    def _remember(self, url: str, body: bytes, meta: Dict[str, Any]):
+        old = self._memory.pop(url, None)
+        if old is not None:
+            self._size -= len(old[0])
+        self._memory[url] = (body, meta)
+        self._size += len(body)
+        while self._size > self.memory_bytes:
+            _, (evicted, _) = self._memory.popitem(last=False)
+            self._size -= len(evicted)
+
+    def _read_disk(self, url: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        body_path, meta_path = self._paths(url)
+        try:
+            with open(meta_path, "r") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                return f.read(), meta
+        except (OSError, json.JSONDecodeError):
+            return None
+
+    def _write_disk(self, url: str, body: Optional[bytes], meta: Dict[str, Any]):
+        body_path, meta_path = self._paths(url)
+        if body is not None:
+            with open(body_path, "wb") as f:
+                f.write(body)
+        elif os.path.exists(body_path):
+            # Revalidated (304): keep the body as fresh as its meta for prune_disk
+            os.utime(body_path)
+        with open(f"{meta_path}.tmp", "w") as f:
+            json.dump(meta, f)
+        os.replace(f"{meta_path}.tmp", meta_path)
+
+    def prune_disk(self):
+        """Removes entries (body and meta together) not written or revalidated for IMAGE_CACHE_DISK_MAX_AGE."""
+        cutoff = time.time() - IMAGE_CACHE_DISK_MAX_AGE
+        entries: Dict[str, List[str]] = {}
+        for name in os.listdir(self.directory):
+            entries.setdefault(name.split(".", 1)[0], []).append(os.path.join(self.directory, name))
+        for paths in entries.values():
+            try:
+                if max(os.path.getmtime(path) for path in paths) >= cutoff:
+                    continue
+                for path in paths:
+                    os.remove(path)
+            except OSError:
+                pass
+
+    async def get(self, url: str) -> Optional[Tuple[bytes, Dict[str, Any]]]:
+        entry = self._memory.get(url)
+        if entry is not None:
+            self._memory.move_to_end(url)
+            return entry
+        entry = await asyncio.to_thread(self._read_disk, url)
+        if entry is not None:
+            self._remember(url, *entry)
+        return entry
+
+    async def put(self, url: str, body: bytes, meta: Dict[str, Any], body_changed: bool = True):
+        self._remember(url, body, meta)
+        try:
+            await asyncio.to_thread(self._write_disk, url, body if body_changed else None, meta)
+        except OSError as e:
+            print(f"[ERROR] Failed to write HTTP cache entry for {url}: {e}")
+
+
+class WebClient(commands.Cog):
+    """Owns the bot-wide aiohttp session and the image byte cache."""
+
+    def __init__(self, bot: commands.Bot):
+        self.bot = bot
+        self.session: Optional[aiohttp.ClientSession] = None
+        self.images = ImageCache(IMAGE_CACHE_DIR, IMAGE_CACHE_MEMORY_BYTES)
+        self.stats: Dict[str, int] = {"hits": 0, "revalidated": 0, "misses": 0, "stale_served": 0, "errors": 0}
+
+    async def cog_load(self):
+        connector = aiohttp.TCPConnector(
+            limit=HTTP_POOL_LIMIT,
+            limit_per_host=HTTP_PER_HOST_LIMIT,
+            ttl_dns_cache=HTTP_DNS_CACHE_TTL
+        )
+        self.session = aiohttp.ClientSession(connector=connector, timeout=HTTP_TIMEOUT)
+        await asyncio.to_thread(self.images.prune_disk)
+
+    async def cog_unload(self):
+        if self.session is not None:
+            await self.session.close()
+            self.session = None
+
+    async def fetch_image(self, url: str) -> Optional[bytes]:
+        """
+        Returns the bytes at `url`, honouring Cache-Control/Expires and
+        revalidating stale entries with ETag / Last-Modified.
+        """
+        entry = await self.images.get(url)
+        if entry is not None and entry[1].get("expires", 0) > time.time():
+            self.stats["hits"] += 1
+            return entry[0]
+
+        headers = {}
+        if entry is not None:
+            if entry[1].get("etag"):
+                headers["If-None-Match"] = entry[1]["etag"]
+            if entry[1].get("last_modified"):
+                headers["If-Modified-Since"] = entry[1]["last_modified"]
+
+        try:
+            async with self.session.get(url, headers=headers) as response:
+                if response.status == 304 and entry is not None:
+                    self.stats["revalidated"] += 1
+                    meta = _cache_policy(response.headers) or entry[1]
+                    meta["etag"] = meta.get("etag") or entry[1].get("etag")
+                    meta["last_modified"] = meta.get("last_modified") or entry[1].get("last_modified")
+                    await self.images.put(url, entry[0], meta, body_changed=False)
+                    return entry[0]
+
+                if response.status != 200:
+                    return None
+
+                body = await response.read()
+                self.stats["misses"] += 1
+                meta = _cache_policy(response.headers)
+                if meta is not None and len(body) <= IMAGE_CACHE_MAX_ITEM_BYTES:
+                    await self.images.put(url, body, meta)
+                return body
+        except Exception:
+            self.stats["errors"] += 1
+            if entry is not None:
+                # Better a slightly stale avatar than none
+                self.stats["stale_served"] += 1
+                return entry[0]
+            return None
+
+    # ==== OWNER STATS COMMAND ====
+    @commands.command(name="httpstats", description="Show shared HTTP client and image cache counters")
+    @commands.is_owner()
+    async def httpstats_prefix(self, ctx: commands.Context):
+        embed = discord.Embed(
+            title="🌐 Web Client",
+            description=(
+                f"**Image cache:** {len(self.images._memory):,} in memory ({self.images._size / 1024 / 1024:.1f} MiB)\n"
+                f"**Hits:** {self.stats['hits']:,} | **Revalidated (304):** {self.stats['revalidated']:,} | **Misses:** {self.stats['misses']:,}\n"
+                f"**Errors:** {self.stats['errors']:,} | **Stale served:** {self.stats['stale_served']:,}"
+            ),
+            color=discord.Color.blurple()
+        )
+        await ctx.reply(embed=embed)
+
+
+async def setup(bot: commands.Bot):
+    await bot.add_cog(WebClient(bot))